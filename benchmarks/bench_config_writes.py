@@ -0,0 +1,58 @@
+"""
+Benchmark de gravações do config.json ao arrastar o slider de volume
+Execute: python benchmarks/bench_config_writes.py [--events 300] [--rate 60]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.config_manager import ConfigManager
+
+class CountingConfig(ConfigManager):
+    """ConfigManager que conta as gravações em disco"""
+
+    def __init__(self, *args, **kwargs):
+        self.writes = 0
+        super().__init__(*args, **kwargs)
+
+    def save_config(self):
+        self.writes += 1
+        return super().save_config()
+
+def drag_slider(config, events, rate, immediate):
+    """Simula o slider mandando 'events' valores por segundo a 'rate' Hz"""
+    start = time.perf_counter()
+    blocked = 0.0
+    for i in range(events):
+        before = time.perf_counter()
+        config.set('volume', i % 101)
+        if immediate:
+            config.save_config()  # Comportamento antigo: grava a cada alteração
+        blocked += time.perf_counter() - before
+        time.sleep(1 / rate)
+    config.flush()
+    return time.perf_counter() - start, blocked
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=300)
+    parser.add_argument('--rate', type=float, default=60)
+    args = parser.parse_args()
+
+    for name, immediate in (('gravação a cada set', True), ('write-behind', False)):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = CountingConfig(config_dir=tmp)
+            if immediate:
+                config.flush_delay = 3600  # Só as gravações explícitas contam
+            elapsed, blocked = drag_slider(config, args.events, args.rate, immediate)
+            print(f"💾 {name:20} {config.writes:5} gravações em {elapsed:.1f} s "
+                  f"({blocked * 1000:.1f} ms na thread da interface)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark do núcleo de reprodução sem janela nem placa de som (NullOutput)
+Execute: python benchmarks/bench_engine.py [--tracks 100000] [--transitions 10000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.audio_output import NullOutput
+from utils.music_loader import MusicLoader
+from utils.player_engine import PlayerEngine
+from utils.track_table import TrackTable
+
+def make_engine(count, shuffle_mode, clock):
+    tracks = TrackTable()
+    for i in range(count):
+        tracks.append({'path': f'/m/{i:06d}.mp3', 'name': f'{i:06d}', 'extension': '.mp3',
+                       'folder': '/m', 'duration': 1.0})
+    loader = MusicLoader()
+    loader.load_tracks('/m', tracks)
+    output = NullOutput(clock=lambda: clock[0], duration_of=lambda path: 1.0)
+    engine = PlayerEngine(loader, output, shuffle_mode=shuffle_mode, repeat_mode='all',
+                          clock=lambda: clock[0])
+    engine.reset_shuffle(keep_current=False)
+    return engine
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run(count, transitions, shuffle_mode):
+    clock = [0.0]
+    engine = make_engine(count, shuffle_mode, clock)
+    engine.play_pause()
+
+    # Reprodução contínua: faixas de 1s, poll a cada 200ms de relógio simulado
+    polls = 0
+    start = time.perf_counter()
+    while clock[0] < transitions:
+        clock[0] += 0.2
+        engine.poll()
+        polls += 1
+    elapsed = time.perf_counter() - start
+
+    # Latência dos comandos de transporte (botões / teclas de mídia)
+    latencies = []
+    for command in (engine.next, engine.previous, engine.play_pause, engine.play_pause) * 500:
+        before = time.perf_counter()
+        command()
+        latencies.append((time.perf_counter() - before) * 1000)
+
+    mode = "aleatório" if shuffle_mode else "em ordem"
+    print(f"🎵 {count} faixas, {mode}:")
+    print(f"   ⏱️  poll(): {elapsed / polls * 1e6:.1f} µs por chamada "
+          f"({transitions / elapsed:,.0f} trocas de faixa/s simuladas)")
+    print(f"   ⚡ comando: média {sum(latencies) / len(latencies) * 1000:.1f} µs, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f} µs")
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tracks', type=int, default=100000)
+    parser.add_argument('--transitions', type=int, default=10000)
+    args = parser.parse_args()
+
+    for shuffle_mode in (False, True):
+        run(args.tracks, args.transitions, shuffle_mode)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark do intervalo entre faixas (load ao fim x fila do mixer)
+Execute: python benchmarks/bench_gapless.py [--seconds 2] [--dummy]
+"""
+import argparse
+import math
+import os
+import struct
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.playback import GaplessPlayback
+
+def write_tone(path, seconds, frequency, rate=44100):
+    """Gera um WAV com um tom senoidal"""
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b''.join(
+            struct.pack('<h', int(12000 * math.sin(2 * math.pi * frequency * i / rate)))
+            for i in range(int(seconds * rate))))
+
+def silent_time(pygame, timeout):
+    """Tempo (ms) em que o mixer ficou parado até voltar a tocar"""
+    stopped = None
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        busy = pygame.mixer.music.get_busy()
+        now = time.perf_counter()
+        if not busy and stopped is None:
+            stopped = now
+        elif busy and stopped is not None:
+            return (now - stopped) * 1000
+        time.sleep(0.001)
+    return 0.0 if stopped is None else (time.perf_counter() - stopped) * 1000
+
+def measure_reload(pygame, first, second, seconds):
+    """Modo antigo: espera a faixa acabar e só então carrega a próxima"""
+    pygame.mixer.music.load(first)
+    pygame.mixer.music.play()
+    time.sleep(seconds * 0.8)
+    while pygame.mixer.music.get_busy():
+        time.sleep(0.001)
+    ended = time.perf_counter()
+    pygame.mixer.music.load(second)
+    pygame.mixer.music.play()
+    gap = (time.perf_counter() - ended) * 1000
+    pygame.mixer.music.stop()
+    return gap
+
+def measure_gapless(pygame, first, second, seconds):
+    """Modo novo: a próxima faixa já está na fila quando a atual acaba"""
+    playback = GaplessPlayback(pygame)
+    playback.play(first)
+    playback.prepare_next(second)
+    time.sleep(seconds * 0.8)
+    gap = silent_time(pygame, seconds)
+    while playback.poll() is None and pygame.mixer.music.get_busy():
+        time.sleep(0.001)
+    pygame.mixer.music.stop()
+    return gap
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--dummy', action='store_true',
+                        help="Usa o driver de áudio 'dummy' (máquinas sem som)")
+    args = parser.parse_args()
+
+    if args.dummy:
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    try:
+        import pygame
+    except ImportError:
+        print("⚠️  pygame não instalado, benchmark ignorado")
+        return
+    pygame.mixer.init()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first = os.path.join(tmp, 'a.wav')
+        second = os.path.join(tmp, 'b.wav')
+        write_tone(first, args.seconds, 440)
+        write_tone(second, args.seconds, 660)
+
+        for name, measure in (('load ao fim', measure_reload), ('fila (gapless)', measure_gapless)):
+            gaps = [measure(pygame, first, second, args.seconds) for _ in range(args.runs)]
+            print(f"⏱️  {name:16} intervalo médio {sum(gaps) / len(gaps):7.2f} ms "
+                  f"(máx {max(gaps):.2f} ms)")
+
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark do canal de controle: ida e volta de um comando x abrir um processo novo
+Execute: python benchmarks/bench_ipc.py [--commands 1000]
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.ipc import AVAILABLE, ControlServer, send_command
+
+# Cliente num processo novo, como uma segunda execução do main.py
+CLIENT = r"""
+import sys
+sys.path.insert(0, {root!r})
+from utils.ipc import send_command
+sys.exit(0 if send_command('next', socket_path={path!r}) else 1)
+"""
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commands', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=10)
+    args = parser.parse_args()
+
+    if not AVAILABLE:
+        print("⚠️  Socket Unix indisponível neste sistema")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = Path(tmp) / 'control.sock'
+        received = []
+        server = ControlServer(lambda command, value: received.append(command) or True,
+                               socket_path=socket_path)
+        server.start()
+        try:
+            round_trips = []
+            for _ in range(args.commands):
+                start = time.perf_counter()
+                send_command('next', socket_path=socket_path)
+                round_trips.append((time.perf_counter() - start) * 1000)
+
+            launches = []
+            client = CLIENT.format(root=str(ROOT), path=str(socket_path))
+            for _ in range(args.processes):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, '-c', client], check=True)
+                launches.append((time.perf_counter() - start) * 1000)
+        finally:
+            server.stop()
+
+    print(f"📨 {len(received)} comandos recebidos")
+    print(f"⚡ Ida e volta no socket: média {sum(round_trips) / len(round_trips):.3f} ms, "
+          f"p95 {percentile(round_trips, 0.95):.3f} ms")
+    print(f"🚀 Processo cliente completo: média {sum(launches) / len(launches):.1f} ms "
+          f"(interpretador + envio)")
+
+if __name__ == '__main__':
+    main()
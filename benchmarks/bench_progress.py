@@ -0,0 +1,57 @@
+"""
+Benchmark da barra de progresso: timer fixo x acordar só quando o pixel/segundo muda
+Execute: python benchmarks/bench_progress.py [--length 240] [--width 600] [--interval-ms 100]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.position_tracker import PositionTracker, ProgressThrottle
+
+def simulate(length, width, show_bar=True, hidden=False):
+    """Toca uma música inteira em relógio simulado; retorna (acordadas, redesenhos)"""
+    clock = [0.0]
+    tracker = PositionTracker(clock=lambda: clock[0])
+    progress = ProgressThrottle(lambda pixel: None, lambda second, total: None)
+    tracker.start()
+    wakeups = 0
+    while tracker.position() < length:
+        position = tracker.position()
+        if not hidden:
+            progress.update(position, length, width, show_bar=show_bar)
+        clock[0] += progress.next_delay_ms(position, length, width, playing=True,
+                                           show_bar=show_bar, hidden=hidden) / 1000
+        wakeups += 1
+    return wakeups, progress.redraws
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--length', type=float, default=240.0, help="Duração da música (s)")
+    parser.add_argument('--width', type=int, default=600, help="Largura da barra (px)")
+    parser.add_argument('--interval-ms', type=int, default=100, help="Timer fixo comparado")
+    args = parser.parse_args()
+
+    fixed = int(args.length * 1000 / args.interval_ms)
+    print(f"🎵 Música de {args.length:.0f}s, barra de {args.width}px")
+    print(f"⏲️  Timer fixo de {args.interval_ms} ms: {fixed} acordadas, {fixed * 2} redesenhos")
+    for label, options in (("Janela normal", {}),
+                           ("Modo mini", {'show_bar': False}),
+                           ("Minimizado", {'hidden': True})):
+        wakeups, redraws = simulate(args.length, args.width, **options)
+        print(f"⚡ {label}: {wakeups} acordadas, {redraws} redesenhos")
+
+    tracker = PositionTracker()
+    tracker.start()
+    runs = 100000
+    start = time.perf_counter()
+    for _ in range(runs):
+        tracker.position()
+    print(f"⏱️  PositionTracker.position(): {(time.perf_counter() - start) / runs * 1e9:.0f} ns")
+
+if __name__ == '__main__':
+    main()
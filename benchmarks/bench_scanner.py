@@ -0,0 +1,80 @@
+"""
+Benchmark: os.walk sequencial x DirectoryScanner paralelo
+Execute: python benchmarks/bench_scanner.py [--files 100000] [--workers 1 4 8 16]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.music_loader import MusicLoader
+from utils.scanner import DirectoryScanner
+
+def build_tree(root, total_files, files_per_dir=100, dirs_per_level=10):
+    """Cria uma árvore sintética com total_files arquivos (mistura de músicas e outros)"""
+    created = 0
+    dir_index = 0
+    while created < total_files:
+        parts = []
+        n = dir_index
+        for _ in range(3):
+            parts.append(f"d{n % dirs_per_level}")
+            n //= dirs_per_level
+        directory = Path(root, *parts, f"album{dir_index}")
+        directory.mkdir(parents=True, exist_ok=True)
+        for i in range(min(files_per_dir, total_files - created)):
+            extension = '.jpg' if i % 10 == 0 else '.mp3'
+            (directory / f"track{i:03d}{extension}").touch()
+        created += files_per_dir
+        dir_index += 1
+
+def legacy_walk(folder_path):
+    """Implementação anterior do MusicLoader (os.walk + Path por arquivo)"""
+    music_files = []
+    for root, dirs, files in os.walk(folder_path):
+        for file in files:
+            file_path = Path(root) / file
+            if file_path.suffix.lower() in MusicLoader.SUPPORTED_FORMATS:
+                music_files.append({
+                    'path': str(file_path),
+                    'name': file_path.stem,
+                    'extension': file_path.suffix,
+                    'folder': root
+                })
+    return music_files
+
+def timed(func, *args):
+    """Executa func e retorna (segundos, resultado)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=100000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--path', help="Usa uma pasta existente em vez da árvore sintética")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.path or tmp
+        if not args.path:
+            print(f"📁 Criando árvore sintética com {args.files} arquivos...")
+            build_tree(root, args.files)
+
+        elapsed, result = timed(legacy_walk, root)
+        print(f"os.walk (atual)          {elapsed * 1000:9.1f} ms  {len(result)} músicas")
+
+        for workers in args.workers:
+            scanner = DirectoryScanner(MusicLoader.SUPPORTED_FORMATS, workers=workers)
+            elapsed, result = timed(scanner.scan, root)
+            print(f"scandir ({workers:2d} threads)    {elapsed * 1000:9.1f} ms  {len(result)} músicas")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark da busca incremental (SearchIndex)
+Execute: python benchmarks/bench_search.py [--tracks 100000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.search_index import SearchIndex
+from utils.track_table import TrackTable
+
+WORDS = ['amor', 'coração', 'noite', 'estrela', 'saudade', 'rio', 'mar', 'sol',
+         'canção', 'vento', 'love', 'night', 'heart', 'dream', 'fire', 'blue']
+
+def synthetic_library(total):
+    """Gera uma TrackTable com nomes, artistas e álbuns aleatórios"""
+    rng = random.Random(42)
+    table = TrackTable()
+    for i in range(total):
+        name = ' '.join(rng.choice(WORDS) for _ in range(3)) + f" {i}"
+        index = table.add(f"/music/{i // 12}", name, '.mp3')
+        table.set_field(index, 'artist', f"Artista {rng.randrange(2000)}")
+        table.set_field(index, 'album', f"{rng.choice(WORDS)} {rng.randrange(100)}")
+    return table
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tracks', type=int, default=100000)
+    parser.add_argument('--limit', type=int, default=500)
+    args = parser.parse_args()
+
+    table = synthetic_library(args.tracks)
+    start = time.perf_counter()
+    index = SearchIndex(table)
+    print(f"🔨 Índice de {args.tracks} músicas em {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Simula a digitação letra a letra
+    for query in ('co', 'cor', 'cora', 'coraç', 'coracao', 'coracao est', 'artista 12'):
+        start = time.perf_counter()
+        results = index.search(query, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{query!r:16} {elapsed:8.3f} ms  {len(results)} resultados")
+
+if __name__ == '__main__':
+    main()
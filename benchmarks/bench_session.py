@@ -0,0 +1,56 @@
+"""
+Benchmark do instantâneo da sessão: gravar e restaurar a lista sem escanear a pasta
+Execute: python benchmarks/bench_session.py [--tracks 100000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.session import SessionStore
+from utils.track_table import TrackTable
+
+def synthetic_table(total, per_folder=12):
+    """Biblioteca sintética no formato do MusicLoader"""
+    table = TrackTable()
+    for i in range(total):
+        folder = f"/mnt/nas/Music/Artist {i // 500:04d}/Album {i // per_folder:06d}"
+        table.add(folder, f"{i % per_folder + 1:02d} - Track number {i}", '.mp3', 200.0 + i % 120)
+    return table
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tracks', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    table = synthetic_table(args.tracks)
+    session = {'source': '/mnt/nas/Music', 'tracks': table, 'current_index': args.tracks // 2,
+               'position': 93.4, 'shuffle_mode': True,
+               'shuffle_queue': list(range(0, args.tracks, 3)), 'shuffle_history': [1, 2, 3]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(Path(tmp) / 'session.bin')
+        saves, loads = [], []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            store.save(session)
+            saves.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            restored = store.load()
+            loads.append((time.perf_counter() - start) * 1000)
+        size = store.session_file.stat().st_size
+
+    assert len(restored['tracks']) == args.tracks
+    print(f"📊 {args.tracks} músicas, {len(table.folders)} pastas")
+    print(f"💾 session.bin: {size / 1024:.0f} KB")
+    print(f"✍️  Gravar:     mín {min(saves):7.1f} ms")
+    print(f"⚡ Restaurar:  mín {min(loads):7.1f} ms")
+
+if __name__ == '__main__':
+    main()
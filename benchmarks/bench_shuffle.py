@@ -0,0 +1,75 @@
+"""
+Benchmark do modo aleatório: permutação preguiçosa x lista embaralhada inteira
+Execute: python benchmarks/bench_shuffle.py [--tracks 1000000] [--plays 1000]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.shuffle import ShuffleEngine
+
+def timed(function):
+    """Retorna (ms, bytes alocados, resultado); memória medida numa segunda execução"""
+    start = time.perf_counter()
+    result = function()
+    elapsed = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+def full_shuffle(count):
+    """Abordagem antiga: copia e embaralha a lista inteira"""
+    queue = list(range(count))
+    random.shuffle(queue)
+    return queue
+
+def lazy_plays(count, plays):
+    engine = ShuffleEngine(count, seed=1)
+    for _ in range(plays):
+        engine.next()
+    return engine
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tracks', type=int, default=1_000_000)
+    parser.add_argument('--plays', type=int, default=1000)
+    args = parser.parse_args()
+    mb = 1024 * 1024
+
+    full_ms, full_bytes, queue = timed(lambda: full_shuffle(args.tracks))
+    del queue
+    lazy_ms, lazy_bytes, engine = timed(lambda: lazy_plays(args.tracks, args.plays))
+
+    start = time.perf_counter()
+    for _ in range(args.plays):
+        engine.previous()
+    for _ in range(args.plays):
+        engine.next()
+    nav_us = (time.perf_counter() - start) * 1e6 / (2 * args.plays)
+
+    start = time.perf_counter()
+    engine.remove(args.tracks // 2)
+    remove_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    lazy_plays(args.tracks, args.tracks)
+    full_engine_ms = (time.perf_counter() - start) * 1000
+
+    print(f"📊 {args.tracks} músicas, {args.plays} sorteios")
+    print(f"🔀 Lista embaralhada inteira: {full_ms:8.1f} ms  {full_bytes / mb:7.1f} MB")
+    print(f"⚡ ShuffleEngine ({args.plays} sorteios): {lazy_ms:8.1f} ms  {lazy_bytes / mb:7.2f} MB")
+    print(f"⏮️  Anterior/próxima: {nav_us:.2f} µs por passo")
+    print(f"🗑️  Remover uma faixa: {remove_ms:.2f} ms")
+    print(f"🔁 Permutação completa pelo ShuffleEngine: {full_engine_ms:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
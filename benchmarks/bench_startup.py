@@ -0,0 +1,59 @@
+"""
+Benchmark de inicialização: tempo de import e tempo até o primeiro frame
+Execute: python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Roda num processo novo para medir a partida a frio (sem módulos em cache)
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from components.player import MusicPlayer
+imported = time.perf_counter()
+result = {{'import_ms': (imported - start) * 1000,
+           'pygame_loaded_at_import': 'pygame' in sys.modules}}
+try:
+    app = MusicPlayer()
+    app.root.update()  # Processa Map/Expose: janela desenhada
+    result['first_frame_ms'] = (time.perf_counter() - start) * 1000
+    result['pygame_loaded_at_first_frame'] = app.engine.output.audio.loaded
+    app.root.destroy()
+except Exception as e:
+    result['error'] = f"{{type(e).__name__}}: {{e}}"
+print(json.dumps(result))
+"""
+
+def run_probe():
+    output = subprocess.run([sys.executable, '-c', PROBE.format(root=str(ROOT))],
+                            capture_output=True, text=True, cwd=ROOT)
+    lines = output.stdout.strip().splitlines()
+    return json.loads(lines[-1]) if lines else {'error': output.stderr.strip()[-200:]}
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    results = [run_probe() for _ in range(args.runs)]
+    imports = [r['import_ms'] for r in results if 'import_ms' in r]
+    frames = [r['first_frame_ms'] for r in results if 'first_frame_ms' in r]
+
+    if imports:
+        print(f"📦 Import do player: média {sum(imports) / len(imports):.0f} ms "
+              f"(pygame carregado no import: {results[0]['pygame_loaded_at_import']})")
+    if frames:
+        print(f"🪟 Primeiro frame: média {sum(frames) / len(frames):.0f} ms, "
+              f"mín {min(frames):.0f} ms")
+    else:
+        print(f"⚠️  Janela não pôde ser aberta: {results[0].get('error')}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark das playlists de faixas (importar, carregar e reordenar)
+Execute: python benchmarks/bench_track_playlists.py [--tracks 50000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.library_index import LibraryIndex
+from utils.music_loader import MusicLoader
+from utils.track_playlists import TrackPlaylistStore, write_playlist_file
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tracks', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LibraryIndex(MusicLoader.SUPPORTED_FORMATS, db_path=os.path.join(tmp, 'library.db'))
+        store = TrackPlaylistStore(index)
+        source = os.path.join(tmp, 'grande.m3u8')
+        write_playlist_file(source, [{'path': f"/music/{i // 12}/faixa {i}.mp3",
+                                      'title': f"Faixa {i}", 'duration': 180}
+                                     for i in range(args.tracks)])
+
+        start = time.perf_counter()
+        playlist_id = store.import_file(source)
+        print(f"📥 Importar {args.tracks} faixas: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        start = time.perf_counter()
+        tracks = store.load_tracks(playlist_id)
+        print(f"📂 Carregar {len(tracks)} faixas: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        entries = store.get_entries(playlist_id)
+        start = time.perf_counter()
+        for i in range(1000):
+            store.move(entries[-1 - i]['entry_id'], before_entry_id=entries[i]['entry_id'])
+        print(f"↕️  1000 movimentações: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        start = time.perf_counter()
+        store.export_file(playlist_id, os.path.join(tmp, 'export.m3u8'))
+        print(f"📤 Exportar: {(time.perf_counter() - start) * 1000:.0f} ms")
+        index.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark de memória: lista de dicts x TrackTable
+Execute: python benchmarks/bench_track_table.py [--tracks 300000]
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.track_table import TrackTable
+
+def synthetic_tracks(total, per_folder=12):
+    """Gera dicionários no formato antigo do MusicLoader"""
+    for i in range(total):
+        folder = f"/mnt/nas/Music/Artist {i // 500:04d}/Album {i // per_folder:06d}"
+        name = f"{i % per_folder + 1:02d} - Track number {i}"
+        yield {
+            'path': f"{folder}/{name}.mp3",
+            'name': name,
+            'extension': '.mp3',
+            'folder': folder,
+        }
+
+def measure(build):
+    """Retorna (bytes alocados, objeto) mantendo o objeto vivo"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tracks', type=int, default=300000)
+    args = parser.parse_args()
+
+    dict_bytes, dicts = measure(lambda: list(synthetic_tracks(args.tracks)))
+    del dicts
+    table_bytes, table = measure(lambda: TrackTable(synthetic_tracks(args.tracks)))
+
+    mb = 1024 * 1024
+    print(f"📊 {args.tracks} músicas, {len(table.folders)} pastas")
+    print(f"List[Dict] (atual)   {dict_bytes / mb:8.1f} MB")
+    print(f"TrackTable           {table_bytes / mb:8.1f} MB  ({table_bytes / dict_bytes:.0%})")
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,13 @@
 """Components package"""
-from .player import MusicPlayer
 
-__all__ = ['MusicPlayer']
+__all__ = ['MusicPlayer', 'HeadlessPlayer']
+
+def __getattr__(name):
+    # O player (e tudo que ele importa) só é carregado quando realmente usado
+    if name == 'MusicPlayer':
+        from .player import MusicPlayer
+        return MusicPlayer
+    if name == 'HeadlessPlayer':
+        from .headless import HeadlessPlayer
+        return HeadlessPlayer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
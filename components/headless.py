@@ -0,0 +1,162 @@
+"""
+Player sem janela (servidores, testes de carga)
+Mesmo motor de reprodução da interface, controlado pelo socket local (main.py --next, --enqueue...)
+"""
+import os
+import threading
+from utils.music_loader import MusicLoader
+from utils.library_index import LibraryIndex
+from utils.scanner import DirectoryScanner
+from utils.config_manager import ConfigManager
+from utils.session import SessionStore
+from utils.audio_output import NullOutput, PygameOutput
+from utils.player_engine import PlayerEngine
+from utils.commands import CommandQueue
+from utils.ipc import ControlServer
+
+class HeadlessPlayer:
+    """Reprodutor sem Tk: PlayerEngine + fila de comandos + canal de controle"""
+
+    # Intervalo de verificação do fim de faixa (s)
+    POLL_INTERVAL = 0.2
+    # Volume (%) por passo de "volume"
+    VOLUME_STEP = 5
+    REMOTE_COMMANDS = ('play_pause', 'next', 'previous', 'volume', 'mute', 'enqueue', 'show')
+
+    def __init__(self, null_audio=False):
+        """
+        Args:
+            null_audio: Sem som (NullOutput): só o relógio anda, para máquinas sem placa de áudio
+        """
+        self.config_manager = ConfigManager()
+        self.scanner = DirectoryScanner(MusicLoader.SUPPORTED_FORMATS,
+                                        workers=self.config_manager.get('scan_workers'))
+        self.library_index = LibraryIndex(MusicLoader.SUPPORTED_FORMATS, scanner=self.scanner)
+        self.music_loader = MusicLoader(library_index=self.library_index, scanner=self.scanner)
+        self.session_store = SessionStore()
+
+        volume = self.config_manager.get('volume', 70) / 100
+        output = NullOutput() if null_audio else PygameOutput(volume)
+        self.engine = PlayerEngine(self.music_loader, output,
+                                   on_track_change=self.on_track_change,
+                                   volume=volume,
+                                   shuffle_mode=self.config_manager.get('shuffle_enabled', False),
+                                   repeat_mode=self.config_manager.get('repeat_mode', 'off'),
+                                   smart_shuffle=self.config_manager.get('smart_shuffle'))
+
+        # Sem loop do Tk: push() acorda o loop de run(), que executa a fila
+        self.wakeup = threading.Event()
+        self.running = False
+        self.commands = CommandQueue(schedule=lambda drain: self.wakeup.set())
+        self.commands.register('play_pause', self.engine.play_pause, mode='toggle')
+        self.commands.register('next', self.engine.next)
+        self.commands.register('previous', self.engine.previous)
+        self.commands.register('volume', self.change_volume_by, mode='sum')
+        self.commands.register('mute', self.engine.toggle_mute, mode='toggle')
+        self.commands.register('enqueue', self.enqueue_track)
+        self.commands.register('show', self.print_status, mode='last')
+        self.commands.register('library_update', lambda args: self.apply_library_update(*args))
+        self.control_server = ControlServer(on_command=self.on_remote_command)
+
+    def load_folder(self, folder_path):
+        """Carrega uma pasta (do índice, se já escaneada) e sorteia a ordem aleatória"""
+        music_list = self.music_loader.load_folder(
+            folder_path,
+            on_update=lambda folder, tracks: self.commands.push('library_update', (folder, tracks)))
+        self.engine.reset_shuffle(keep_current=False)
+        print(f"📁 {len(music_list)} música(s) em {folder_path}")
+        return music_list
+
+    def restore_session(self):
+        """Volta para a lista e a faixa da última sessão (True se havia uma)"""
+        session = self.session_store.load()
+        if not session or not len(session['tracks']):
+            return False
+        self.music_loader.load_tracks(session['source'], session['tracks'])
+        self.engine.restore_session(session)
+        return True
+
+    def apply_library_update(self, folder_path, music_list):
+        """Lista reconciliada com o disco: troca mantendo a faixa atual"""
+        old_list = self.music_loader.get_music_list()
+        current = self.engine.current_music()
+        if not self.music_loader.set_music_list(folder_path, music_list):
+            return
+        if current:
+            self.engine.current_index = self.music_loader.index_of_path(current['path'])
+        self.engine.remap_shuffle(old_list, self.music_loader.get_music_list())
+
+    def on_track_change(self, index):
+        music = self.music_loader.get_music_by_index(index)
+        print(f"▶️  {music['name']}")
+        self.save_session(background=True)
+
+    def print_status(self, value=None):
+        """Resposta ao "show": sem janela, mostra o que está tocando"""
+        music = self.engine.current_music()
+        if not music:
+            print("⏹️  Nenhuma música selecionada")
+            return
+        state = "⏸️ " if self.engine.is_paused or not self.engine.is_playing else "▶️ "
+        print(f"{state} {music['name']} ({self.engine.position():.0f}s)")
+
+    def change_volume_by(self, steps):
+        volume = round(self.engine.volume * 100) + steps * self.VOLUME_STEP
+        self.engine.set_volume(max(0, min(100, volume)) / 100)
+        self.config_manager.set('volume', round(self.engine.volume * 100))
+
+    def enqueue_track(self, path):
+        path = os.path.abspath(path)
+        if (os.path.splitext(path)[1].lower() not in MusicLoader.SUPPORTED_FORMATS
+                or not os.path.isfile(path)):
+            print(f"⚠️  Não é uma música suportada: {path}")
+            return
+        self.engine.enqueue(path)
+
+    def on_remote_command(self, command, value):
+        """Comando de outra execução (thread do servidor): valida e enfileira"""
+        if command not in self.REMOTE_COMMANDS:
+            return False
+        if command == 'volume' and not isinstance(value, int):
+            return False
+        if command == 'enqueue' and not isinstance(value, str):
+            return False
+        self.commands.push(command, value)
+        return True
+
+    def save_session(self, background=False):
+        state = self.engine.session_state()
+        state['source'] = self.music_loader.current_folder
+        state['tracks'] = self.music_loader.get_music_list()
+        if not len(state['tracks']):
+            return
+        if background:
+            self.session_store.save_async(state)
+        else:
+            self.session_store.save(state)
+
+    def run(self, autoplay=True):
+        """Loop principal (até Ctrl+C): executa comandos e acompanha a reprodução"""
+        self.engine.output.start()
+        self.control_server.start()
+        self.running = True
+        if autoplay and len(self.engine.tracks):
+            self.commands.push('play_pause')
+        print("🎧 Player sem janela rodando (Ctrl+C para sair)")
+        try:
+            while self.running:
+                self.wakeup.wait(self.POLL_INTERVAL)
+                self.wakeup.clear()
+                self.commands.drain()
+                self.engine.poll()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.running = False
+        self.save_session()
+        self.control_server.stop()
+        self.engine.close()
+        self.config_manager.flush()
@@ -4,15 +4,30 @@ Melhorias: Animações suaves, barra de progresso clicável, tooltips, melhor UX
 """
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
-import pygame
 import os
-import random
+import threading
 from pathlib import Path
+from components.virtual_list import VirtualListbox
 from utils.music_loader import MusicLoader
+from utils.library_index import LibraryIndex
+from utils.scanner import DirectoryScanner
+from utils.metadata import MetadataExtractor
+from utils.durations import format_duration, get_duration
+from utils.search_index import SearchIndex
+from utils.seek import SeekController
+from utils.folder_watcher import FolderWatcher
+from utils.track_playlists import TrackPlaylistStore
 from utils.playlist_manager import PlaylistManager
 from utils.media_keys import MediaKeyListener
 from utils.config_manager import ConfigManager
 from utils.history_manager import HistoryManager
+from utils.lazy import Deferred
+from utils.session import SessionStore
+from utils.audio_output import PygameOutput
+from utils.player_engine import PlayerEngine
+from utils.position_tracker import ProgressThrottle
+from utils.commands import CommandQueue
+from utils.ipc import ControlServer
 
 class ToolTip:
     """Tooltip personalizado para mostrar dicas ao passar o mouse"""
@@ -43,9 +58,42 @@ class ToolTip:
             self.tooltip.destroy()
             self.tooltip = None
 
+def engine_attribute(name):
+    """Atributo do player que, na verdade, é estado do PlayerEngine"""
+    return property(lambda self: getattr(self.engine, name),
+                    lambda self, value: setattr(self.engine, name, value))
+
 class MusicPlayer:
     """Classe principal do reprodutor de música - Versão Melhorada"""
     
+    # Carregamento em streaming: músicas por lote e intervalo entre lotes
+    STREAM_BATCH_SIZE = 500
+    STREAM_INTERVAL_MS = 15
+    
+    # Busca: espera entre teclas e máximo de resultados mostrados
+    SEARCH_DEBOUNCE_MS = 150
+    SEARCH_LIMIT = 500
+    # Verificação da troca de faixa sem intervalo
+    PLAYBACK_POLL_MS = 200
+    # Consulta da fila de comandos das threads de fundo (só a thread do Tk mexe na tela)
+    COMMAND_POLL_MS = 20
+    # Espera após abrir a janela antes de iniciar os subsistemas pesados
+    BACKGROUND_INIT_DELAY_MS = 100
+    # Volume (%) por toque nas teclas de volume
+    VOLUME_STEP = 5
+    # Comandos aceitos de outras execuções (main.py --next, --enqueue...)
+    REMOTE_COMMANDS = ('play_pause', 'next', 'previous', 'volume', 'mute', 'enqueue', 'show')
+    
+    # Estado de reprodução: mora no PlayerEngine (sem Tk), a interface só mostra
+    current_index = engine_attribute('current_index')
+    is_playing = engine_attribute('is_playing')
+    is_paused = engine_attribute('is_paused')
+    volume = engine_attribute('volume')
+    is_muted = engine_attribute('is_muted')
+    shuffle_mode = engine_attribute('shuffle_mode')
+    repeat_mode = engine_attribute('repeat_mode')
+    song_length = engine_attribute('song_length')
+    
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Music Player - Estilo Spotify")
@@ -56,55 +104,116 @@ class MusicPlayer:
         # Define ícone do aplicativo
         self.set_app_icon()
         
-        # Inicializa pygame mixer
-        pygame.mixer.init()
-        
         # Gerenciadores
         self.config_manager = ConfigManager()
-        self.history_manager = HistoryManager()
-        self.music_loader = MusicLoader()
+        # Subsistemas pesados: criados depois que a janela aparece (ou no primeiro uso)
+        self.history = Deferred(HistoryManager)
+        self.scanner = DirectoryScanner(MusicLoader.SUPPORTED_FORMATS,
+                                        workers=self.config_manager.get('scan_workers'))
+        self.library_index = LibraryIndex(MusicLoader.SUPPORTED_FORMATS, scanner=self.scanner)
+        self.music_loader = MusicLoader(library_index=self.library_index, scanner=self.scanner)
+        self.track_playlists = TrackPlaylistStore(self.library_index)
+        self.metadata_extractor = MetadataExtractor()
+        self.folder_watcher = FolderWatcher(MusicLoader.SUPPORTED_FORMATS,
+                                            on_change=self.schedule_folder_changes,
+                                            scanner=self.scanner,
+                                            library_index=self.library_index)
         self.playlist_manager = PlaylistManager()
+        self.session_store = SessionStore()
+        
+        # Reprodução (o pygame é inicializado em segundo plano pela saída)
+        volume = self.config_manager.get('volume', 70) / 100
+        self.engine = PlayerEngine(self.music_loader, PygameOutput(volume),
+                                   on_track_change=self.on_track_change,
+                                   on_state_change=self.update_transport_buttons,
+                                   on_track_end=self.on_track_end,
+                                   volume=volume,
+                                   shuffle_mode=self.config_manager.get('shuffle_enabled', False),
+                                   repeat_mode=self.config_manager.get('repeat_mode', 'off'),
+                                   smart_shuffle=self.config_manager.get('smart_shuffle'))
         
         # Variáveis do player
-        self.current_index = -1
-        self.is_playing = False
-        self.is_paused = False
-        self.volume = self.config_manager.get('volume', 70) / 100
         self.current_folder = self.config_manager.get('last_folder')
         self.current_playlist = self.config_manager.get('last_playlist')
+        self.pending_playlist = None  # Playlist aberta antes de a pasta ser verificada
         self.is_mini_mode = False
-        self.shuffle_mode = self.config_manager.get('shuffle_enabled', False)
-        self.repeat_mode = self.config_manager.get('repeat_mode', 'off')  # off, one, all
-        self.shuffle_history = []
-        self.shuffle_queue = []
-        self.song_length = 0
-        self.song_position = 0
         self.current_theme = self.config_manager.get('theme', 'dark')
         self.search_query = ''
-        self.is_muted = False
-        self.volume_before_mute = self.volume
+        self.search_index = SearchIndex()
+        self.search_after_id = None
+        self.visible_indices = None  # Índices mostrados na listbox durante uma busca
         self.is_seeking = False  # Para controle da barra de progresso
-        
-        # Inicializa listener de teclas de mídia
+        self.seek_controller = SeekController(on_preview=self.preview_seek_position,
+                                              on_seek=lambda path, position: self.engine.seek(position))
+        self.loading_batches = None  # Carregamento em streaming em andamento
+        # Barra/tempo redesenhados só quando o pixel ou o segundo mostrado muda
+        self.progress = ProgressThrottle(draw_bar=self.draw_progress_bar,
+                                         draw_time=self.draw_time_label)
+        self.progress_after_id = None
+        
+        # Comandos e resultados vindos de outras threads: executados no loop do Tk
+        self.commands = CommandQueue()
+        self.register_commands()
+        # Canal para uma segunda execução mandar comandos em vez de abrir outro player
+        self.control_server = ControlServer(on_command=self.on_remote_command)
+        
+        # Listener de teclas de mídia (iniciado junto com os subsistemas de fundo)
         self.media_listener = MediaKeyListener(
-            on_play_pause=self.play_pause,
-            on_next=self.next_song,
-            on_previous=self.previous_song,
-            on_volume_up=self.increase_volume,
-            on_volume_down=self.decrease_volume,
-            on_mute=self.toggle_mute
+            on_play_pause=lambda: self.commands.push('play_pause'),
+            on_next=lambda: self.commands.push('next'),
+            on_previous=lambda: self.commands.push('previous'),
+            on_volume_up=lambda: self.commands.push('volume', 1),
+            on_volume_down=lambda: self.commands.push('volume', -1),
+            on_mute=lambda: self.commands.push('mute')
         )
-        self.media_listener.start()
         
         # Configura a interface
         self.setup_ui()
         
+        # Volta para onde o usuário estava (sem escanear a pasta)
+        self.restore_session()
+        
         # Bind para fechar e redimensionar
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.root.bind('<Configure>', self.on_resize)
+        self.root.bind('<Map>', self.refresh_progress, add='+')  # Janela restaurada
         
         # Bind para teclas de mídia
         self.setup_media_keys()
+        
+        self.root.after(self.PLAYBACK_POLL_MS, self.poll_playback)
+        self.root.after(self.COMMAND_POLL_MS, self.pump_commands)
+        self.progress_after_id = self.root.after(0, self.update_progress)
+        self.root.after(self.BACKGROUND_INIT_DELAY_MS, self.start_background_services)
+    
+    def register_commands(self):
+        """Comandos que as threads de fundo (e outras execuções) podem enfileirar"""
+        self.commands.register('play_pause', self.play_pause, mode='toggle')
+        self.commands.register('next', self.next_song)
+        self.commands.register('previous', self.previous_song)
+        self.commands.register('volume', self.change_volume_by, mode='sum')
+        self.commands.register('mute', self.toggle_mute, mode='toggle')
+        self.commands.register('folder_changes', lambda args: self.apply_folder_changes(*args))
+        self.commands.register('enqueue', self.enqueue_track)
+        self.commands.register('show', self.show_window, mode='last')
+        self.commands.register('list_summary', self.update_list_summary, mode='last')
+        self.commands.register('song_length', self.engine_song_length, mode='last')
+        self.commands.register('library_update', lambda args: self.apply_library_update(*args))
+        self.commands.register('playlist_status', self.apply_playlist_status)
+        self.commands.register('missing_tracks', lambda args: self.mark_missing_tracks(*args))
+    
+    def start_background_services(self):
+        """Inicia, com a janela já desenhada, o que não é preciso para o primeiro frame"""
+        self.engine.output.start()
+        self.history.start()
+        self.media_listener.start()
+        self.control_server.start()
+        self.playlist_manager.validate_async(self.schedule_playlist_status)
+    
+    @property
+    def history_manager(self):
+        """Histórico de reprodução (carregado em segundo plano)"""
+        return self.history.get()
     
     def setup_ui(self):
         """Configura a interface do usuário"""
@@ -159,6 +268,24 @@ class MusicPlayer:
         remove_playlist_btn.pack(side=tk.LEFT, padx=5)
         ToolTip(remove_playlist_btn, "Remover playlist selecionada")
         
+        import_playlist_btn = tk.Button(playlist_btn_frame, text="📥", 
+                                        font=("Arial", 9),
+                                        bg="#282828", fg="white",
+                                        command=self.import_track_playlist,
+                                        borderwidth=0, padx=8, pady=4,
+                                        cursor="hand2")
+        import_playlist_btn.pack(side=tk.LEFT, padx=5)
+        ToolTip(import_playlist_btn, "Importar playlist (M3U/M3U8/PLS)")
+        
+        export_playlist_btn = tk.Button(playlist_btn_frame, text="📤", 
+                                        font=("Arial", 9),
+                                        bg="#282828", fg="white",
+                                        command=self.export_track_playlist,
+                                        borderwidth=0, padx=8, pady=4,
+                                        cursor="hand2")
+        export_playlist_btn.pack(side=tk.LEFT, padx=5)
+        ToolTip(export_playlist_btn, "Exportar playlist selecionada")
+        
         # Lista de playlists
         playlist_scroll_frame = tk.Frame(self.playlist_panel, bg="#000000")
         playlist_scroll_frame.pack(fill=tk.BOTH, expand=True, pady=5)
@@ -254,10 +381,10 @@ class MusicPlayer:
         list_label_frame = tk.Frame(list_header, bg="#282828")
         list_label_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        list_label = tk.Label(list_label_frame, text="📚 Biblioteca de Músicas", 
-                             font=("Arial", 12, "bold"), 
-                             bg="#282828", fg="white")
-        list_label.pack(side=tk.LEFT, anchor=tk.W, padx=15, pady=10)
+        self.list_label = tk.Label(list_label_frame, text="📚 Biblioteca de Músicas", 
+                                   font=("Arial", 12, "bold"), 
+                                   bg="#282828", fg="white")
+        self.list_label.pack(side=tk.LEFT, anchor=tk.W, padx=15, pady=10)
         
         # Campo de busca
         search_frame = tk.Frame(list_label_frame, bg="#282828")
@@ -283,27 +410,18 @@ class MusicPlayer:
         fav_btn.pack(side=tk.LEFT, padx=5)
         ToolTip(fav_btn, "Ver favoritos")
         
-        # Scrollbar e Listbox
-        list_scroll_frame = tk.Frame(self.list_container, bg="#181818")
-        list_scroll_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        scrollbar = tk.Scrollbar(list_scroll_frame, bg="#282828", 
-                                troughcolor="#181818")
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 5))
-        
-        self.music_listbox = tk.Listbox(list_scroll_frame, 
-                                        yscrollcommand=scrollbar.set,
-                                        bg="#282828", fg="white",
-                                        font=("Arial", 11),
-                                        selectbackground="#1DB954",
-                                        selectforeground="white",
-                                        borderwidth=0,
-                                        highlightthickness=0,
-                                        activestyle='none')
-        self.music_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.music_listbox.yview)
+        # Lista virtualizada: só as linhas visíveis são desenhadas
+        self.music_listbox = VirtualListbox(self.list_container,
+                                            bg="#282828", fg="white",
+                                            font=("Arial", 11),
+                                            selectbackground="#1DB954",
+                                            selectforeground="white",
+                                            scrollbar_bg="#282828",
+                                            troughcolor="#181818")
+        self.music_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         self.music_listbox.bind('<Double-Button-1>', self.on_song_double_click)
+        self.music_listbox.bind('<Return>', self.on_song_double_click)
         self.music_listbox.bind('<Button-3>', self.show_song_context_menu)
         
         # Container de informação da música atual
@@ -350,9 +468,10 @@ class MusicPlayer:
         self.progress_bar = self.progress_canvas.create_rectangle(0, 0, 0, 6, 
                                                                    fill="#1DB954", outline="")
         
-        # Bind para clique na barra de progresso
-        self.progress_canvas.bind('<Button-1>', self.seek_music)
-        self.progress_canvas.bind('<B1-Motion>', self.seek_music)
+        # Clique/arraste só mostram a prévia; a busca acontece ao soltar
+        self.progress_canvas.bind('<Button-1>', self.on_progress_press)
+        self.progress_canvas.bind('<B1-Motion>', self.on_progress_drag)
+        self.progress_canvas.bind('<ButtonRelease-1>', self.seek_music)
         
         # Container de controles
         self.control_container = tk.Frame(self.main_content, bg="#181818", 
@@ -450,35 +569,324 @@ class MusicPlayer:
                                      bg="#181818", fg="#B3B3B3")
         self.volume_label.pack(side=tk.LEFT, padx=10)
     
-    def seek_music(self, event):
-        """Permite buscar posição na música clicando na barra"""
-        if not self.is_playing or self.song_length == 0:
-            return
+    def progress_position(self, event):
+        """Posição (segundos) correspondente ao ponto clicado na barra, ou None"""
+        if not self.is_playing:
+            return None
+        if self.song_length == 0:
+            self.song_length = self.engine.get_song_length(
+                self.music_loader.get_music_by_index(self.current_index))
+        if self.song_length == 0:
+            return None
         
         # Calcula posição clicada
         width = self.progress_canvas.winfo_width()
-        click_x = event.x
-        percentage = max(0, min(1, click_x / width))
-        new_position = percentage * self.song_length
-        
-        try:
-            # Para e reinicia música na nova posição
-            pygame.mixer.music.stop()
-            music = self.music_loader.get_music_by_index(self.current_index)
-            if music:
-                pygame.mixer.music.load(music['path'])
-                pygame.mixer.music.play(start=new_position)
-                self.song_position = new_position
-                self.is_playing = True
-                self.is_paused = False
-        except Exception as e:
-            print(f"Erro ao buscar posição: {e}")
+        return self.seek_controller.position_from_fraction(event.x / width, self.song_length)
+    
+    def on_progress_press(self, event):
+        """Clique na barra: começa a prévia da busca"""
+        position = self.progress_position(event)
+        if position is not None:
+            self.is_seeking = True  # Atualização periódica não sobrescreve a prévia
+            self.seek_controller.press(position)
+    
+    def on_progress_drag(self, event):
+        """Arraste na barra: só move a prévia (nenhum acesso ao arquivo)"""
+        if not self.seek_controller.dragging:
+            return
+        position = self.progress_position(event)
+        if position is not None:
+            self.seek_controller.drag(position)
+    
+    def preview_seek_position(self, position):
+        """Desenha a barra e o tempo na posição que está sendo arrastada"""
+        width = self.progress_canvas.winfo_width()
+        self.progress_canvas.coords(self.progress_bar, 0, 0,
+                                    width * position / self.song_length, 6)
+        self.time_label.config(
+            text=f"{format_duration(position)} / {format_duration(self.song_length)}")
+    
+    def seek_music(self, event):
+        """Ao soltar o botão, busca a posição uma única vez sem recarregar a música"""
+        self.is_seeking = False
+        self.progress.reset()  # A prévia desenhou por fora do controle de redesenho
+        music = self.engine.current_music()
+        if not music or not self.seek_controller.dragging:
+            self.seek_controller.dragging = False
+            return
+        self.seek_controller.release(music['path'])
+    
+    def poll_playback(self):
+        """Fim de faixa, troca sem intervalo e pré-carregamento ficam com o motor"""
+        self.engine.poll()
+        self.root.after(self.PLAYBACK_POLL_MS, self.poll_playback)
+    
+    def pump_commands(self):
+        """Executa na thread do Tk o que as threads de fundo enfileiraram"""
+        if self.commands.pending:
+            self.commands.drain()
+        self.root.after(self.COMMAND_POLL_MS, self.pump_commands)
+    
+    def update_progress(self):
+        """Atualiza barra e tempo e dorme até o próximo pixel/segundo mudar"""
+        hidden = self.root.state() == 'iconic'
+        show_bar = not self.is_mini_mode
+        width = self.progress_canvas.winfo_width()
+        position = self.engine.position()
+        if not hidden and not self.is_seeking:
+            self.progress.update(position, self.song_length, width, show_bar=show_bar)
+        delay = self.progress.next_delay_ms(position, self.song_length, width,
+                                            playing=self.is_playing and not self.is_paused,
+                                            show_bar=show_bar, hidden=hidden)
+        self.progress_after_id = self.root.after(delay, self.update_progress)
+    
+    def refresh_progress(self, event=None):
+        """Redesenha já, sem esperar o timer (troca de faixa, pausa, busca, janela restaurada)"""
+        if event is not None and event.widget is not self.root:
+            return
+        if self.progress_after_id:
+            self.root.after_cancel(self.progress_after_id)
+        self.update_progress()
+    
+    def draw_progress_bar(self, pixel):
+        self.progress_canvas.coords(self.progress_bar, 0, 0, pixel, 6)
+    
+    def draw_time_label(self, second, length):
+        self.time_label.config(text=f"{format_duration(second)} / {format_duration(length)}")
+    
+    def on_track_change(self, index):
+        """Uma faixa começou (escolhida ou emendada): atualiza a tela"""
+        music = self.music_loader.get_music_by_index(index)
+        self.current_song_label.config(text=music['name'])
+        self.update_transport_buttons()
+        
+        if self.visible_indices is None:
+            self.music_listbox.selection_clear(0, tk.END)
+            self.music_listbox.selection_set(index)
+            self.music_listbox.see(index)
+        if not self.song_length:
+            self.read_duration_async(music)
+        self.save_session(background=True)
+    
+    def read_duration_async(self, music):
+        """Lê a duração desconhecida numa thread e a entrega pela fila de comandos"""
+        def read():
+            duration = get_duration(music['path'])
+            if duration:
+                music['duration'] = duration
+                self.commands.push('song_length', music)
+        
+        threading.Thread(target=read, daemon=True).start()
+    
+    def engine_song_length(self, music):
+        """Duração lida em segundo plano (thread do Tk): atualiza a barra de progresso"""
+        self.engine.refresh_song_length(music)
+    
+    def on_track_end(self, music, seconds):
+        """Uma faixa deixou de tocar: registra no histórico o tempo realmente ouvido"""
+        self.history_manager.add_entry(music['path'], music['name'], seconds)
+    
+    def update_transport_buttons(self):
+        """Botões de play e aleatório refletindo o estado do motor"""
+        playing = self.is_playing and not self.is_paused
+        self.play_btn.config(text="⏸" if playing else "▶")
+        self.shuffle_btn.config(bg="#1DB954" if self.shuffle_mode else "#282828")
+        self.refresh_progress()
+    
+    def play_pause(self):
+        """Toca, pausa ou retoma"""
+        self.engine.play_pause()
+    
+    def next_song(self):
+        """Próxima música"""
+        self.engine.next()
+    
+    def previous_song(self):
+        """Música anterior"""
+        self.engine.previous()
+    
+    def on_song_double_click(self, event=None):
+        """Toca a música clicada (durante a busca a linha aponta para o índice real)"""
+        selection = self.music_listbox.curselection()
+        if not selection:
+            return
+        row = selection[0]
+        index = self.visible_indices[row] if self.visible_indices is not None else row
+        self.engine.play_track(index)
+    
+    def toggle_shuffle(self):
+        """Liga/desliga o modo aleatório"""
+        self.engine.set_shuffle(not self.shuffle_mode)
+        self.config_manager.set('shuffle_enabled', self.shuffle_mode)
+    
+    def toggle_mute(self):
+        """Ativa/desativa o mudo"""
+        self.engine.toggle_mute()
+        self.volume_slider.set(round(self.volume * 100))
+        self.volume_label.config(text=f"{round(self.volume * 100)}%")
+    
+    def enqueue_track(self, path):
+        """Põe uma música para tocar a seguir (entra no fim da lista se não estiver nela)"""
+        path = os.path.abspath(path)
+        if (os.path.splitext(path)[1].lower() not in MusicLoader.SUPPORTED_FORMATS
+                or not os.path.isfile(path)):
+            print(f"⚠️  Não é uma música suportada: {path}")
+            return
+        appended = self.music_loader.index_of_path(path) < 0
+        self.engine.enqueue(path)
+        if appended and self.visible_indices is None:
+            self.display_music_list(self.music_loader.get_music_list(), keep_position=True)
+    
+    def on_remote_command(self, command, value):
+        """Comando de outra execução (thread do servidor): valida e enfileira para o Tk"""
+        if command not in self.REMOTE_COMMANDS:
+            return False
+        if command == 'volume' and not isinstance(value, int):
+            return False
+        if command == 'enqueue' and not isinstance(value, str):
+            return False
+        self.commands.push(command, value)
+        return True
+    
+    def show_window(self, value=None):
+        """Traz a janela para frente (nova execução sem comandos)"""
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+    
+    def session_state(self):
+        """Estado salvo no instantâneo da sessão"""
+        state = self.engine.session_state()
+        state['source'] = self.music_loader.current_folder
+        state['tracks'] = self.music_loader.get_music_list()
+        return state
+    
+    def save_session(self, background=False):
+        """Grava o instantâneo da sessão (ao fechar e a cada troca de faixa)"""
+        if self.loading_batches is not None or not self.music_loader.get_music_list():
+            return  # Lista incompleta ou vazia: mantém o último instantâneo
+        if background:
+            self.session_store.save_async(self.session_state())
+        else:
+            self.session_store.save(self.session_state())
+    
+    def restore_session(self):
+        """Restaura lista, música atual, posição e fila aleatória da última sessão"""
+        session = self.session_store.load()
+        if not session or not len(session['tracks']):
+            return
+        source = session['source']
+        music_list = self.music_loader.load_tracks(source, session['tracks'])
+        count = len(music_list)
+        if source and not source.startswith('playlist:'):
+            self.current_folder = source
+            # Mudanças feitas com o app fechado chegam pela reconciliação em segundo plano
+            self.music_loader.reconcile_async(source, on_update=self.schedule_library_update)
+            self.folder_watcher.watch(source, self.music_loader.reconciled)
+        
+        self.display_music_list(music_list)
+        self.enrich_music_list(music_list)
+        
+        self.engine.restore_session(session)
+        index = self.current_index
+        if 0 <= index < count:
+            music = music_list[index]
+            self.current_song_label.config(text=music['name'])
+            self.time_label.config(text=f"{format_duration(self.engine.position())} / "
+                                        f"{format_duration(self.song_length)}")
+            self.music_listbox.selection_set(index)
+            self.music_listbox.see(index)
+    
+    def change_volume(self, value):
+        """Slider de volume: aplica na hora; a gravação da configuração fica para depois"""
+        volume = int(float(value))
+        if self.is_muted and volume == 0:
+            return  # Slider movido pelo mudo: o volume salvo continua o de antes
+        self.engine.set_volume(volume / 100)
+        self.volume_label.config(text=f"{volume}%")
+        self.config_manager.set('volume', volume)
+    
+    def change_volume_by(self, steps):
+        """Sobe/desce o volume em VOLUME_STEP por passo (toques seguidos chegam somados)"""
+        volume = max(0, min(100, round(self.volume * 100) + steps * self.VOLUME_STEP))
+        self.volume_slider.set(volume)
+        self.change_volume(volume)
+    
+    def setup_media_keys(self):
+        """
+        Atalhos de teclado da janela (espaço, setas, M)
+        
+        Com a lista de músicas em foco, as setas para cima/baixo movem a
+        seleção (a lista interrompe o evento); na busca, nada é interceptado.
+        """
+        shortcuts = {
+            '<space>': self.play_pause,
+            '<Right>': self.next_song,
+            '<Left>': self.previous_song,
+            '<Up>': lambda: self.change_volume_by(1),
+            '<Down>': lambda: self.change_volume_by(-1),
+            '<m>': self.toggle_mute,
+            '<M>': self.toggle_mute,
+        }
+        for sequence, action in shortcuts.items():
+            self.root.bind(sequence, lambda event, action=action: self.on_shortcut(event, action))
+    
+    def on_shortcut(self, event, action):
+        if isinstance(event.widget, tk.Entry):
+            return  # Digitando na busca
+        action()
+    
+    def on_close(self):
+        """Fecha o aplicativo gravando as configurações pendentes"""
+        self.save_session()
+        self.media_listener.stop()
+        self.control_server.stop()
+        self.folder_watcher.stop()
+        self.metadata_extractor.shutdown()
+        self.config_manager.flush()
+        self.engine.close()  # Registra o tempo ouvido da faixa atual no histórico
+        if self.history.loaded:
+            self.history_manager.close()
+        self.root.destroy()
+    
+    def show_history(self):
+        """Janela com as últimas músicas tocadas e as estatísticas de escuta"""
+        stats = self.history_manager.stats
+        window = tk.Toplevel(self.root)
+        window.title("Histórico e Estatísticas")
+        window.geometry("520x560")
+        window.configure(bg="#121212")
+        
+        weekdays = ['segunda', 'terça', 'quarta', 'quinta', 'sexta', 'sábado', 'domingo']
+        hour = stats.busiest_hour()
+        weekday = stats.busiest_weekday()
+        summary = (f"▶️  {stats.total_plays} reproduções · {len(stats.tracks)} músicas\n"
+                   f"⏱️  {format_duration(stats.total_time)} ouvidos")
+        if hour is not None:
+            summary += f"\n🕒 Horário preferido: {hour:02d}h · dia: {weekdays[weekday]}"
+        tk.Label(window, text=summary, justify=tk.LEFT, font=("Arial", 11),
+                 bg="#121212", fg="white").pack(anchor=tk.W, padx=15, pady=(15, 10))
+        
+        sections = [
+            ("🏆 Mais tocadas", [f"{t['play_count']:>4}×  {t['name']}"
+                                for t in stats.top_tracks(10)]),
+            ("🕘 Tocadas recentemente", [entry['name']
+                                        for entry in self.history_manager.get_history(20)]),
+        ]
+        for title, rows in sections:
+            tk.Label(window, text=title, font=("Arial", 12, "bold"),
+                     bg="#121212", fg="#1DB954").pack(anchor=tk.W, padx=15, pady=(10, 5))
+            listbox = tk.Listbox(window, height=min(10, max(1, len(rows))),
+                                 bg="#282828", fg="white", font=("Arial", 10),
+                                 borderwidth=0, highlightthickness=0,
+                                 selectbackground="#1DB954")
+            listbox.pack(fill=tk.X, padx=15)
+            for row in rows or ["Nenhuma música tocada ainda"]:
+                listbox.insert(tk.END, row)
     
     def toggle_repeat(self):
         """Alterna entre modos de repetição: off -> one -> all -> off"""
-        modes = ['off', 'one', 'all']
-        current_idx = modes.index(self.repeat_mode)
-        self.repeat_mode = modes[(current_idx + 1) % len(modes)]
+        self.engine.cycle_repeat()
         self.config_manager.set('repeat_mode', self.repeat_mode)
         
         # Atualiza visual do botão
@@ -500,39 +908,243 @@ class MusicPlayer:
         if folder_path:
             self.current_folder = folder_path
             self.config_manager.set('last_folder', folder_path)
-            music_list = self.music_loader.load_folder(folder_path)
-            
-            # Atualiza a listbox com animação suave
-            self.music_listbox.delete(0, tk.END)
-            for i, music in enumerate(music_list):
-                # Adiciona número da música para melhor visualização
-                display_name = f"{i+1:03d}. {music['name']}"
-                self.music_listbox.insert(tk.END, display_name)
-            
-            if music_list:
-                # Pergunta se deseja salvar como playlist
-                if folder_path and not self.config_manager.get('last_folder') == folder_path:
-                    save = messagebox.askyesno("Salvar Playlist", 
-                                              f"✅ {len(music_list)} música(s) carregada(s)!\n\n"
-                                              "Deseja salvar esta pasta como playlist?")
-                    if save:
-                        name = simpledialog.askstring("Nome da Playlist", 
-                                                     "Digite um nome para a playlist:",
-                                                     initialvalue=Path(folder_path).name)
-                        if name:
-                            if self.playlist_manager.add_playlist(folder_path, name):
-                                self.load_saved_playlists()
-                                messagebox.showinfo("Sucesso", "✅ Playlist salva!")
-            else:
-                messagebox.showwarning("Aviso", "⚠️ Nenhuma música encontrada na pasta!")
+            self.open_folder(folder_path, on_done=self.on_folder_loaded)
+    
+    def on_folder_loaded(self, folder_path, music_list):
+        """Chamado quando a pasta escolhida terminou de carregar"""
+        if music_list:
+            # Pergunta se deseja salvar como playlist
+            if folder_path and not self.config_manager.get('last_folder') == folder_path:
+                save = messagebox.askyesno("Salvar Playlist", 
+                                          f"✅ {len(music_list)} música(s) carregada(s)!\n\n"
+                                          "Deseja salvar esta pasta como playlist?")
+                if save:
+                    name = simpledialog.askstring("Nome da Playlist", 
+                                                 "Digite um nome para a playlist:",
+                                                 initialvalue=Path(folder_path).name)
+                    if name:
+                        if self.playlist_manager.add_playlist(folder_path, name):
+                            self.load_saved_playlists()
+                            messagebox.showinfo("Sucesso", "✅ Playlist salva!")
+        else:
+            messagebox.showwarning("Aviso", "⚠️ Nenhuma música encontrada na pasta!")
+    
+    def open_folder(self, folder_path, on_done=None):
+        """
+        Mostra as músicas de uma pasta sem travar a interface
+        
+        Pastas já indexadas aparecem na hora; as demais são carregadas em lotes
+        (streaming) e on_done(pasta, músicas) é chamado quando terminar.
+        """
+        self.loading_batches = None
+        
+        if self.library_index.has_folder(folder_path):
+            music_list = self.music_loader.load_folder(folder_path,
+                                                       on_update=self.schedule_library_update)
+            # A foto do monitor sai do índice depois da reconciliação
+            self.folder_watcher.watch(folder_path, self.music_loader.reconciled)
+            self.engine.reset_shuffle(keep_current=False)
+            self.display_music_list(music_list)
+            self.enrich_music_list(music_list)
+            if on_done:
+                on_done(folder_path, music_list)
+            return
+        
+        self.loading_batches = self.music_loader.iter_folder(folder_path,
+                                                             batch_size=self.STREAM_BATCH_SIZE)
+        self.folder_watcher.stop()  # Volta a monitorar quando o índice estiver completo
+        self.music_listbox.set_model(
+            0, lambda i: self.format_music_row(self.music_loader.get_music_list(), i))
+        self.root.after(0, self.pump_folder_batches, self.loading_batches, folder_path, on_done)
+    
+    def pump_folder_batches(self, batches, folder_path, on_done):
+        """Anexa à listbox o próximo lote do carregamento em streaming"""
+        if batches is not self.loading_batches:
+            return  # Outra pasta foi aberta nesse meio tempo
+        
+        # Guarda o caminho: a ordenação final reorganiza a tabela no lugar
+        current = self.music_loader.get_music_by_index(self.current_index)
+        current_path = current['path'] if current else None
+        try:
+            batch = next(batches)
+        except StopIteration:
+            # Lista completa e ordenada: redesenha mantendo a música atual
+            self.loading_batches = None
+            self.folder_watcher.watch(folder_path)
+            music_list = self.music_loader.get_music_list()
+            if current_path:
+                self.current_index = self.music_loader.index_of_path(current_path)
+            self.engine.reset_shuffle()
+            self.display_music_list(music_list)
+            self.enrich_music_list(music_list)
+            if on_done:
+                on_done(folder_path, music_list)
+            return
+        
+        if batch:
+            self.music_listbox.append_rows(len(batch))
+        
+        self.root.after(self.STREAM_INTERVAL_MS, self.pump_folder_batches,
+                        batches, folder_path, on_done)
+    
+    def enrich_music_list(self, music_list):
+        """Lê as tags em segundo plano e reindexa a busca com artista/álbum"""
+        self.rebuild_search_index(music_list)
+        self.metadata_extractor.enrich(music_list,
+                                       on_done=lambda: self.on_metadata_done(music_list))
+    
+    def on_metadata_done(self, music_list):
+        """Tags lidas (thread de fundo): reindexa a busca e guarda as durações no índice"""
+        self.rebuild_search_index(music_list)
+        self.library_index.store_durations(music_list)
+        self.commands.push('list_summary')  # Total de tempo agora conhecido
+    
+    def rebuild_search_index(self, music_list):
+        """Reconstrói o índice de busca numa thread e troca quando estiver pronto"""
+        def build():
+            index = SearchIndex(music_list)
+            if music_list is self.music_loader.get_music_list():
+                self.search_index = index
+        
+        threading.Thread(target=build, daemon=True).start()
+    
+    def on_search(self, event=None):
+        """Agenda a busca a cada tecla (debounce para não filtrar a cada evento)"""
+        if self.search_after_id:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(self.SEARCH_DEBOUNCE_MS, self.run_search)
+    
+    def run_search(self):
+        """Filtra a listbox usando o índice de busca"""
+        self.search_after_id = None
+        query = self.search_entry.get()
+        if query == "🔍 Buscar...":
+            query = ''
+        if query == self.search_query:
+            return
+        self.search_query = query
+        
+        music_list = self.music_loader.get_music_list()
+        if not query.strip():
+            self.display_music_list(music_list)
+            return
+        
+        if self.search_index.source is not music_list:
+            # Índice da lista atual ainda não ficou pronto em segundo plano
+            self.search_index = SearchIndex(music_list)
+        
+        indices = self.search_index.search(query, limit=self.SEARCH_LIMIT)
+        self.visible_indices = indices
+        self.music_listbox.set_model(len(indices),
+                                     lambda row: self.format_music_row(music_list, indices[row]))
+    
+    @staticmethod
+    def format_music_row(music_list, index):
+        """Texto de uma linha da lista de músicas"""
+        # Adiciona número da música para melhor visualização
+        music = music_list[index]
+        if music.get('missing'):
+            return f"{index+1:03d}. ⚠️ {music['name']} (arquivo não encontrado)"
+        return f"{index+1:03d}. {music['name']}"
+    
+    def display_music_list(self, music_list, keep_position=False):
+        """Mostra a lista de músicas (a listbox só desenha as linhas visíveis)"""
+        self.visible_indices = None
+        self.search_query = ''
+        self.music_listbox.set_model(len(music_list),
+                                     lambda i: self.format_music_row(music_list, i),
+                                     keep_position=keep_position)
+        self.update_list_summary()
+    
+    def update_list_summary(self, value=None):
+        """Mostra quantidade e duração total da lista (sem acessar os arquivos)"""
+        count = len(self.music_loader.get_music_list())
+        total = format_duration(self.music_loader.get_total_duration())
+        self.list_label.config(text=f"📚 Biblioteca de Músicas · {count} músicas · {total}")
+    
+    def schedule_library_update(self, folder_path, music_list):
+        """Recebe a reconciliação do índice (thread de fundo) e repassa para o Tk"""
+        self.commands.push('library_update', (folder_path, music_list))
+    
+    def apply_library_update(self, folder_path, music_list):
+        """Aplica a lista reconciliada mantendo a música atual selecionada"""
+        old_list = self.music_loader.get_music_list()
+        current = self.music_loader.get_music_by_index(self.current_index)
+        if not self.music_loader.set_music_list(folder_path, music_list):
+            return
+        
+        if current:
+            self.current_index = self.music_loader.index_of_path(current['path'])
+        self.engine.remap_shuffle(old_list, self.music_loader.get_music_list())
+        self.display_music_list(self.music_loader.get_music_list(), keep_position=True)
+        self.enrich_music_list(music_list)
+    
+    def schedule_folder_changes(self, folder_path, changes):
+        """Recebe as mudanças do monitor de pasta (thread de fundo) e repassa para o Tk"""
+        self.commands.push('folder_changes', (folder_path, changes))
+    
+    def apply_folder_changes(self, folder_path, changes):
+        """Atualiza a lista com as músicas adicionadas/removidas/renomeadas na pasta"""
+        if self.loading_batches is not None:
+            return  # Carregamento em andamento já vai trazer o estado atual
+        current = self.music_loader.get_music_by_index(self.current_index)
+        current_path = current['path'] if current else None
+        old_list = self.music_loader.get_music_list()
+        if not self.music_loader.apply_changes(folder_path, changes):
+            return
+        
+        renamed = {old_path: music['path'] for old_path, music in changes.renamed}
+        current_path = renamed.get(current_path, current_path)
+        if current_path:
+            self.current_index = self.music_loader.index_of_path(current_path)
+        self.engine.remap_shuffle(old_list, self.music_loader.get_music_list(), renamed)
+        
+        music_list = self.music_loader.get_music_list()
+        if self.visible_indices is None:
+            self.display_music_list(music_list, keep_position=True)
+        else:
+            # Refaz a busca atual sobre a lista nova
+            self.search_query = None
+            self.run_search()
+            self.update_list_summary()
+        self.enrich_music_list(music_list)
     
     def load_saved_playlists(self):
         """Carrega playlists salvas na listbox"""
         self.playlist_listbox.delete(0, tk.END)
         playlists = self.playlist_manager.get_playlists()
-        for playlist in playlists:
-            display_name = f"🎵 {playlist['name']}"
-            self.playlist_listbox.insert(tk.END, display_name)
+        for index, playlist in enumerate(playlists):
+            self.playlist_listbox.insert(tk.END, "")
+            self.update_playlist_row(index, playlist)
+        # Playlists de faixas vêm depois das pastas
+        for playlist in self.track_playlists.list_playlists():
+            self.playlist_listbox.insert(tk.END, f"📄 {playlist['name']} ({playlist['count']})")
+    
+    def update_playlist_row(self, index, playlist):
+        """Mostra a playlist marcando as pastas indisponíveis"""
+        if self.playlist_manager.is_available(playlist['path']) is False:
+            text, color = f"⚠️ {playlist['name']} (indisponível)", "#808080"
+        else:
+            text, color = f"🎵 {playlist['name']}", "white"
+        self.playlist_listbox.delete(index)
+        self.playlist_listbox.insert(index, text)
+        self.playlist_listbox.itemconfig(index, fg=color)
+    
+    def schedule_playlist_status(self, path, available):
+        """Recebe o resultado da verificação (thread de fundo) e repassa para o Tk"""
+        self.commands.push('playlist_status', path)
+    
+    def apply_playlist_status(self, path):
+        """Atualiza a linha da playlist verificada (e abre a que estava esperando)"""
+        for index, playlist in enumerate(self.playlist_manager.get_playlists()):
+            if playlist['path'] == path:
+                self.update_playlist_row(index, playlist)
+        if path == self.pending_playlist:
+            self.pending_playlist = None
+            if self.playlist_manager.is_available(path):
+                self.load_playlist(path)
+            else:
+                messagebox.showwarning("Aviso", "⚠️ A pasta desta playlist está indisponível!")
     
     def on_playlist_select(self, event):
         """Evento quando uma playlist é selecionada"""
@@ -547,24 +1159,118 @@ class MusicPlayer:
             if index < len(playlists):
                 playlist = playlists[index]
                 self.load_playlist(playlist['path'])
+            else:
+                track_playlist = self.selected_track_playlist()
+                if track_playlist:
+                    self.load_track_playlist(track_playlist)
+    
+    def selected_track_playlist(self):
+        """Playlist de faixas selecionada no painel (None se for uma pasta)"""
+        selection = self.playlist_listbox.curselection()
+        if not selection:
+            return None
+        index = selection[0] - len(self.playlist_manager.get_playlists())
+        track_playlists = self.track_playlists.list_playlists()
+        if 0 <= index < len(track_playlists):
+            return track_playlists[index]
+        return None
+    
+    def load_track_playlist(self, playlist):
+        """Mostra uma playlist de faixas direto do índice (sem escanear pastas)"""
+        self.loading_batches = None
+        self.folder_watcher.stop()
+        source = f"playlist:{playlist['id']}"
+        self.current_playlist = source
+        music_list = self.music_loader.load_tracks(
+            source, self.track_playlists.load_tracks(playlist['id']))
+        self.engine.reset_shuffle(keep_current=False)
+        self.display_music_list(music_list)
+        self.enrich_music_list(music_list)
+        self.root.title(f"Music Player - {playlist['name']}")
+        
+        # Existência dos arquivos verificada depois, em segundo plano
+        def check():
+            missing = TrackPlaylistStore.find_missing(
+                music_list, should_stop=lambda: music_list is not self.music_loader.get_music_list())
+            if missing:
+                self.commands.push('missing_tracks', (music_list, missing))
+        
+        threading.Thread(target=check, daemon=True).start()
+    
+    def mark_missing_tracks(self, music_list, missing):
+        """Marca na lista as faixas cujo arquivo não existe mais"""
+        if music_list is not self.music_loader.get_music_list():
+            return
+        for index in missing:
+            music_list[index]['missing'] = True
+        self.music_listbox.redraw()
+    
+    def import_track_playlist(self):
+        """Importa um arquivo M3U/M3U8/PLS como playlist de faixas"""
+        path = filedialog.askopenfilename(
+            title="Importar playlist",
+            filetypes=[("Playlists", "*.m3u *.m3u8 *.pls"), ("Todos os arquivos", "*.*")])
+        if not path:
+            return
+        try:
+            playlist_id = self.track_playlists.import_file(path)
+        except Exception as e:
+            messagebox.showerror("Erro", f"❌ Não foi possível importar a playlist:\n{e}")
+            return
+        self.load_saved_playlists()
+        for playlist in self.track_playlists.list_playlists():
+            if playlist['id'] == playlist_id:
+                self.load_track_playlist(playlist)
+    
+    def export_track_playlist(self):
+        """Exporta a playlist de faixas selecionada"""
+        playlist = self.selected_track_playlist()
+        if not playlist:
+            messagebox.showwarning("Aviso", "⚠️ Selecione uma playlist importada para exportar!")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Exportar playlist", defaultextension=".m3u8",
+            initialfile=playlist['name'],
+            filetypes=[("M3U8", "*.m3u8"), ("M3U", "*.m3u"), ("PLS", "*.pls")])
+        if not path:
+            return
+        try:
+            self.track_playlists.export_file(playlist['id'], path)
+        except Exception as e:
+            print(f"Erro ao exportar playlist: {e}")
+            messagebox.showerror("Erro", f"❌ Não foi possível exportar a playlist:\n{e}")
+            return
+        messagebox.showinfo("Sucesso", "✅ Playlist exportada!")
     
     def load_playlist(self, path: str):
-        """Carrega músicas de uma playlist específica"""
-        if os.path.exists(path):
-            self.current_folder = path
-            self.current_playlist = path
-            music_list = self.music_loader.load_folder(path)
-            
-            # Atualiza a listbox
-            self.music_listbox.delete(0, tk.END)
-            for i, music in enumerate(music_list):
-                display_name = f"{i+1:03d}. {music['name']}"
-                self.music_listbox.insert(tk.END, display_name)
-            
-            # Atualiza título
-            playlist_info = self.playlist_manager.get_playlist_by_path(path)
-            if playlist_info:
-                self.root.title(f"Music Player - {playlist_info['name']}")
+        """
+        Carrega músicas de uma playlist específica
+        
+        Só usa a disponibilidade já verificada em segundo plano: nada aqui toca
+        no disco (um drive de rede travado congelaria a interface).
+        """
+        available = self.playlist_manager.is_available(path)
+        if available is None:
+            # Verificação pendente: a playlist abre quando o resultado chegar
+            self.pending_playlist = path
+            self.playlist_manager.validate_path_async(path, self.schedule_playlist_status)
+            return
+        if available is False:
+            messagebox.showwarning("Aviso", "⚠️ A pasta desta playlist está indisponível!")
+            # Verifica de novo: o drive pode ter sido montado nesse meio tempo
+            self.playlist_manager.validate_path_async(path, self.schedule_playlist_status)
+            return
+        self.pending_playlist = None
+        self.current_folder = path
+        self.current_playlist = path
+        
+        # Atualiza a listbox
+        self.open_folder(path)
+        
+        # Atualiza título
+        playlist_info = self.playlist_manager.get_playlist_by_path(path)
+        if playlist_info:
+            self.root.title(f"Music Player - {playlist_info['name']}")
     
     def add_new_playlist(self):
         """Adiciona uma nova playlist"""
@@ -590,7 +1296,17 @@ class MusicPlayer:
         
         index = selection[0]
         playlists = self.playlist_manager.get_playlists()
-        if index < len(playlists):
+        track_playlist = self.selected_track_playlist()
+        if track_playlist:
+            if messagebox.askyesno("Confirmar", f"Remover a playlist '{track_playlist['name']}'?\n\n"
+                                   "(As músicas não serão deletadas)"):
+                self.track_playlists.delete(track_playlist['id'])
+                self.load_saved_playlists()
+                if self.current_playlist == f"playlist:{track_playlist['id']}":
+                    self.music_listbox.clear()
+                    self.current_playlist = None
+                    self.root.title("Music Player - Estilo Spotify")
+        elif index < len(playlists):
             playlist = playlists[index]
             confirm = messagebox.askyesno("Confirmar", 
                                          f"Remover a playlist '{playlist['name']}'?\n\n"
@@ -600,6 +1316,6 @@ class MusicPlayer:
                 self.load_saved_playlists()
                 
                 if self.current_playlist == playlist['path']:
-                    self.music_listbox.delete(0, tk.END)
+                    self.music_listbox.clear()
                     self.current_playlist = None
                     self.root.title("Music Player - Estilo Spotify")
@@ -0,0 +1,294 @@
+"""
+Lista virtualizada para a biblioteca de músicas
+Desenha só as linhas visíveis num Canvas, então o custo não depende do tamanho da lista
+"""
+import tkinter as tk
+
+def visible_range(first_row: int, height: int, row_height: int, count: int):
+    """
+    Intervalo de linhas do modelo que cabem na área visível
+
+    Returns:
+        Tupla (primeira, última + 1)
+    """
+    rows = max(1, height // row_height + 1)
+    start = max(0, min(first_row, count - 1))
+    return start, min(count, start + rows)
+
+class ListViewport:
+    """
+    Rolagem e seleção da lista em índices do modelo (sem Tk)
+
+    Guarda a primeira linha visível, a linha selecionada e a altura da área
+    visível; o VirtualListbox só desenha o que ela indicar.
+    """
+
+    def __init__(self, row_height: int, height: int = 1):
+        self.row_height = row_height
+        self.height = height
+        self.row_count = 0
+        self.first_row = 0
+        self.selected = None
+
+    @property
+    def visible_rows(self) -> int:
+        """Linhas inteiras que cabem na área visível"""
+        return max(1, self.height // self.row_height)
+
+    def visible(self):
+        return visible_range(self.first_row, self.height, self.row_height, self.row_count)
+
+    def set_count(self, count: int, keep_position=False):
+        """Troca o modelo (keep_position mantém rolagem e seleção se ainda couberem)"""
+        self.row_count = count
+        if not keep_position:
+            self.first_row = 0
+            self.selected = None
+        elif self.selected is not None and self.selected >= count:
+            self.selected = None
+
+    def append(self, count: int) -> bool:
+        """Linhas novas no fim; True se alguma delas aparece na tela"""
+        old_count = self.row_count
+        self.row_count += count
+        _, end = visible_range(self.first_row, self.height, self.row_height, old_count)
+        return end >= old_count
+
+    def select(self, index: int) -> bool:
+        if 0 <= index < self.row_count:
+            self.selected = index
+            return True
+        return False
+
+    def see(self, index: int):
+        """Rola o mínimo necessário para a linha ficar visível"""
+        if index < self.first_row:
+            self.first_row = index
+        elif index >= self.first_row + self.visible_rows:
+            self.first_row = index - self.visible_rows + 1
+
+    def nearest(self, y) -> int:
+        """Linha do modelo na coordenada y da área visível"""
+        if not self.row_count:
+            return -1
+        return min(self.row_count - 1, self.first_row + max(0, int(y)) // self.row_height)
+
+    def max_first_row(self) -> int:
+        return max(0, self.row_count - self.visible_rows)
+
+    def scroll(self, rows: int):
+        self.first_row = max(0, min(self.max_first_row(), self.first_row + rows))
+
+    def moveto(self, fraction: float):
+        self.first_row = int(fraction * self.row_count)
+        self.first_row = max(0, min(self.max_first_row(), self.first_row))
+
+    def page_rows(self) -> int:
+        """Linhas puladas por página (uma fica repetida para dar contexto)"""
+        return max(1, self.visible_rows - 1)
+
+    def fractions(self):
+        """Fração (início, fim) visível, no formato da Scrollbar"""
+        if not self.row_count:
+            return 0.0, 1.0
+        visible_rows = self.height / self.row_height
+        first = self.first_row / self.row_count
+        return first, min(1.0, (self.first_row + visible_rows) / self.row_count)
+
+    def move_selection(self, delta: int) -> bool:
+        """
+        Move a seleção delta linhas (setas/páginas) e rola até ela
+
+        Sem seleção, começa da primeira linha visível. Returns: True se mudou
+        """
+        if not self.row_count:
+            return False
+        current = self.first_row if self.selected is None else self.selected + delta
+        index = max(0, min(self.row_count - 1, current))
+        changed = index != self.selected
+        self.selected = index
+        self.see(index)
+        return changed
+
+class VirtualListbox(tk.Frame):
+    """
+    Substituto do tk.Listbox para listas enormes
+
+    O conteúdo vem de um modelo (quantidade + função que gera o texto da linha).
+    Só existe um conjunto fixo de itens no Canvas, reaproveitado ao rolar, e a
+    posição de rolagem e a seleção ficam guardadas como índices do modelo
+    (ListViewport). Setas, Page Up/Down, Home e End movem a seleção como no
+    tk.Listbox.
+    """
+
+    def __init__(self, master, row_height=24, bg="#282828", fg="white",
+                 font=("Arial", 11), selectbackground="#1DB954",
+                 selectforeground="white", scrollbar_bg="#282828",
+                 troughcolor="#181818"):
+        super().__init__(master, bg=bg)
+        self.row_height = row_height
+        self.fg = fg
+        self.font = font
+        self.selectbackground = selectbackground
+        self.selectforeground = selectforeground
+
+        self.viewport = ListViewport(row_height)
+        self.get_row_text = lambda index: ""
+        self.text_items = []
+
+        self.scrollbar = tk.Scrollbar(self, bg=scrollbar_bg, troughcolor=troughcolor,
+                                      command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 5))
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0, borderwidth=0,
+                                takefocus=1)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.highlight = self.canvas.create_rectangle(0, 0, 0, 0, fill=selectbackground,
+                                                      outline="", state=tk.HIDDEN)
+
+        self.canvas.bind('<Configure>', self.on_configure)
+        self.canvas.bind('<Button-1>', self.on_click)
+        self.canvas.bind('<MouseWheel>', self.on_mousewheel)
+        self.canvas.bind('<Button-4>', lambda e: self.scroll_rows(-3))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll_rows(3))
+        self.canvas.bind('<Up>', lambda e: self.move_selection(-1))
+        self.canvas.bind('<Down>', lambda e: self.move_selection(1))
+        self.canvas.bind('<Prior>', lambda e: self.move_selection(-self.viewport.page_rows()))
+        self.canvas.bind('<Next>', lambda e: self.move_selection(self.viewport.page_rows()))
+        self.canvas.bind('<Home>', lambda e: self.move_selection(-self.viewport.row_count))
+        self.canvas.bind('<End>', lambda e: self.move_selection(self.viewport.row_count))
+
+    # --- Modelo ---------------------------------------------------------
+
+    def set_model(self, count: int, get_row_text, keep_position=False):
+        """
+        Troca o conteúdo da lista
+
+        Args:
+            count: Quantidade de linhas
+            get_row_text: Função índice -> texto da linha
+            keep_position: Mantém rolagem e seleção (se ainda couberem)
+        """
+        self.get_row_text = get_row_text
+        self.viewport.set_count(count, keep_position)
+        self.redraw()
+
+    def clear(self):
+        """Esvazia a lista"""
+        self.set_model(0, lambda index: "")
+
+    def append_rows(self, count: int):
+        """Informa que o modelo ganhou mais linhas no fim"""
+        if self.viewport.append(count):
+            self.redraw()
+        else:
+            self.update_scrollbar()
+
+    def size(self) -> int:
+        return self.viewport.row_count
+
+    # --- Compatibilidade com tk.Listbox ---------------------------------
+
+    def curselection(self):
+        selected = self.viewport.selected
+        return () if selected is None else (selected,)
+
+    def selection_clear(self, first=0, last=None):
+        self.viewport.selected = None
+        self.redraw()
+
+    def selection_set(self, index):
+        if self.viewport.select(index):
+            self.redraw()
+
+    def see(self, index):
+        """Rola o mínimo necessário para a linha ficar visível"""
+        self.viewport.see(index)
+        self.redraw()
+
+    def nearest(self, y) -> int:
+        """Linha do modelo na coordenada y do widget"""
+        return self.viewport.nearest(y)
+
+    def bind(self, sequence=None, func=None, add=None):
+        """Eventos de mouse/teclado chegam no Canvas interno"""
+        return self.canvas.bind(sequence, func, add)
+
+    # --- Rolagem --------------------------------------------------------
+
+    def scroll_rows(self, rows: int):
+        self.viewport.scroll(rows)
+        self.redraw()
+
+    def yview(self, *args):
+        """Comandos da Scrollbar ('moveto', fração) e ('scroll', n, unidade)"""
+        if not args:
+            return self.viewport.fractions()
+        if args[0] == 'moveto':
+            self.viewport.moveto(float(args[1]))
+            self.redraw()
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self.viewport.page_rows()
+            self.scroll_rows(amount)
+
+    def on_mousewheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def update_scrollbar(self):
+        self.scrollbar.set(*self.viewport.fractions())
+
+    # --- Teclado e mouse ------------------------------------------------
+
+    def move_selection(self, delta: int):
+        """Teclas de navegação: move a seleção (o "break" evita os atalhos da janela)"""
+        if self.viewport.move_selection(delta):
+            self.redraw()
+            self.event_generate('<<ListboxSelect>>')
+        return "break"
+
+    def on_click(self, event):
+        self.canvas.focus_set()
+        if self.viewport.select(self.viewport.nearest(event.y)):
+            self.redraw()
+            self.event_generate('<<ListboxSelect>>')
+
+    # --- Desenho --------------------------------------------------------
+
+    def on_configure(self, event):
+        self.viewport.height = event.height
+        self.redraw()
+
+    def redraw(self):
+        """Atualiza os itens do Canvas para as linhas visíveis"""
+        viewport = self.viewport
+        width = self.canvas.winfo_width()
+        start, end = viewport.visible()
+        rows = max(1, viewport.height // self.row_height + 1)
+
+        # Pool fixo de itens de texto, do tamanho da área visível
+        while len(self.text_items) < rows:
+            self.text_items.append(self.canvas.create_text(
+                10, 0, anchor=tk.W, font=self.font, fill=self.fg))
+        while len(self.text_items) > rows:
+            self.canvas.delete(self.text_items.pop())
+
+        for slot, item in enumerate(self.text_items):
+            index = start + slot
+            if index < end:
+                y = slot * self.row_height + self.row_height // 2
+                fill = self.selectforeground if index == viewport.selected else self.fg
+                self.canvas.coords(item, 10, y)
+                self.canvas.itemconfigure(item, text=self.get_row_text(index),
+                                          fill=fill, state=tk.NORMAL)
+            else:
+                self.canvas.itemconfigure(item, state=tk.HIDDEN)
+
+        if viewport.selected is not None and start <= viewport.selected < end:
+            top = (viewport.selected - start) * self.row_height
+            self.canvas.coords(self.highlight, 0, top, width, top + self.row_height)
+            self.canvas.itemconfigure(self.highlight, state=tk.NORMAL)
+        else:
+            self.canvas.itemconfigure(self.highlight, state=tk.HIDDEN)
+        self.canvas.tag_lower(self.highlight)
+        self.update_scrollbar()
@@ -2,13 +2,86 @@
 Reprodutor de Música - Estilo Spotify
 Aplicação para reproduzir músicas de uma pasta local
 """
+import argparse
+import os
 import sys
-from components.player import MusicPlayer
+import multiprocessing
+from utils.ipc import send_command
+
+def parse_args(argv=None):
+    """Opções de linha de comando (controle da instância aberta)"""
+    parser = argparse.ArgumentParser(description="Reprodutor de Música - Estilo Spotify")
+    parser.add_argument('--play-pause', action='store_true', help="Tocar/pausar")
+    parser.add_argument('--next', action='store_true', help="Próxima música")
+    parser.add_argument('--previous', action='store_true', help="Música anterior")
+    parser.add_argument('--volume-up', action='store_true', help="Aumentar o volume")
+    parser.add_argument('--volume-down', action='store_true', help="Diminuir o volume")
+    parser.add_argument('--mute', action='store_true', help="Ativar/desativar o mudo")
+    parser.add_argument('--enqueue', action='append', default=[], metavar='ARQUIVO',
+                        help="Tocar a música a seguir (pode repetir)")
+    parser.add_argument('--headless', action='store_true',
+                        help="Rodar sem janela (controle pelas opções acima)")
+    parser.add_argument('--null-audio', action='store_true',
+                        help="Sem saída de som: só simula a reprodução (com --headless)")
+    parser.add_argument('--folder', metavar='PASTA',
+                        help="Pasta a tocar no modo sem janela (padrão: última sessão)")
+    return parser.parse_args(argv)
+
+def remote_commands(args):
+    """Converte as opções em comandos (nome, valor) para o player"""
+    commands = [('enqueue', os.path.abspath(path)) for path in args.enqueue]
+    if args.play_pause:
+        commands.append(('play_pause', None))
+    if args.next:
+        commands.append(('next', None))
+    if args.previous:
+        commands.append(('previous', None))
+    if args.volume_up:
+        commands.append(('volume', 1))
+    if args.volume_down:
+        commands.append(('volume', -1))
+    if args.mute:
+        commands.append(('mute', None))
+    return commands
+
+def forward_to_running_instance(commands):
+    """Envia os comandos para o player já aberto (False se não houver nenhum)"""
+    for command, value in commands or [('show', None)]:
+        reply = send_command(command, value)
+        if reply is None:
+            return False
+        if not reply.get('ok'):
+            print(f"⚠️  Comando recusado: {command} {reply.get('error', '')}".rstrip())
+    return True
 
 def main():
     """Função principal que inicializa o player"""
-    app = MusicPlayer()
+    args = parse_args()
+    commands = remote_commands(args)
+    if forward_to_running_instance(commands):
+        return
+
+    # Nenhuma instância aberta: inicia o player e aplica os comandos nele
+    if args.headless:
+        app = run_headless(args)
+    else:
+        from components.player import MusicPlayer
+        app = MusicPlayer()
+    for command, value in commands:
+        app.commands.push(command, value)
     app.run()
 
+def run_headless(args):
+    """Player sem janela com a pasta pedida ou a última sessão"""
+    from components.headless import HeadlessPlayer
+    app = HeadlessPlayer(null_audio=args.null_audio)
+    if args.folder:
+        app.load_folder(os.path.abspath(args.folder))
+    elif not app.restore_session():
+        print("⚠️  Nenhuma sessão salva: use --folder para escolher as músicas.")
+    return app
+
 if __name__ == "__main__":
+    # Necessário para o pool de processos de metadados no .exe (PyInstaller)
+    multiprocessing.freeze_support()
     main()
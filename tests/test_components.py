@@ -0,0 +1,172 @@
+"""
+Testes dos componentes de interface que não precisam de display
+Execute: python -m pytest tests/
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import components.player
+from components.player import MusicPlayer
+from components.virtual_list import ListViewport, visible_range
+from utils.commands import CommandQueue
+from utils.music_loader import MusicLoader
+from utils.track_table import TrackTable
+
+class FakeLabel:
+    """Label falso: guarda o último texto configurado"""
+    
+    def __init__(self):
+        self.text = None
+    
+    def config(self, text=None, **options):
+        self.text = text
+
+class TestVirtualList:
+    """Testes para a lista virtualizada"""
+    
+    def test_visible_range(self):
+        """Testa janela de linhas visíveis"""
+        assert visible_range(0, 240, 24, 500000) == (0, 11)
+        assert visible_range(1000, 240, 24, 500000) == (1000, 1011)
+    
+    def test_visible_range_near_end(self):
+        """Testa janela no fim da lista e lista vazia"""
+        assert visible_range(499995, 240, 24, 500000) == (499995, 500000)
+        assert visible_range(10, 240, 24, 0) == (0, 0)
+    
+    def test_window_size_does_not_depend_on_count(self):
+        """Testa que a quantidade de linhas desenhadas é constante"""
+        small = visible_range(0, 480, 24, 100)
+        huge = visible_range(0, 480, 24, 500000)
+        assert small[1] - small[0] == huge[1] - huge[0]
+
+class TestListViewport:
+    """Testes para a rolagem e seleção da lista (índices do modelo)"""
+    
+    def make_viewport(self, count=100):
+        viewport = ListViewport(row_height=24, height=240)  # 10 linhas visíveis
+        viewport.set_count(count)
+        return viewport
+    
+    def test_selection_in_model_coordinates(self):
+        """Testa que clique e seleção usam o índice do modelo, não a posição na tela"""
+        viewport = self.make_viewport()
+        viewport.scroll(50)
+        assert viewport.nearest(30) == 51
+        assert viewport.select(viewport.nearest(30))
+        assert viewport.selected == 51
+        assert not viewport.select(100)  # Fora do modelo
+        assert viewport.selected == 51
+        assert ListViewport(24).nearest(0) == -1
+    
+    def test_keep_position(self):
+        """Testa que trocar o modelo mantém (ou zera) rolagem e seleção"""
+        viewport = self.make_viewport()
+        viewport.scroll(40)
+        viewport.select(45)
+        viewport.set_count(120, keep_position=True)
+        assert (viewport.first_row, viewport.selected) == (40, 45)
+        viewport.set_count(30, keep_position=True)
+        assert viewport.selected is None
+        viewport.set_count(120)
+        assert (viewport.first_row, viewport.selected) == (0, None)
+    
+    def test_yview_moveto_and_scroll_limits(self):
+        """Testa a rolagem pela barra sem passar do fim da lista"""
+        viewport = self.make_viewport()
+        viewport.moveto(0.5)
+        assert viewport.first_row == 50
+        assert viewport.fractions() == (0.5, 0.6)
+        viewport.moveto(1.0)
+        assert viewport.first_row == 90  # Última página cheia
+        viewport.scroll(-200)
+        assert viewport.first_row == 0
+        assert ListViewport(24).fractions() == (0.0, 1.0)
+    
+    def test_see(self):
+        """Testa que see() rola o mínimo para mostrar a linha"""
+        viewport = self.make_viewport()
+        viewport.see(5)
+        assert viewport.first_row == 0
+        viewport.see(25)
+        assert viewport.first_row == 16
+        viewport.see(3)
+        assert viewport.first_row == 3
+    
+    def test_append_rows(self):
+        """Testa que só linhas novas visíveis pedem redesenho"""
+        viewport = self.make_viewport(count=3)
+        assert viewport.append(5)  # Lista curta: as novas aparecem
+        assert viewport.row_count == 8
+        viewport = self.make_viewport(count=100)
+        assert not viewport.append(500)  # Novas ficam abaixo da área visível
+        assert viewport.row_count == 600
+    
+    def test_keyboard_navigation(self):
+        """Testa setas, páginas, Home e End movendo a seleção e a rolagem"""
+        viewport = self.make_viewport()
+        viewport.scroll(20)
+        assert viewport.move_selection(1)
+        assert viewport.selected == 20  # Sem seleção: começa da primeira visível
+        viewport.move_selection(1)
+        assert viewport.selected == 21
+        viewport.move_selection(viewport.page_rows())
+        assert viewport.selected == 30
+        assert viewport.first_row == 21
+        viewport.move_selection(viewport.row_count)  # End
+        assert (viewport.selected, viewport.first_row) == (99, 90)
+        assert not viewport.move_selection(1)  # Já no fim
+        viewport.move_selection(-viewport.row_count)  # Home
+        assert (viewport.selected, viewport.first_row) == (0, 0)
+        assert not ListViewport(24).move_selection(1)
+
+class TestPlayerCommands:
+    """Testes dos comandos do player executados pela fila (sem criar a janela)"""
+    
+    def make_player(self):
+        player = MusicPlayer.__new__(MusicPlayer)
+        player.commands = CommandQueue()
+        player.register_commands()
+        player.music_loader = MusicLoader()
+        player.list_label = FakeLabel()
+        return player
+    
+    def test_list_summary_command_updates_label(self):
+        """Testa que o 'list_summary' enfileirado pelos metadados atualiza o total"""
+        player = self.make_player()
+        player.music_loader.load_tracks('/m', TrackTable([
+            {'path': f'/m/{i}.mp3', 'name': str(i), 'extension': '.mp3', 'folder': '/m',
+             'duration': 90.0} for i in range(2)]))
+        player.commands.push('list_summary')
+        player.commands.push('list_summary')
+        player.commands.drain()
+        assert player.list_label.text == "📚 Biblioteca de Músicas · 2 músicas · 03:00"
+        assert player.commands.executed == 1
+    
+    def test_export_failure_is_reported(self, tmp_path, monkeypatch):
+        """Testa que um erro ao exportar playlist vira mensagem em vez de exceção no Tk"""
+        class BrokenStore:
+            def export_file(self, playlist_id, path):
+                raise PermissionError("somente leitura")
+        
+        shown = []
+        monkeypatch.setattr(components.player.filedialog, 'asksaveasfilename',
+                            lambda **options: str(tmp_path / "lista.m3u8"))
+        monkeypatch.setattr(components.player.messagebox, 'showerror',
+                            lambda title, message: shown.append(('erro', message)))
+        monkeypatch.setattr(components.player.messagebox, 'showinfo',
+                            lambda title, message: shown.append(('info', message)))
+        player = self.make_player()
+        player.track_playlists = BrokenStore()
+        player.selected_track_playlist = lambda: {'id': 1, 'name': 'lista'}
+        
+        player.export_track_playlist()
+        assert [kind for kind, _ in shown] == ['erro']
+        assert "somente leitura" in shown[0][1]
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -2,16 +2,44 @@
 Testes básicos para o Music Player
 Execute: python -m pytest tests/
 """
+import json
+import os
 import pytest
+import struct
 import sys
+import threading
+import time
+import wave
+from datetime import datetime
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.config_manager import ConfigManager
+from utils.favorites import FavoritesStore
 from utils.history_manager import HistoryManager
 from utils.playlist_manager import PlaylistManager
+from utils.music_loader import MusicLoader
+from utils.library_index import LibraryIndex
+from utils.scanner import DirectoryScanner
+from utils.track_table import TrackTable
+from utils.search_index import SearchIndex, normalize_text
+from utils.seek import SeekController
+from utils.playback import GaplessPlayback, peek_next_index
+from utils.track_playlists import TrackPlaylistStore, read_playlist_file, write_playlist_file
+from utils.folder_watcher import (FolderChanges, FolderWatcher, InotifyBackend, PollingBackend,
+                                  WatchedTree, music_entry)
+from utils.session import SessionStore
+from utils.shuffle import ShuffleEngine
+from utils.media_keys import EvdevBackend, FakeBackend, MediaKeyListener
+from utils.commands import CommandQueue
+from utils.ipc import AVAILABLE as IPC_AVAILABLE, ControlServer, send_command
+from utils.audio_output import NullOutput, PygameOutput
+from utils.player_engine import PlayerEngine
+from utils.position_tracker import PositionTracker, ProgressThrottle
+from utils.durations import get_duration, format_duration
+from utils.metadata import MetadataCache, MetadataExtractor, parse_track_number
 
 class TestConfigManager:
     """Testes para o gerenciador de configurações"""
@@ -41,6 +69,111 @@ class TestConfigManager:
         config.remove_favorite(test_path)
         assert config.is_favorite(test_path) is False
 
+    def test_writes_are_coalesced(self, tmp_path):
+        """Testa que várias alterações seguidas viram uma única gravação"""
+        writes = []
+        
+        class CountingConfig(ConfigManager):
+            def save_config(self):
+                writes.append(dict(self.config))
+                return super().save_config()
+        
+        config = CountingConfig(config_dir=tmp_path, flush_delay=60)
+        for volume in range(50):
+            config.set('volume', volume)
+        assert writes == []
+        
+        assert config.flush() is True
+        assert len(writes) == 1
+        assert config.flush() is True  # Nada pendente
+        assert len(writes) == 1
+        assert ConfigManager(config_dir=tmp_path).get('volume') == 49
+        assert [p.name for p in tmp_path.iterdir()] == ['config.json']
+    
+    def test_background_flush(self, tmp_path):
+        """Testa que a gravação acontece sozinha depois do intervalo"""
+        config = ConfigManager(config_dir=tmp_path, flush_delay=0.01)
+        config.set('theme', 'light')
+        config.flush_timer.join(timeout=5)
+        assert ConfigManager(config_dir=tmp_path).get('theme') == 'light'
+    
+    def test_failed_write_stays_pending(self, tmp_path):
+        """Testa que uma gravação que falhou é refeita no próximo flush"""
+        failures = [True]
+        
+        class FlakyConfig(ConfigManager):
+            def save_config(self):
+                if failures:
+                    failures.pop()
+                    return False
+                return super().save_config()
+        
+        config = FlakyConfig(config_dir=tmp_path, flush_delay=60)
+        config.set('volume', 33)
+        assert config.flush() is False
+        assert config.flush() is True
+        assert ConfigManager(config_dir=tmp_path).get('volume') == 33
+    
+    def test_set_while_flushing(self, tmp_path):
+        """Testa chaves novas sendo criadas enquanto outra thread grava"""
+        config = ConfigManager(config_dir=tmp_path, flush_delay=60)
+        done = threading.Event()
+        
+        def writer():
+            for i in range(2000):
+                config.set(f'chave_{i}', i)
+            done.set()
+        
+        thread = threading.Thread(target=writer)
+        thread.start()
+        while not done.is_set():
+            config.dirty = True
+            assert config.flush() is True
+        thread.join()
+        assert config.flush() is True
+        assert ConfigManager(config_dir=tmp_path).get('chave_1999') == 1999
+
+class TestFavoritesStore:
+    """Testes para o armazenamento de favoritos"""
+    
+    def test_bulk_operations_persist_once(self, tmp_path):
+        """Testa adicionar/remover em lote com uma linha de log por alteração"""
+        store = FavoritesStore(tmp_path / 'favorites.log')
+        paths = [f"/m/{i}.mp3" for i in range(1000)]
+        
+        assert store.add_many(paths) == 1000
+        assert store.add_many(paths[:10]) == 0
+        assert store.remove_many(paths[:500]) == 500
+        assert "/m/999.mp3" in store
+        assert "/m/0.mp3" not in store
+        
+        reopened = FavoritesStore(tmp_path / 'favorites.log')
+        assert reopened.get_all() == paths[500:]
+    
+    def test_log_is_compacted(self, tmp_path):
+        """Testa que o log é reescrito quando cresce demais"""
+        store = FavoritesStore(tmp_path / 'favorites.log')
+        store.COMPACT_SLACK = 10
+        for _ in range(20):
+            store.add("/m/a.mp3")
+            store.remove("/m/a.mp3")
+        store.add("/m/b.mp3")
+        
+        lines = (tmp_path / 'favorites.log').read_text(encoding='utf-8').splitlines()
+        assert len(lines) <= 2 * len(store) + store.COMPACT_SLACK
+        assert FavoritesStore(tmp_path / 'favorites.log').get_all() == ["/m/b.mp3"]
+    
+    def test_migrates_config_list(self, tmp_path):
+        """Testa que a lista antiga do config.json vai para o log"""
+        (tmp_path / 'config.json').write_text(
+            json.dumps({'favorites': ["/m/a.mp3", "/m/b.mp3"]}), encoding='utf-8')
+        config = ConfigManager(config_dir=tmp_path)
+        config.flush()
+        
+        assert config.get_favorites() == ["/m/a.mp3", "/m/b.mp3"]
+        assert 'favorites' not in json.loads((tmp_path / 'config.json').read_text(encoding='utf-8'))
+        assert ConfigManager(config_dir=tmp_path).is_favorite("/m/b.mp3")
+
 class TestHistoryManager:
     """Testes para o gerenciador de histórico"""
     
@@ -75,6 +208,99 @@ class TestHistoryManager:
         
         assert len(history.get_history()) == 0
 
+    def test_full_log_and_queries(self, tmp_path):
+        """Testa retenção completa, contagem por música e últimas distintas"""
+        history = HistoryManager(max_entries=2, config_dir=tmp_path)
+        for name in ["a", "b", "a", "c", "a"]:
+            history.add_entry(f"/m/{name}.mp3", name)
+        
+        assert [e['name'] for e in history.get_history()] == ["a", "c"]
+        assert [e['name'] for e in history.get_recent_distinct(10)] == ["a", "c", "b"]
+        assert history.get_play_count("/m/a.mp3") == 3
+        assert len(history.get_plays("/m/b.mp3")) == 1
+        
+        reopened = HistoryManager(config_dir=tmp_path)
+        assert len(reopened.entries) == 5
+        assert reopened.get_play_count("/m/a.mp3") == 3
+    
+    def test_time_range(self, tmp_path):
+        """Testa a consulta por período"""
+        history = HistoryManager(config_dir=tmp_path)
+        lines = [{'path': f"/m/{d}.mp3", 'name': str(d), 'timestamp': f"2024-01-0{d}T12:00:00"}
+                 for d in range(1, 6)]
+        (tmp_path / 'history.jsonl').write_text(
+            ''.join(json.dumps(line) + '\n' for line in lines), encoding='utf-8')
+        history.load_history()
+        
+        entries = history.get_entries_between(datetime(2024, 1, 2), datetime(2024, 1, 4, 12))
+        assert [e['name'] for e in entries] == ["2", "3", "4"]
+    
+    def test_migrates_legacy_json_and_skips_broken_lines(self, tmp_path):
+        """Testa migração do history.json e descarte de linha incompleta"""
+        (tmp_path / 'history.json').write_text(json.dumps([
+            {'path': "/m/new.mp3", 'name': "new", 'timestamp': "2024-01-02T00:00:00"},
+            {'path': "/m/old.mp3", 'name': "old", 'timestamp': "2024-01-01T00:00:00"},
+        ]), encoding='utf-8')
+        history = HistoryManager(config_dir=tmp_path)
+        assert [e['name'] for e in history.get_history()] == ["new", "old"]
+        assert not (tmp_path / 'history.json').exists()
+        
+        with open(tmp_path / 'history.jsonl', 'a', encoding='utf-8') as f:
+            f.write('{"path": "/m/x.mp3", "na')
+        reopened = HistoryManager(config_dir=tmp_path)
+        assert len(reopened.entries) == 2
+        assert len((tmp_path / 'history.jsonl').read_text(encoding='utf-8').splitlines()) == 2
+
+    def test_keeps_every_play(self, tmp_path):
+        """Testa que nenhuma reprodução é descartada: contagens batem com as estatísticas"""
+        history = HistoryManager(config_dir=tmp_path)
+        for i in range(120):
+            history.add_entry(f"/m/{i % 3}.mp3", str(i % 3), duration=10)
+        history.close()
+        lines = (tmp_path / 'history.jsonl').read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 120
+
+        reopened = HistoryManager(config_dir=tmp_path)
+        assert len(reopened.entries) == 120
+        assert reopened.get_play_count("/m/0.mp3") == 40
+        assert reopened.stats.get_track("/m/0.mp3")['play_count'] == 40
+        assert reopened.stats.total_plays == 120
+        first = datetime.fromisoformat(reopened.entries[0]['timestamp'])
+        assert len(reopened.get_entries_between(first, datetime.now())) == 120
+
+class TestListeningStats:
+    """Testes para as estatísticas de escuta"""
+    
+    def test_incremental_aggregates(self, tmp_path):
+        """Testa contagem, tempo ouvido e ranking atualizados a cada reprodução"""
+        history = HistoryManager(config_dir=tmp_path)
+        history.add_entry("/m/a.mp3", "a", 200)
+        history.add_entry("/m/b.mp3", "b", 100)
+        history.add_entry("/m/a.mp3", "a", 200)
+        
+        stats = history.stats
+        assert stats.total_plays == 3
+        assert stats.total_time == pytest.approx(500)
+        assert stats.get_track("/m/a.mp3")['play_count'] == 2
+        assert [t['name'] for t in stats.top_tracks(2)] == ["a", "b"]
+        assert sum(stats.hours) == 3
+        assert stats.busiest_hour() == datetime.fromisoformat(
+            history.entries[-1]['timestamp']).hour
+    
+    def test_saved_aggregates_only_apply_new_entries(self, tmp_path):
+        """Testa que ao reabrir só as reproduções novas são contadas"""
+        history = HistoryManager(config_dir=tmp_path)
+        history.add_entry("/m/a.mp3", "a", 60)
+        history.close()
+        history.add_entry("/m/a.mp3", "a", 60)  # Ainda não salva nos agregados
+        
+        reopened = HistoryManager(config_dir=tmp_path)
+        assert reopened.stats.applied_entries == 2
+        assert reopened.stats.get_track("/m/a.mp3")['play_count'] == 2
+        
+        reopened.clear_history()
+        assert HistoryManager(config_dir=tmp_path).stats.total_plays == 0
+
 class TestPlaylistManager:
     """Testes para o gerenciador de playlists"""
     
@@ -93,5 +319,1523 @@ class TestPlaylistManager:
         
         assert isinstance(playlists, list)
 
+    def test_lazy_validation_keeps_missing_folders(self, tmp_path):
+        """Testa que pastas inexistentes ficam marcadas, não apagadas do arquivo"""
+        existing = tmp_path / "musicas"
+        existing.mkdir()
+        config_file = tmp_path / "playlists.json"
+        config_file.write_text(json.dumps({'playlists': [
+            {'name': "Ok", 'path': str(existing)},
+            {'name': "Rede", 'path': str(tmp_path / "desmontado")},
+        ]}), encoding='utf-8')
+        
+        manager = PlaylistManager(config_file=config_file)
+        assert len(manager.get_playlists()) == 2
+        assert manager.is_available(str(existing)) is None  # Nada verificado ainda
+        
+        results = {}
+        done = threading.Event()
+        
+        def on_result(path, available):
+            results[path] = available
+            if len(results) == 2:
+                done.set()
+        
+        manager.validate_async(on_result)
+        assert done.wait(5)
+        assert results == {str(existing): True, str(tmp_path / "desmontado"): False}
+        
+        manager.save_playlists()
+        assert len(PlaylistManager(config_file=config_file).get_playlists()) == 2
+    
+    def test_validation_timeout(self, tmp_path, monkeypatch):
+        """Testa que uma verificação travada vira indisponível após o timeout"""
+        config_file = tmp_path / "playlists.json"
+        config_file.write_text(json.dumps({'playlists': [{'name': "Lenta", 'path': "/lenta"}]}),
+                               encoding='utf-8')
+        manager = PlaylistManager(config_file=config_file)
+        release = threading.Event()
+        monkeypatch.setattr(os.path, 'isdir', lambda path: release.wait(5))
+        
+        results = []
+        manager.validate_async(lambda path, available: results.append(available), timeout=0.05)
+        deadline = time.time() + 5
+        while not results and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        assert results == [False]
+        assert manager.is_available("/lenta") is False
+
+    def test_one_checker_per_path(self, tmp_path, monkeypatch):
+        """Testa que verificar de novo uma pasta travada reaproveita a mesma checagem"""
+        manager = PlaylistManager(config_file=tmp_path / "playlists.json")
+        release = threading.Event()
+        calls = []
+
+        def hung_isdir(path):
+            calls.append(path)
+            return release.wait(5)
+        monkeypatch.setattr(os.path, 'isdir', hung_isdir)
+
+        results = []
+        for _ in range(3):
+            done = threading.Event()
+            manager.validate_path_async("/lenta", lambda path, ok: (results.append(ok), done.set()),
+                                        timeout=0.05)
+            manager.validate_path_async("/lenta", lambda path, ok: results.append(ok))
+            assert done.wait(5)
+        assert results == [False, False, False]
+        assert calls == ["/lenta"]
+        release.set()
+        manager.checkers["/lenta"].join(5)
+        manager.validate_path_async("/lenta", lambda path, ok: results.append(ok))
+        deadline = time.time() + 5
+        while len(results) < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        assert results[-1] is True and len(calls) == 2
+
+class TestDirectoryScanner:
+    """Testes para o escaneador paralelo de pastas"""
+    
+    def test_scan_nested_folders(self, tmp_path):
+        """Testa que todas as subpastas são percorridas pelo pool"""
+        for i in range(5):
+            folder = tmp_path / f"artist{i}" / "album"
+            folder.mkdir(parents=True)
+            (folder / f"song{i}.MP3").write_bytes(b'x')
+            (folder / "cover.jpg").write_bytes(b'x')
+        
+        scanner = DirectoryScanner(MusicLoader.SUPPORTED_FORMATS, workers=3)
+        music_files = scanner.scan(str(tmp_path))
+        
+        assert sorted(m['name'] for m in music_files) == [f"song{i}" for i in range(5)]
+        assert all(m['extension'] == '.MP3' for m in music_files)
+
+class TestLibraryIndex:
+    """Testes para o índice persistente da biblioteca"""
+    
+    def make_index(self, tmp_path):
+        return LibraryIndex(MusicLoader.SUPPORTED_FORMATS, db_path=tmp_path / 'library.db')
+    
+    def test_reconcile_and_get_tracks(self, tmp_path):
+        """Testa escaneamento inicial e leitura do índice"""
+        music = tmp_path / 'music'
+        (music / 'sub').mkdir(parents=True)
+        (music / 'b.mp3').write_bytes(b'x')
+        (music / 'sub' / 'A.flac').write_bytes(b'x')
+        (music / 'notes.txt').write_text('x')
+        
+        index = self.make_index(tmp_path)
+        assert index.reconcile(str(music)) is True
+        names = [t['name'] for t in index.get_tracks(str(music))]
+        assert names == ['A', 'b']
+        
+        # Sem mudanças no disco, nada a atualizar
+        assert index.reconcile(str(music)) is False
+    
+    def test_incremental_changes(self, tmp_path):
+        """Testa detecção de arquivos e pastas novos e removidos"""
+        music = tmp_path / 'music'
+        (music / 'sub').mkdir(parents=True)
+        (music / 'old.mp3').write_bytes(b'x')
+        (music / 'sub' / 'gone.mp3').write_bytes(b'x')
+        index = self.make_index(tmp_path)
+        index.reconcile(str(music))
+        
+        (music / 'old.mp3').unlink()
+        (music / 'new.ogg').write_bytes(b'x')
+        (music / 'sub' / 'gone.mp3').unlink()
+        (music / 'sub').rmdir()
+        
+        assert index.reconcile(str(music)) is True
+        assert [t['name'] for t in index.get_tracks(str(music))] == ['new']
+
+class TestTrackPlaylists:
+    """Testes para as playlists de faixas (M3U/M3U8/PLS)"""
+    
+    def make_store(self, tmp_path):
+        index = LibraryIndex(MusicLoader.SUPPORTED_FORMATS, db_path=tmp_path / 'library.db')
+        return TrackPlaylistStore(index)
+    
+    def test_parse_m3u_and_pls(self, tmp_path):
+        """Testa leitura de EXTINF, caminhos relativos, URLs e PLS"""
+        m3u = tmp_path / "lista.m3u8"
+        m3u.write_text("#EXTM3U\n#EXTINF:185,Artista - Canção\nsub/a.mp3\n"
+                       "http://radio/stream\n/abs/b.flac\n", encoding='utf-8')
+        entries = read_playlist_file(str(m3u))
+        assert [e['path'] for e in entries] == [str(tmp_path / "sub" / "a.mp3"),
+                                                os.path.normpath("/abs/b.flac")]
+        assert entries[0]['title'] == "Artista - Canção"
+        assert entries[0]['duration'] == 185
+        assert entries[1]['duration'] is None
+        
+        pls = tmp_path / "lista.pls"
+        pls.write_text("[playlist]\nFile2=b.ogg\nFile1=a.ogg\nTitle1=A\nLength1=-1\n"
+                       "NumberOfEntries=2\n", encoding='utf-8')
+        entries = read_playlist_file(str(pls))
+        assert [os.path.basename(e['path']) for e in entries] == ["a.ogg", "b.ogg"]
+        assert entries[0]['title'] == "A" and entries[0]['duration'] is None
+    
+    def test_export_import_round_trip(self, tmp_path):
+        """Testa exportar e importar mantendo ordem, título e duração"""
+        store = self.make_store(tmp_path)
+        playlist_id = store.create("Viagem")
+        store.append(playlist_id, [{'path': "/m/b.mp3", 'title': "B", 'duration': 61},
+                                   "/m/a.mp3"])
+        for extension in ('.m3u', '.m3u8', '.pls'):
+            target = tmp_path / f"viagem{extension}"
+            store.export_file(playlist_id, str(target))
+            imported = store.import_file(str(target))
+            entries = store.get_entries(imported)
+            assert [e['path'] for e in entries] == [os.path.normpath("/m/b.mp3"),
+                                                    os.path.normpath("/m/a.mp3")]
+            assert entries[0]['duration'] == 61
+        assert len(store.list_playlists()) == 4
+
+    @pytest.mark.parametrize('extension', ['.m3u8', '.pls'])
+    def test_write_read_file_round_trip(self, tmp_path, extension):
+        """Testa gravar e reler o arquivo (M3U e PLS) com título, duração desconhecida e acentos"""
+        entries = [{'path': str(tmp_path / "Canção.mp3"), 'title': "Canção", 'duration': 185},
+                   {'path': str(tmp_path / "sub" / "b.ogg"), 'title': None, 'duration': None}]
+        target = tmp_path / f"lista{extension}"
+        write_playlist_file(str(target), entries)
+        read = read_playlist_file(str(target))
+        assert [e['path'] for e in read] == [e['path'] for e in entries]
+        assert read[0]['title'] == "Canção" and read[0]['duration'] == 185
+        assert read[1]['duration'] is None
+
+    def test_failed_import_leaves_no_playlist(self, tmp_path, monkeypatch):
+        """Testa que playlist e entradas do import entram juntas (uma transação)"""
+        store = self.make_store(tmp_path)
+        source = tmp_path / "lista.m3u"
+        write_playlist_file(str(source), [{'path': "/m/a.mp3"}])
+
+        def broken(entries):
+            raise RuntimeError("falha no meio do import")
+        monkeypatch.setattr(store, 'track_ids', broken)
+        with pytest.raises(RuntimeError):
+            store.import_file(str(source))
+        assert store.list_playlists() == []
+    
+    def test_append_move_remove(self, tmp_path):
+        """Testa que mover/remover altera só a entrada e mantém a ordem"""
+        store = self.make_store(tmp_path)
+        playlist_id = store.create("Ordem")
+        a, b, c, d = store.append(playlist_id, ["/m/a.mp3", "/m/b.mp3", "/m/c.mp3", "/m/d.mp3"])
+        
+        store.move(d, before_entry_id=a)
+        store.move(a)  # Para o fim
+        store.remove(b)
+        assert [e['path'] for e in store.get_entries(playlist_id)] == [
+            "/m/d.mp3", "/m/c.mp3", "/m/a.mp3"]
+        
+        for _ in range(80):  # Pontos médios sucessivos esgotam a precisão: renumera
+            store.move(c, before_entry_id=d)
+            store.move(d, before_entry_id=c)
+        assert [e['path'] for e in store.get_entries(playlist_id)] == [
+            "/m/d.mp3", "/m/c.mp3", "/m/a.mp3"]
+    
+    def test_load_tracks_uses_index(self, tmp_path):
+        """Testa carregar a playlist com dados do índice e verificação lazy de existência"""
+        music = tmp_path / "music"
+        music.mkdir()
+        with wave.open(str(music / "real.wav"), 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(1)
+            w.setframerate(1000)
+            w.writeframes(bytes(1000))
+        store = self.make_store(tmp_path)
+        store.index.reconcile(str(music))
+        # Duração gravada pelo extrator de metadados (o escaneamento só faz stat)
+        store.index.store_durations([{'path': str(music / "real.wav"), 'duration': 1.0}])
+        
+        playlist_id = store.create("Mista")
+        store.append(playlist_id, [str(music / "real.wav"), str(music / "sumiu.mp3")])
+        tracks = store.load_tracks(playlist_id)
+        assert [t['name'] for t in tracks] == ["real", "sumiu"]
+        assert tracks[0]['duration'] == pytest.approx(1.0)
+        assert tracks[1]['duration'] is None
+        assert TrackPlaylistStore.find_missing(tracks) == [1]
+
+class TestSessionStore:
+    """Testes para o instantâneo da sessão"""
+    
+    def make_session(self):
+        tracks = TrackTable([
+            {'path': '/m/a/Um.mp3', 'name': 'Um', 'extension': '.mp3', 'folder': '/m/a',
+             'duration': 180.5},
+            {'path': '/m/b/Dois.flac', 'name': 'Dois', 'extension': '.flac', 'folder': '/m/b'},
+            {'path': '/m/a/Três.mp3', 'name': 'Três', 'extension': '.mp3', 'folder': '/m/a',
+             'duration': 61.0},
+        ])
+        return {'source': '/m', 'tracks': tracks, 'current_index': 2, 'position': 42.5,
+                'shuffle_mode': True, 'shuffle_queue': [0, 1], 'shuffle_history': [2]}
+    
+    def test_round_trip(self, tmp_path):
+        """Lista, música atual, posição e fila voltam iguais"""
+        store = SessionStore(tmp_path / 'session.bin')
+        assert store.save(self.make_session())
+        
+        session = store.load()
+        tracks = session['tracks']
+        assert [m['path'] for m in tracks] == ['/m/a/Um.mp3', '/m/b/Dois.flac', '/m/a/Três.mp3']
+        assert tracks[0]['duration'] == 180.5
+        assert tracks[1]['duration'] is None
+        assert tracks.index_of_path('/m/a/Três.mp3') == 2
+        assert session['source'] == '/m'
+        assert session['current_index'] == 2
+        assert session['position'] == 42.5
+        assert session['shuffle_mode'] is True
+        assert session['shuffle_queue'] == [0, 1]
+        assert session['shuffle_history'] == [2]
+    
+    def test_empty_list(self, tmp_path):
+        """Sessão sem músicas também é válida"""
+        store = SessionStore(tmp_path / 'session.bin')
+        store.save({'source': None, 'tracks': TrackTable()})
+        session = store.load()
+        assert len(session['tracks']) == 0
+        assert session['source'] is None
+        assert session['current_index'] == -1
+    
+    def test_async_save_copies_table(self, tmp_path):
+        """Gravação em segundo plano usa uma cópia da lista"""
+        store = SessionStore(tmp_path / 'session.bin')
+        session = self.make_session()
+        store.save_async(session)
+        session['tracks'].delete(0)
+        for _ in range(100):
+            loaded = store.load() if store.session_file.exists() else None
+            if loaded:
+                break
+            time.sleep(0.02)
+        assert len(loaded['tracks']) == 3
+    
+    def test_invalid_file(self, tmp_path):
+        """Arquivo inexistente, corrompido ou de outra versão é ignorado"""
+        store = SessionStore(tmp_path / 'session.bin')
+        assert store.load() is None
+        store.session_file.write_bytes(b'lixo')
+        assert store.load() is None
+        store.save(self.make_session())
+        data = bytearray(store.session_file.read_bytes())
+        data[4] = SessionStore.VERSION + 1
+        store.session_file.write_bytes(bytes(data))
+        assert store.load() is None
+        assert not list(tmp_path.glob('.session-*'))
+
+class TestShuffleEngine:
+    """Testes para o motor do modo aleatório"""
+    
+    def test_permutation_covers_all(self):
+        """Uma volta toca todas as faixas uma única vez"""
+        engine = ShuffleEngine(50, seed=7)
+        order = [engine.next() for _ in range(50)]
+        assert sorted(order) == list(range(50))
+        assert engine.next() is None
+        assert engine.next(wrap=True) is not None
+    
+    def test_lazy_state_is_sparse(self):
+        """Poucos sorteios numa lista enorme não materializam a permutação"""
+        engine = ShuffleEngine(1_000_000, seed=1)
+        for _ in range(10):
+            engine.next()
+        assert len(engine.swaps) <= 20
+        assert len(engine.order) == 10
+    
+    def test_same_seed_same_order(self):
+        """Mesma semente gera a mesma ordem; reseed muda"""
+        first = ShuffleEngine(100, seed=3)
+        second = ShuffleEngine(100, seed=3)
+        assert [first.next() for _ in range(100)] == [second.next() for _ in range(100)]
+        first.reseed(seed=4, current=10)
+        assert first.current == 10
+        assert sorted([10] + [first.next() for _ in range(99)]) == list(range(100))
+    
+    def test_previous_and_next(self):
+        """Anterior volta na ordem e a próxima refaz o mesmo caminho"""
+        engine = ShuffleEngine(20, seed=2)
+        order = [engine.next() for _ in range(5)]
+        assert engine.previous() == order[3]
+        assert engine.previous() == order[2]
+        assert engine.peek() == order[3]
+        assert engine.next() == order[3]
+        assert engine.next() == order[4]
+    
+    def test_wrap_does_not_repeat_last(self):
+        """Na virada da volta, a última faixa não toca de novo logo em seguida"""
+        for seed in range(20):
+            engine = ShuffleEngine(3, seed=seed)
+            order = [engine.next() for _ in range(3)]
+            assert engine.next(wrap=True) != order[-1]
+    
+    def test_remove_and_insert(self):
+        """Remoções/inserções mantêm a ordem tocada e o resto da volta"""
+        engine = ShuffleEngine(10, seed=5)
+        played = [engine.next() for _ in range(4)]
+        removed = played[1]
+        engine.remove(removed)
+        shift = lambda i: i - 1 if i > removed else i
+        assert engine.order == [shift(i) for i in played if i != removed]
+        assert engine.current == shift(played[-1])
+        
+        engine.insert(0)
+        engine.append(2)
+        assert engine.count == 12
+        while engine.next() is not None:
+            pass
+        assert sorted(engine.order) == list(range(12))
+    
+    def test_remap_drops_missing(self):
+        """Faixas que sumiram saem da ordem e o cursor fica na anterior"""
+        engine = ShuffleEngine(6, seed=1)
+        played = [engine.next() for _ in range(3)]
+        engine.remap(6, lambda i: -1 if i == played[-1] else i)
+        assert engine.current == played[1]
+        assert played[-1] not in engine.order
+    
+    def test_state_round_trip(self):
+        """state()/load_state() restauram ordem e cursor"""
+        engine = ShuffleEngine(30, seed=8)
+        for _ in range(35):
+            engine.next(wrap=True)
+        engine.previous()
+        engine.peek()
+        history, upcoming = engine.state()
+        
+        restored = ShuffleEngine()
+        restored.load_state(30, history, upcoming)
+        assert restored.current == engine.current
+        assert restored.next() == engine.next()
+        rest = [restored.next() for _ in range(30)]
+        assert None in rest
+        cycle = restored.order[restored.cycle_start:]
+        assert len(cycle) == len(set(cycle))
+    
+    def test_artist_spread(self):
+        """Aleatório inteligente evita o mesmo artista em sequência"""
+        artist = lambda i: 'A' if i % 2 else 'B'
+        engine = ShuffleEngine(200, seed=4, artist_of=artist)
+        order = [engine.next() for _ in range(200)]
+        repeats = sum(artist(a) == artist(b) for a, b in zip(order, order[1:]))
+        assert sorted(order) == list(range(200))
+        assert repeats < 20
+
+class TestMediaKeys:
+    """Testes para o listener de teclas de mídia"""
+    
+    def make_listener(self, backend, pressed):
+        return MediaKeyListener(on_play_pause=lambda: pressed.append('play_pause'),
+                                on_next=lambda: pressed.append('next'),
+                                on_volume_up=lambda: pressed.append('volume_up'),
+                                backend=backend)
+    
+    def wait_for(self, condition, timeout=2.0):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        return condition()
+    
+    def test_fake_backend_dispatch(self):
+        """Teclas simuladas chamam os callbacks na ordem"""
+        backend = FakeBackend()
+        pressed = []
+        listener = self.make_listener(backend, pressed)
+        assert listener.start() is True
+        backend.press('next')
+        backend.press('stop')  # Sem callback: ignorada
+        backend.press('play_pause')
+        assert self.wait_for(lambda: len(pressed) == 2)
+        assert pressed == ['next', 'play_pause']
+        listener.stop()
+        assert not listener.thread.is_alive()
+    
+    def test_idle_listener_blocks(self):
+        """Sem teclas, a thread fica bloqueada (nenhuma volta no loop)"""
+        backend = FakeBackend()
+        reads = []
+        original = backend.read_key
+        backend.read_key = lambda: reads.append(1) or original()
+        listener = self.make_listener(backend, [])
+        listener.start()
+        time.sleep(0.2)
+        assert len(reads) == 1
+        listener.stop()
+        assert not listener.thread.is_alive()
+    
+    def test_evdev_events(self):
+        """Eventos do kernel viram nomes de tecla (só pressionar, sem repetir/soltar)"""
+        backend = EvdevBackend()
+        device_read, device_write = os.pipe()
+        os.set_blocking(device_read, False)
+        backend.devices = [device_read]
+        backend.wake_read, backend.wake_write = os.pipe()
+        
+        def event(code, value, event_type=EvdevBackend.EV_KEY):
+            return EvdevBackend.EVENT.pack(0, 0, event_type, code, value)
+        
+        os.write(device_write, event(164, 1) + event(164, 0) + event(4, 1, 0x04)
+                 + event(163, 2) + event(115, 1))
+        assert backend.read_key() == 'play_pause'
+        assert backend.read_key() == 'volume_up'
+        
+        pressed = []
+        listener = self.make_listener(backend, pressed)
+        listener.start()
+        os.write(device_write, event(163, 1))
+        assert self.wait_for(lambda: pressed == ['next'])
+        listener.stop()
+        assert not listener.thread.is_alive()
+        assert backend.devices == []
+        os.close(device_write)
+
+class TestCommandQueue:
+    """Testes para a fila de comandos da thread principal"""
+    
+    def make_queue(self):
+        scheduled = []
+        commands = CommandQueue(schedule=scheduled.append)
+        return commands, scheduled
+    
+    def test_schedules_one_drain(self):
+        """Vários pushes seguidos agendam um único drain"""
+        commands, scheduled = self.make_queue()
+        calls = []
+        commands.register('next', lambda: calls.append('next'))
+        commands.push('next')
+        commands.push('next')
+        assert len(scheduled) == 1
+        scheduled.pop()()
+        assert calls == ['next', 'next']
+        commands.push('next')
+        assert len(scheduled) == 1
+
+    def test_polled_without_schedule(self):
+        """Sem schedule, push() só enfileira e a thread principal drena quando consultar"""
+        commands = CommandQueue()
+        calls = []
+        commands.register('status', calls.append)
+        worker = threading.Thread(target=lambda: commands.push('status', 'ok'))
+        worker.start()
+        worker.join()
+        assert calls == [] and commands.pending
+        commands.drain()
+        assert calls == ['ok'] and not commands.pending
+
+    def test_coalescing_modes(self):
+        """Volume soma, 'last' fica com o último e toggles pares se anulam"""
+        commands, scheduled = self.make_queue()
+        calls = []
+        commands.register('volume', lambda total: calls.append(('volume', total)), mode='sum')
+        commands.register('seek', lambda value: calls.append(('seek', value)), mode='last')
+        commands.register('play_pause', lambda: calls.append(('play_pause',)), mode='toggle')
+        for _ in range(10):
+            commands.push('volume', 1)
+        commands.push('seek', 10)
+        commands.push('seek', 42)
+        commands.push('play_pause')
+        commands.push('play_pause')
+        commands.push('volume', -1)
+        commands.push('play_pause')
+        commands.drain()
+        assert calls == [('volume', 10), ('seek', 42), ('volume', -1), ('play_pause',)]
+        assert commands.coalesced == 11
+    
+    def test_errors_and_unknown(self):
+        """Erro num comando não impede os seguintes"""
+        commands, scheduled = self.make_queue()
+        calls = []
+        commands.register('fail', lambda: 1 / 0)
+        commands.register('ok', lambda value: calls.append(value))
+        commands.push('fail')
+        commands.push('unknown')
+        commands.push('ok', 'x')
+        commands.drain()
+        assert calls == ['x']
+    
+    def test_threads_and_latency(self):
+        """Pushes de várias threads são todos executados e medidos"""
+        commands, scheduled = self.make_queue()
+        total = []
+        commands.register('volume', total.append, mode='sum')
+        
+        def produce():
+            for _ in range(500):
+                commands.push('volume', 1)
+        
+        threads = [threading.Thread(target=produce) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        while scheduled:
+            scheduled.pop()()
+        commands.drain()
+        assert sum(total) == 2000
+        report = commands.latency_report()['volume']
+        assert report['count'] == CommandQueue.LATENCY_SAMPLES
+        assert 0 <= report['mean_ms'] <= report['max_ms']
+
+@pytest.mark.skipif(not IPC_AVAILABLE, reason="socket Unix indisponível")
+class TestControlServer:
+    """Testes para o canal de controle entre execuções"""
+    
+    def test_round_trip(self, tmp_path):
+        """Comandos chegam ao callback e a resposta indica se foram aceitos"""
+        received = []
+        socket_path = tmp_path / 'control.sock'
+        server = ControlServer(lambda command, value: received.append((command, value))
+                               or command != 'bad', socket_path=socket_path)
+        assert server.start() is True
+        try:
+            assert send_command('next', socket_path=socket_path) == {'ok': True}
+            assert send_command('enqueue', '/m/a.mp3', socket_path=socket_path) == {'ok': True}
+            assert send_command('bad', socket_path=socket_path) == {'ok': False}
+            assert received == [('next', None), ('enqueue', '/m/a.mp3'), ('bad', None)]
+        finally:
+            server.stop()
+        assert not socket_path.exists()
+        assert send_command('next', socket_path=socket_path) is None
+    
+    def test_single_instance(self, tmp_path):
+        """Segundo servidor no mesmo socket não sobe; arquivo órfão é substituído"""
+        socket_path = tmp_path / 'control.sock'
+        first = ControlServer(lambda command, value: True, socket_path=socket_path)
+        assert first.start() is True
+        second = ControlServer(lambda command, value: True, socket_path=socket_path)
+        assert second.start() is False
+        first.stop()
+        
+        socket_path.write_text('')  # Sobra de uma execução que caiu
+        third = ControlServer(lambda command, value: True, socket_path=socket_path)
+        assert third.start() is True
+        assert send_command('ping', socket_path=socket_path) == {'ok': True}
+        third.stop()
+    
+    def test_invalid_request(self, tmp_path):
+        """Requisição que não é JSON recebe erro sem derrubar o servidor"""
+        import socket
+        socket_path = tmp_path / 'control.sock'
+        server = ControlServer(lambda command, value: True, socket_path=socket_path)
+        server.start()
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(str(socket_path))
+                client.sendall(b'lixo\n')
+                reply = json.loads(client.recv(4096))
+            assert reply['ok'] is False
+            assert send_command('next', socket_path=socket_path) == {'ok': True}
+        finally:
+            server.stop()
+    
+    def test_command_line(self):
+        """Opções do main.py viram comandos para a instância aberta"""
+        import main
+        commands = main.remote_commands(main.parse_args(
+            ['--next', '--volume-up', '--enqueue', 'a.mp3', '--enqueue', '/m/b.mp3']))
+        assert commands == [('enqueue', os.path.abspath('a.mp3')), ('enqueue', '/m/b.mp3'),
+                            ('next', None), ('volume', 1)]
+        assert main.remote_commands(main.parse_args([])) == []
+
+class TestMusicLoader:
+    """Testes para o carregador de músicas"""
+    
+    def test_load_folder_without_index(self, tmp_path):
+        """Testa carregamento direto do disco"""
+        (tmp_path / 'b.mp3').write_bytes(b'x')
+        (tmp_path / 'a.wav').write_bytes(b'x')
+        loader = MusicLoader()
+        
+        music_list = loader.load_folder(str(tmp_path))
+        assert [m['name'] for m in music_list] == ['a', 'b']
+        assert loader.get_music_by_index(5) is None
+    
+    def test_load_folder_from_index(self, tmp_path):
+        """Testa retorno imediato do índice e reconciliação em segundo plano"""
+        music = tmp_path / 'music'
+        music.mkdir()
+        (music / 'a.mp3').write_bytes(b'x')
+        index = LibraryIndex(MusicLoader.SUPPORTED_FORMATS, db_path=tmp_path / 'library.db')
+        loader = MusicLoader(library_index=index)
+        assert len(loader.load_folder(str(music))) == 1
+        
+        (music / 'b.mp3').write_bytes(b'x')
+        updates = []
+        music_list = loader.load_folder(str(music), on_update=lambda f, m: updates.append(m))
+        assert len(music_list) == 1
+        
+        loader.reconcile_thread.join(timeout=5)
+        assert [m['name'] for m in updates[0]] == ['a', 'b']
+
+    def test_indexed_folder_does_not_touch_disk(self, tmp_path, monkeypatch):
+        """Testa que pasta indexada mas inacessível vem do índice, sem checar o disco"""
+        music = tmp_path / 'music'
+        music.mkdir()
+        (music / 'a.mp3').write_bytes(b'x')
+        index = LibraryIndex(MusicLoader.SUPPORTED_FORMATS, db_path=tmp_path / 'library.db')
+        loader = MusicLoader(library_index=index)
+        loader.load_folder(str(music))
+
+        def hung(path):
+            raise AssertionError("disco acessado na thread de quem chamou")
+        monkeypatch.setattr(os.path, 'exists', hung)
+        monkeypatch.setattr(os.path, 'isdir', lambda path: False)  # Drive desmontado
+        assert [m['name'] for m in loader.load_folder(str(music))] == ['a']
+        loader.reconcile_thread.join(timeout=5)
+        assert len(index.get_tracks(str(music))) == 1  # Índice preservado
+    
+    def test_iter_folder_streams_batches(self, tmp_path):
+        """Testa carregamento progressivo em lotes e ordenação ao final"""
+        for i in range(3):
+            folder = tmp_path / f"cd{i}"
+            folder.mkdir()
+            for j in range(4):
+                (folder / f"{9 - j}-{i}.ogg").write_bytes(b'x')
+        loader = MusicLoader()
+        
+        received = []
+        for batch in loader.iter_folder(str(tmp_path), batch_size=5):
+            assert len(batch) <= 5
+            received.extend(batch)
+        
+        assert len(received) == 12
+        names = [m['name'] for m in loader.get_music_list()]
+        assert names == sorted(names, key=str.lower)
+    
+    def test_iter_folder_populates_index(self, tmp_path):
+        """Testa que o streaming com índice deixa a pasta indexada"""
+        music = tmp_path / 'music'
+        music.mkdir()
+        (music / 'a.mp3').write_bytes(b'x')
+        index = LibraryIndex(MusicLoader.SUPPORTED_FORMATS, db_path=tmp_path / 'library.db')
+        loader = MusicLoader(library_index=index)
+        
+        batches = list(loader.iter_folder(str(music)))
+        assert sum(len(b) for b in batches) == 1
+        assert index.has_folder(str(music))
+        assert [t['name'] for t in index.get_tracks(str(music))] == ['a']
+
+class TestTrackTable:
+    """Testes para a tabela compacta de músicas"""
+    
+    def make_table(self):
+        return TrackTable([
+            {'path': '/m/rock/b.mp3', 'name': 'b', 'extension': '.mp3', 'folder': '/m/rock'},
+            {'path': '/m/rock/A.flac', 'name': 'A', 'extension': '.flac', 'folder': '/m/rock',
+             'duration': 10.0},
+            {'path': '/m/jazz/c.mp3', 'name': 'c', 'extension': '.mp3', 'folder': '/m/jazz'},
+        ])
+    
+    def test_rows_behave_like_dicts(self):
+        """Testa acesso compatível com o formato antigo"""
+        table = self.make_table()
+        track = table[1]
+        assert track['path'] == '/m/rock/A.flac'
+        assert track['folder'] == '/m/rock'
+        assert track.get('duration') == 10.0
+        assert table[0].get('duration') is None
+        assert 'title' not in track
+        
+        track['title'] = 'Song A'
+        assert track['title'] == 'Song A'
+        assert table[0].get('title') is None
+    
+    def test_folders_are_interned(self):
+        """Testa que pastas repetidas são guardadas uma única vez"""
+        table = self.make_table()
+        assert table.folders == ['/m/rock', '/m/jazz']
+        assert list(table.folder_column) == [0, 0, 1]
+    
+    def test_sort_and_lookup(self):
+        """Testa ordenação por nome, busca por caminho e duração total"""
+        table = self.make_table()
+        table[2]['artist'] = 'X'
+        table.sort_by_name()
+        
+        assert [t['name'] for t in table] == ['A', 'b', 'c']
+        assert table[2]['artist'] == 'X'
+        assert table.index_of_path('/m/jazz/c.mp3') == 2
+        assert table.index_of_path('/m/jazz/zzz.mp3') == -1
+        assert table.total_duration() == 10.0
+    
+    def test_loader_uses_table(self, tmp_path):
+        """Testa que o MusicLoader expõe a tabela nas APIs antigas"""
+        (tmp_path / 'a.mp3').write_bytes(b'x')
+        loader = MusicLoader()
+        loader.load_folder(str(tmp_path))
+        
+        assert isinstance(loader.get_music_list(), TrackTable)
+        assert loader.get_music_by_index(0)['path'] == str(tmp_path / 'a.mp3')
+        assert loader.get_music_by_index(1) is None
+
+class TestSearchIndex:
+    """Testes para o índice de busca"""
+    
+    def make_index(self):
+        return SearchIndex([
+            {'name': 'Águas de Março', 'artist': 'Elis Regina'},
+            {'name': 'Garota de Ipanema', 'artist': 'Tom Jobim'},
+            {'name': 'Marcha Soldado'},
+            {'name': 'Construção', 'artist': 'Chico Buarque', 'album': 'Construção'},
+        ])
+    
+    def test_normalize_text(self):
+        """Testa remoção de acentos e maiúsculas"""
+        assert normalize_text('Ação CORAÇÃO') == 'acao coracao'
+    
+    def test_accent_insensitive_search(self):
+        """Testa busca sem acentos em nome e artista"""
+        index = self.make_index()
+        assert index.search('aguas') == [0]
+        assert index.search('marco') == [0]
+        assert index.search('jobim') == [1]
+        assert index.search('chico construcao') == [3]
+        assert index.search('xyz') == []
+    
+    def test_prefix_matches_first(self):
+        """Testa que nomes começando com a consulta vêm primeiro"""
+        index = self.make_index()
+        assert index.search('mar') == [2, 0]
+        assert index.search('mar', limit=1) == [2]
+    
+    def test_incremental_narrowing(self):
+        """Testa que a consulta estendida reaproveita o resultado anterior"""
+        index = self.make_index()
+        assert set(index.search('de')) == {0, 1}
+        assert index.last_matches is not None
+        assert index.search('de ip') == [1]
+        assert set(index.search('de')) == {0, 1}
+
+class TestMetadata:
+    """Testes para a extração de metadados"""
+    
+    def test_parse_track_number(self):
+        """Testa formatos comuns do número da faixa"""
+        assert parse_track_number('3/12') == 3
+        assert parse_track_number(['7']) == 7
+        assert parse_track_number('x') is None
+        assert parse_track_number(None) is None
+    
+    def test_cache_keyed_by_size_and_mtime(self, tmp_path):
+        """Testa que o cache só vale para o arquivo sem alterações"""
+        cache = MetadataCache(db_path=tmp_path / 'metadata.db')
+        tags = {'title': 'Song', 'artist': 'Band', 'album': None, 'duration': 12.5, 'track': 1}
+        cache.put_many([('/m/a.mp3', 100, 5, tags)])
+        
+        assert cache.get('/m/a.mp3', 100, 5) == tags
+        assert cache.get('/m/a.mp3', 100, 6) is None
+    
+    def test_enrich_from_cache(self, tmp_path):
+        """Testa enriquecimento das músicas usando o cache sem reler o arquivo"""
+        song = tmp_path / 'a.mp3'
+        song.write_bytes(b'x')
+        stat = song.stat()
+        cache = MetadataCache(db_path=tmp_path / 'metadata.db')
+        tags = {'title': 'Song', 'artist': 'Band', 'album': 'LP', 'duration': 3.0, 'track': 2}
+        cache.put_many([(str(song), stat.st_size, stat.st_mtime_ns, tags)])
+        
+        music = {'path': str(song), 'name': 'a', 'extension': '.mp3', 'folder': str(tmp_path)}
+        extractor = MetadataExtractor(cache=cache)
+        extractor.enrich([music])
+        extractor.wait(timeout=5)
+        
+        assert music['artist'] == 'Band'
+        assert music['duration'] == 3.0
+
+class TestDurations:
+    """Testes para a leitura de duração pelo cabeçalho"""
+    
+    def test_wav(self, tmp_path):
+        """Testa WAV de 2 segundos"""
+        path = tmp_path / 'a.wav'
+        with wave.open(str(path), 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(b'\x00\x00' * 16000)
+        assert get_duration(str(path)) == pytest.approx(2.0)
+    
+    def test_flac(self, tmp_path):
+        """Testa STREAMINFO com 441000 amostras a 44.1 kHz"""
+        info = bytearray(34)
+        sample_rate, total = 44100, 441000
+        info[10] = sample_rate >> 12
+        info[11] = (sample_rate >> 4) & 0xFF
+        info[12] = (sample_rate & 0x0F) << 4
+        info[14:18] = struct.pack('>I', total)
+        path = tmp_path / 'a.flac'
+        path.write_bytes(b'fLaC' + bytes([0x80, 0, 0, 34]) + bytes(info))
+        assert get_duration(str(path)) == pytest.approx(10.0)
+    
+    def test_mp3_cbr(self, tmp_path):
+        """Testa MP3 de bitrate constante (128 kbps, 16000 bytes = 1 s)"""
+        frame_header = bytes([0xFF, 0xFB, 0x90, 0x00])  # MPEG1 Layer III 128k 44.1k
+        path = tmp_path / 'a.mp3'
+        path.write_bytes(frame_header + bytes(16000 - 4))
+        assert get_duration(str(path)) == pytest.approx(1.0)
+    
+    def test_m4a(self, tmp_path):
+        """Testa átomo mvhd com timescale 1000 e duração 90000"""
+        mvhd_body = bytes(4) + struct.pack('>IIII', 0, 0, 1000, 90000)
+        mvhd = struct.pack('>I4s', 8 + len(mvhd_body), b'mvhd') + mvhd_body
+        moov = struct.pack('>I4s', 8 + len(mvhd), b'moov') + mvhd
+        ftyp = struct.pack('>I4s', 16, b'ftyp') + b'M4A ' + bytes(4)
+        path = tmp_path / 'a.m4a'
+        path.write_bytes(ftyp + moov)
+        assert get_duration(str(path)) == pytest.approx(90.0)
+    
+    def test_ogg_vorbis(self, tmp_path):
+        """Testa granule position da última página OGG"""
+        def page(granule, packet):
+            return (b'OggS' + bytes(2) + struct.pack('<q', granule) + bytes(12)
+                    + bytes([1, len(packet)]) + packet)
+        ident = b'\x01vorbis' + bytes(4) + bytes([2]) + struct.pack('<I', 48000) + bytes(14)
+        path = tmp_path / 'a.ogg'
+        path.write_bytes(page(0, ident) + page(48000 * 3, b'audio'))
+        assert get_duration(str(path)) == pytest.approx(3.0)
+    
+    def test_unknown_file(self, tmp_path):
+        """Testa arquivo inválido"""
+        path = tmp_path / 'a.mp3'
+        path.write_bytes(b'not audio')
+        assert get_duration(str(path)) is None
+    
+    def test_format_duration(self):
+        """Testa formatação MM:SS e H:MM:SS"""
+        assert format_duration(65) == "01:05"
+        assert format_duration(3725) == "1:02:05"
+    
+    def test_index_stores_duration(self, tmp_path):
+        """Testa duração guardada no índice e total calculado sem ler arquivos"""
+        music = tmp_path / 'music'
+        music.mkdir()
+        for name in ('a', 'b'):
+            with wave.open(str(music / f"{name}.wav"), 'wb') as w:
+                w.setnchannels(1)
+                w.setsampwidth(1)
+                w.setframerate(1000)
+                w.writeframes(bytes(1500))
+        index = LibraryIndex(MusicLoader.SUPPORTED_FORMATS, db_path=tmp_path / 'library.db')
+        loader = MusicLoader(library_index=index)
+        
+        music_list = loader.load_folder(str(music))
+        # Escaneamento só faz stat: a duração vem do extrator de metadados
+        assert [m['duration'] for m in music_list] == [None, None]
+        extractor = MetadataExtractor(cache=MetadataCache(db_path=tmp_path / 'metadata.db'),
+                                      workers=1)
+        extractor.enrich(music_list)
+        extractor.wait(timeout=30)
+        extractor.shutdown()
+        assert [m['duration'] for m in music_list] == [pytest.approx(1.5)] * 2
+        assert index.store_durations(music_list) == 2
+        assert index.store_durations(music_list) == 0
+        assert index.total_duration(str(music)) == pytest.approx(3.0)
+        assert loader.get_total_duration() == pytest.approx(3.0)
+        assert [m['duration'] for m in loader.load_folder(str(music))] == [pytest.approx(1.5)] * 2
+
+class TestFolderWatcher:
+    """Testes para o monitor de pasta"""
+    
+    @pytest.mark.parametrize('use_inotify', [True, False])
+    def test_reports_deltas(self, tmp_path, monkeypatch, use_inotify):
+        """Testa adição, remoção e renomeação (inotify e verificação por mtime)"""
+        monkeypatch.setattr(WatchedTree, 'WRITE_SETTLE_TIME', 0.2)
+        (tmp_path / "a.mp3").write_bytes(b"a")
+        (tmp_path / "b.mp3").write_bytes(b"b")
+        received = []
+        watcher = FolderWatcher(MusicLoader.SUPPORTED_FORMATS,
+                                on_change=lambda folder, changes: received.append(changes),
+                                interval=0.05, use_inotify=use_inotify)
+        watcher.watch(str(tmp_path))
+        assert watcher.ready.wait(5)
+        
+        time.sleep(0.02)  # Garante mtime diferente da pasta na verificação periódica
+        (tmp_path / "c.mp3").write_bytes(b"c")
+        (tmp_path / "a.mp3").unlink()
+        os.rename(tmp_path / "b.mp3", tmp_path / "d.mp3")
+        (tmp_path / "notes.txt").write_text("x")
+        
+        # c.mp3 acabou de ser gravado: chega numa rodada depois das outras mudanças
+        deadline = time.time() + 5
+        while not any(delta.added for delta in received) and time.time() < deadline:
+            time.sleep(0.02)
+        watcher.stop()
+        
+        changes = FolderChanges()
+        for delta in received:
+            changes.added += delta.added
+            changes.removed += delta.removed
+            changes.renamed += delta.renamed
+        assert [m['name'] for m in changes.added] == ["c"]
+        assert changes.removed == [str(tmp_path / "a.mp3")]
+        assert [(old, new['name']) for old, new in changes.renamed] == [
+            (str(tmp_path / "b.mp3"), "d")]
+
+    def test_waits_for_files_being_written(self, tmp_path):
+        """Testa que um arquivo novo modificado há pouco só é informado depois de assentar"""
+        scanner = DirectoryScanner(MusicLoader.SUPPORTED_FORMATS)
+        tree = WatchedTree(scanner, PollingBackend(1.0))
+        tree.snapshot_tree(str(tmp_path))
+        (tmp_path / "copiando.mp3").write_bytes(b"parcial")
+
+        assert not tree.collect_changes({str(tmp_path)})
+        assert tree.retry == {str(tmp_path)}
+
+        old = time.time() - 2 * WatchedTree.WRITE_SETTLE_TIME
+        os.utime(tmp_path / "copiando.mp3", (old, old))
+        changes = tree.collect_changes(set())
+        assert [m['name'] for m in changes.added] == ["copiando"]
+        assert not tree.retry
+
+    @pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify só no Linux")
+    def test_inotify_waits_for_close_write(self, tmp_path):
+        """Testa que o IN_CREATE de um arquivo não acorda o monitor antes do fim da gravação"""
+        backend = InotifyBackend(0.05)
+        try:
+            assert backend.add(str(tmp_path))
+            with open(tmp_path / "copiando.mp3", 'wb') as f:
+                f.write(b"parcial")
+                f.flush()
+                assert backend.wait() == set()
+            assert backend.wait() == {str(tmp_path)}
+        finally:
+            backend.close()
+            backend.release()
+
+    @pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify só no Linux")
+    def test_inotify_refused_watch_falls_back_to_polling(self, tmp_path):
+        """Testa que pastas recusadas pelo inotify (wd < 0) são verificadas por mtime"""
+        backend = InotifyBackend(0.05)
+        try:
+            backend.add_watch = lambda fd, path, mask: -1  # Limite de watches atingido
+            assert backend.add(str(tmp_path)) is False
+            assert str(tmp_path) in backend.fallback.mtimes
+            time.sleep(0.02)
+            (tmp_path / "nova.mp3").write_bytes(b"x")
+            assert backend.wait() == {str(tmp_path)}
+        finally:
+            backend.close()
+            backend.release()
+
+    @pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify só no Linux")
+    def test_inotify_flags_queue_overflow(self, tmp_path):
+        """Testa que o IN_Q_OVERFLOW é guardado até a próxima consulta"""
+        backend = InotifyBackend(0.05)
+        read_fd, write_fd = os.pipe()
+        inotify_fd, backend.fd = backend.fd, read_fd
+        try:
+            os.write(write_fd, InotifyBackend.EVENT_HEADER.pack(-1, InotifyBackend.IN_Q_OVERFLOW, 0, 0))
+            dirty = set()
+            backend.read_events(dirty)
+            assert dirty == set()
+            assert backend.take_overflow() is True
+            assert backend.take_overflow() is False
+        finally:
+            backend.fd = inotify_fd
+            os.close(read_fd)
+            os.close(write_fd)
+            backend.close()
+            backend.release()
+
+    def test_overflow_rescans_every_folder(self, tmp_path, monkeypatch):
+        """Testa que, com eventos perdidos, o monitor relê todas as pastas"""
+        (tmp_path / "sub").mkdir()
+        overflows = [True]
+
+        class LossyBackend(PollingBackend):
+            def wait(self):
+                self.stop_event.wait(self.interval)
+                return set()  # Os eventos se perderam
+
+            def take_overflow(self):
+                return bool(overflows) and overflows.pop()
+
+        received = []
+        watcher = FolderWatcher(MusicLoader.SUPPORTED_FORMATS,
+                                on_change=lambda folder, changes: received.append(changes),
+                                interval=0.05, use_inotify=False)
+        monkeypatch.setattr(watcher, 'create_backend', lambda: LossyBackend(0.05))
+        (tmp_path / "sub" / "nova.mp3").write_bytes(b"x")
+        old = time.time() - 2 * WatchedTree.WRITE_SETTLE_TIME
+        os.utime(tmp_path / "sub" / "nova.mp3", (old, old))
+        monkeypatch.setattr(WatchedTree, 'snapshot_tree',
+                            lambda tree, directory: tree.load_snapshot(
+                                {directory: {str(tmp_path / "sub")}, str(tmp_path / "sub"): set()},
+                                {}))
+        watcher.watch(str(tmp_path))
+        deadline = time.time() + 5
+        while not received and time.time() < deadline:
+            time.sleep(0.02)
+        watcher.stop()
+
+        assert [m['name'] for m in received[0].added] == ["nova"]
+
+    def test_initial_snapshot_from_index(self, tmp_path, monkeypatch):
+        """Testa que a foto inicial vem do índice, depois da reconciliação, sem reler o disco"""
+        music = tmp_path / "music"
+        (music / "sub").mkdir(parents=True)
+        (music / "a.mp3").write_bytes(b"a")
+        (music / "sub" / "b.mp3").write_bytes(b"b")
+        index = LibraryIndex(MusicLoader.SUPPORTED_FORMATS, db_path=tmp_path / "library.db")
+        index.reconcile(str(music))
+        def fail(tree, directory, changes=None):
+            raise AssertionError("percorreu a pasta de novo")
+        monkeypatch.setattr(WatchedTree, 'snapshot_tree', fail)
+
+        received = []
+        watcher = FolderWatcher(MusicLoader.SUPPORTED_FORMATS,
+                                on_change=lambda folder, changes: received.append(changes),
+                                interval=0.05, use_inotify=False, library_index=index)
+        reconciled = threading.Event()
+        watcher.watch(str(music), reconciled)
+        assert not watcher.ready.wait(0.2)  # Espera a reconciliação
+        reconciled.set()
+        assert watcher.ready.wait(5)
+
+        time.sleep(0.02)
+        (music / "sub" / "b.mp3").unlink()
+        deadline = time.time() + 5
+        while not received and time.time() < deadline:
+            time.sleep(0.02)
+        watcher.stop()
+
+        assert received[0].removed == [str(music / "sub" / "b.mp3")]
+        assert not received[0].added
+
+    def test_music_entry_leaves_duration_to_metadata(self, tmp_path):
+        """Testa que music_entry não lê o arquivo (a duração vem do extrator de metadados)"""
+        assert music_entry(str(tmp_path / "x.mp3"))['duration'] is None
+
+    def test_loader_applies_changes(self, tmp_path):
+        """Testa que o MusicLoader aplica as diferenças mantendo a ordem por nome"""
+        for name in ["b", "d"]:
+            (tmp_path / f"{name}.mp3").write_bytes(b"x")
+        loader = MusicLoader()
+        old_list = loader.load_folder(str(tmp_path))
+        old_list[1]['title'] = "Dê"
+        
+        changes = FolderChanges()
+        changes.added.append(music_entry(str(tmp_path / "a.mp3")))
+        changes.removed.append(str(tmp_path / "b.mp3"))
+        changes.renamed.append((str(tmp_path / "d.mp3"),
+                                music_entry(str(tmp_path / "c.mp3"))))
+        
+        assert loader.apply_changes(str(tmp_path), changes) is True
+        music_list = loader.get_music_list()
+        assert [m['name'] for m in music_list] == ["a", "c"]
+        assert music_list[1]['title'] == "Dê"
+        assert [m['name'] for m in old_list] == ["b", "d"]  # Lista antiga intacta
+        assert loader.apply_changes("/outra/pasta", changes) is False
+
+class FakeMixer:
+    """Mixer falso que registra as chamadas (no lugar de pygame.mixer.music)"""
+    
+    def __init__(self, set_pos_supported=True):
+        self.calls = []
+        self.set_pos_supported = set_pos_supported
+    
+    def load(self, path):
+        self.calls.append(('load', path))
+    
+    def rewind(self):
+        self.calls.append(('rewind',))
+    
+    def set_pos(self, position):
+        if not self.set_pos_supported:
+            raise RuntimeError("set_pos unsupported")
+        self.calls.append(('set_pos', position))
+    
+    def play(self, start=0.0):
+        self.calls.append(('play', start))
+    
+    def queue(self, path):
+        self.calls.append(('queue', path))
+    
+    def set_volume(self, volume):
+        self.calls.append(('set_volume', volume))
+    
+    def set_endevent(self, event_type):
+        self.calls.append(('set_endevent', event_type))
+
+class FakePygame:
+    """Módulo pygame falso: mixer.music e fila de eventos"""
+    
+    USEREVENT = 32850
+    
+    def __init__(self):
+        self.mixer = type('Mixer', (), {'init': lambda self: None})()
+        self.mixer.music = FakeMixer()
+        self.pending_events = []
+        self.event = type('Event', (), {'get': self.get_events})
+    
+    def get_events(self, event_type):
+        events = [e for e in self.pending_events if e == event_type]
+        self.pending_events = [e for e in self.pending_events if e != event_type]
+        return events
+
+class TestSeekController:
+    """Testes para o controle de busca"""
+    
+    def test_drag_is_coalesced(self):
+        """Testa que arrastar gera só prévias e uma única busca ao soltar"""
+        mixer = FakeMixer()
+        previews = []
+        seek = SeekController(mixer=mixer, on_preview=previews.append)
+        
+        seek.press(10.0)
+        for i in range(50):
+            seek.drag(10.0 + i)
+        assert mixer.calls == []
+        
+        assert seek.release('/m/song.mp3') == 59.0
+        assert mixer.calls == [('rewind',), ('set_pos', 59.0)]
+        assert len(previews) == 51
+    
+    def test_mp3_seek_is_absolute(self):
+        """Testa que o MP3 volta ao início antes do set_pos (que é relativo nele)"""
+        mixer = FakeMixer()
+        seek = SeekController(mixer=mixer)
+        
+        assert seek.seek('/m/song.mp3', 30.0) is True
+        assert seek.seek('/m/song.mp3', 10.0) is True
+        assert seek.seek('/m/song.flac', 20.0) is True
+        assert mixer.calls == [('rewind',), ('set_pos', 30.0),
+                               ('rewind',), ('set_pos', 10.0),
+                               ('set_pos', 20.0)]
+    
+    def test_fallback_without_reload(self):
+        """Testa play(start) na música carregada quando set_pos não é suportado"""
+        mixer = FakeMixer(set_pos_supported=False)
+        seek = SeekController(mixer=mixer)
+        
+        assert seek.seek('/m/song.ogg', 30.0) is True
+        assert seek.seek('/m/song.wav', 5.0) is True
+        assert mixer.calls == [('play', 30.0), ('play', 5.0)]
+        assert not any(call[0] == 'load' for call in mixer.calls)
+    
+    def test_seek_latency(self):
+        """Mede a latência da busca (sem reabrir/decodificar o arquivo)"""
+        seek = SeekController(mixer=FakeMixer())
+        seek.press(1.0)
+        seek.drag(42.0)
+        seek.release('/m/song.flac')
+        
+        assert seek.last_latency is not None
+        assert seek.last_latency < 0.005
+    
+    def test_position_from_fraction(self):
+        """Testa conversão da fração da barra em segundos"""
+        assert SeekController.position_from_fraction(0.5, 200) == 100
+        assert SeekController.position_from_fraction(1.5, 200) == 200
+        assert SeekController.position_from_fraction(-1, 200) == 0
+
+class TestGaplessPlayback:
+    """Testes para a troca de faixa sem intervalo"""
+    
+    def test_peek_next_index(self):
+        """Testa a previsão da próxima faixa em cada modo"""
+        assert peek_next_index(2, 5, False, None, 'off') == 3
+        assert peek_next_index(4, 5, False, None, 'off') is None
+        assert peek_next_index(4, 5, False, None, 'all') == 0
+        assert peek_next_index(2, 5, False, None, 'one') == 2
+        assert peek_next_index(2, 5, True, 4, 'off') == 4
+        assert peek_next_index(2, 5, True, None, 'all') is None
+        assert peek_next_index(-1, 5, False, None, 'off') is None
+    
+    def test_next_track_is_queued_not_loaded(self, tmp_path):
+        """Testa que a próxima faixa vai para a fila do mixer, sem load()"""
+        fake = FakePygame()
+        playback = GaplessPlayback(pygame_module=fake)
+        first, second = tmp_path / "a.ogg", tmp_path / "b.ogg"
+        first.write_bytes(b"a" * 100)
+        second.write_bytes(b"b" * 100)
+        
+        playback.play(str(first))
+        assert playback.prepare_next(str(second)) is True
+        assert playback.prepare_next(str(second)) is True
+        calls = fake.mixer.music.calls
+        assert [c for c in calls if c[0] == 'load'] == [('load', str(first))]
+        assert [c for c in calls if c[0] == 'queue'] == [('queue', str(second))]
+    
+    def test_poll_reports_transition(self):
+        """Testa que o evento de fim indica a faixa que começou"""
+        fake = FakePygame()
+        playback = GaplessPlayback(pygame_module=fake)
+        playback.play('/m/a.mp3')
+        playback.prepare_next('/m/b.mp3')
+        assert playback.poll() is None
+        
+        fake.pending_events.append(playback.end_event)
+        assert playback.poll() == '/m/b.mp3'
+        assert playback.current_path == '/m/b.mp3'
+        assert playback.queued_path is None
+        assert playback.last_transition is not None
+    
+    def test_seek_requeues_next_track(self):
+        """Testa que a busca descarta a fila e a próxima faixa é enfileirada de novo"""
+        fake = FakePygame()
+        fake.mixer.music.set_pos_supported = False  # Busca cai no play(start)
+        output = PygameOutput(pygame_module=fake)
+        output.play('/m/a.ogg')
+        assert output.queue_next('/m/b.ogg') is True
+        
+        assert output.seek('/m/a.ogg', 30.0) is True
+        assert output.playback.queued_path is None
+        fake.pending_events.append(output.playback.end_event)
+        assert output.poll_transition() is None  # A faixa descartada não começou
+        
+        assert output.queue_next('/m/b.ogg') is True
+        calls = fake.mixer.music.calls
+        assert [c for c in calls if c[0] == 'queue'] == [('queue', '/m/b.ogg')] * 2
+    
+    def test_without_event_queue_gapless_is_disabled(self):
+        """Testa que, sem fila de eventos do pygame, a faixa toca sem enfileirar a próxima"""
+        fake = FakePygame()
+        def no_video(event_type):
+            raise RuntimeError("video system not initialized")
+        fake.event.get = staticmethod(no_video)
+        playback = GaplessPlayback(pygame_module=fake)
+        playback.play('/m/a.mp3')
+        assert playback.events_available is False
+        assert playback.prepare_next('/m/b.mp3') is False
+        assert playback.poll() is None
+        assert [c for c in fake.mixer.music.calls if c[0] == 'load'] == [('load', '/m/a.mp3')]
+    
+    def test_external_load_clears_queue(self):
+        """Testa que trocar de faixa por fora invalida a fila"""
+        playback = GaplessPlayback(pygame_module=FakePygame())
+        playback.play('/m/a.mp3')
+        playback.prepare_next('/m/b.mp3')
+        playback.track_started('/m/c.mp3')
+        assert playback.queued_path is None
+
+class TestPlayerEngine:
+    """Testes para o núcleo de reprodução (sem Tk, com saída simulada)"""
+    
+    def make_engine(self, count=4, duration=10.0, **options):
+        clock = [0.0]
+        tracks = TrackTable([{'path': f'/m/{i}.mp3', 'name': str(i), 'extension': '.mp3',
+                              'folder': '/m', 'duration': duration} for i in range(count)])
+        loader = MusicLoader()
+        loader.load_tracks('/m', tracks)
+        output = NullOutput(clock=lambda: clock[0], duration_of=lambda path: duration)
+        changes = []
+        engine = PlayerEngine(loader, output, on_track_change=changes.append,
+                              clock=lambda: clock[0], **options)
+        engine.reset_shuffle(keep_current=False)
+        return engine, clock, changes
+    
+    def advance(self, engine, clock, seconds, step=0.2):
+        """Avança o relógio chamando poll() como o loop do player"""
+        for _ in range(round(seconds / step)):
+            clock[0] += step
+            engine.poll()
+    
+    def test_play_pause_and_position(self):
+        """Posição anda com o relógio e para durante a pausa"""
+        engine, clock, changes = self.make_engine()
+        engine.play_pause()
+        assert changes == [0] and engine.is_playing
+        self.advance(engine, clock, 3)
+        assert engine.position() == pytest.approx(3.0)
+        engine.play_pause()
+        clock[0] += 5
+        assert engine.is_paused
+        assert engine.position() == pytest.approx(3.0)
+        engine.play_pause()
+        clock[0] += 1
+        assert engine.position() == pytest.approx(4.0)
+    
+    def test_unknown_length_filled_later(self):
+        """Duração desconhecida fica 0 (sem ler o arquivo) até chegar em segundo plano"""
+        engine, clock, changes = self.make_engine(duration=None)
+        engine.play_pause()
+        assert engine.song_length == 0
+
+        other = engine.music_loader.get_music_by_index(1)
+        other['duration'] = 5.0
+        engine.refresh_song_length(other)
+        assert engine.song_length == 0
+
+        current = engine.current_music()
+        current['duration'] = 7.0
+        engine.refresh_song_length(current)
+        assert engine.song_length == 7.0
+
+    def test_gapless_advance_and_end_of_list(self):
+        """Faixas se emendam pela fila da saída e a reprodução para no fim da lista"""
+        engine, clock, changes = self.make_engine(count=3)
+        engine.play_pause()
+        self.advance(engine, clock, 25)
+        assert changes == [0, 1, 2]
+        assert engine.position() == pytest.approx(5.0, abs=0.3)
+        self.advance(engine, clock, 10)
+        assert not engine.is_playing
+        assert changes == [0, 1, 2]
+
+    def test_seek_while_paused_stays_paused(self):
+        """Buscar com a música pausada não retoma nem é tratado como fim da faixa"""
+        engine, clock, changes = self.make_engine()
+        ended = []
+        engine.on_track_end = lambda music, seconds: ended.append(music['name'])
+        engine.play_pause()
+        clock[0] += 2
+        engine.play_pause()
+        assert engine.seek(7.0)
+        self.advance(engine, clock, 5)
+        assert engine.is_paused and engine.current_index == 0
+        assert engine.position() == pytest.approx(7.0)
+        assert ended == [] and changes == [0]
+        engine.play_pause()
+        clock[0] += 1
+        assert engine.position() == pytest.approx(8.0)
+
+    def test_track_end_reports_time_listened(self):
+        """O histórico recebe o tempo ouvido (sem pausas nem buscas), não a duração"""
+        engine, clock, changes = self.make_engine(count=3)
+        ended = []
+        engine.on_track_end = lambda music, seconds: ended.append((music['name'], seconds))
+        engine.play_pause()
+        clock[0] += 2
+        engine.play_pause()
+        clock[0] += 30  # Pausada: não conta
+        engine.play_pause()
+        clock[0] += 1
+        engine.seek(9.0)  # Pular para o fim não conta como ouvido
+        engine.next()
+        assert ended == [("0", pytest.approx(3.0))]
+
+        self.advance(engine, clock, 11)  # Faixa 1 inteira, emendada na 2
+        assert ended[1] == ("1", pytest.approx(10.0, abs=0.3))
+        clock[0] += 4
+        engine.close()
+        assert ended[2][0] == "2"
+        assert ended[1][1] + ended[2][1] == pytest.approx(15.0)
+
+    def test_repeat_modes(self):
+        """'Repetir uma' fica na faixa; 'repetir todas' volta ao início"""
+        engine, clock, changes = self.make_engine(count=2, repeat_mode='one')
+        engine.play_pause()
+        self.advance(engine, clock, 21)
+        assert changes == [0, 0, 0]
+        
+        engine, clock, changes = self.make_engine(count=2, repeat_mode='all')
+        engine.play_pause()
+        self.advance(engine, clock, 31)
+        assert changes == [0, 1, 0, 1]
+    
+    def test_previous_restarts_or_goes_back(self):
+        """'Anterior' reinicia a faixa depois de alguns segundos, senão volta uma"""
+        engine, clock, changes = self.make_engine()
+        engine.play_track(2)
+        clock[0] += 5
+        engine.previous()
+        assert engine.current_index == 2
+        assert engine.position() == pytest.approx(0.0)
+        engine.previous()
+        assert changes == [2, 2, 1]
+    
+    def test_enqueue_plays_next(self):
+        """Música enfileirada toca antes da ordem normal, mesmo fora da lista"""
+        engine, clock, changes = self.make_engine(count=3)
+        engine.play_pause()
+        engine.enqueue('/m/2.mp3')
+        engine.enqueue('/outra/nova.mp3')
+        self.advance(engine, clock, 25)
+        assert changes == [0, 2, 3]
+        assert engine.current_music()['path'] == '/outra/nova.mp3'
+        assert not engine.up_next
+    
+    def test_seek(self):
+        """Busca muda a posição sem trocar de faixa"""
+        engine, clock, changes = self.make_engine()
+        engine.play_pause()
+        assert engine.seek(7.5)
+        clock[0] += 1
+        assert engine.position() == pytest.approx(8.5)
+        self.advance(engine, clock, 2)
+        assert changes == [0, 1]
+    
+    def test_shuffle_plays_every_track_once(self):
+        """Modo aleatório toca cada faixa uma vez e para no fim da volta"""
+        engine, clock, changes = self.make_engine(count=6, duration=1.0, shuffle_mode=True)
+        engine.play_pause()
+        self.advance(engine, clock, 10)
+        assert sorted(changes) == list(range(6))
+        assert not engine.is_playing
+    
+    def test_mute_and_volume(self):
+        """Mudo zera o volume da saída e devolve o anterior"""
+        engine, clock, changes = self.make_engine(volume=0.6)
+        engine.toggle_mute()
+        assert engine.is_muted and engine.output.volume == 0
+        engine.toggle_mute()
+        assert not engine.is_muted and engine.output.volume == pytest.approx(0.6)
+        engine.set_volume(2)
+        assert engine.volume == 1.0
+    
+    def test_session_round_trip(self):
+        """Faixa, posição e ordem aleatória voltam iguais (sem tocar)"""
+        engine, clock, changes = self.make_engine(count=5, shuffle_mode=True)
+        engine.play_pause()
+        engine.next()
+        clock[0] += 4
+        upcoming = engine.peek_shuffle()  # Já sorteada: entra no instantâneo
+        session = engine.session_state()
+        
+        restored, _, restored_changes = self.make_engine(count=5, shuffle_mode=True)
+        restored.restore_session(session)
+        assert restored.current_index == engine.current_index
+        assert restored.position() == pytest.approx(4.0)
+        assert restored.peek_shuffle() == upcoming
+        assert not restored.is_playing and restored_changes == []
+
+class TestPositionTracker:
+    """Testes para a posição pelo relógio e o redesenho econômico da barra"""
+    
+    def test_anchored_position(self):
+        """Posição anda só enquanto toca e segue pausa/busca/parada"""
+        clock = [100.0]
+        tracker = PositionTracker(clock=lambda: clock[0])
+        tracker.start(5.0)
+        clock[0] += 2
+        assert tracker.position() == pytest.approx(7.0)
+        tracker.pause()
+        clock[0] += 10
+        assert tracker.position() == pytest.approx(7.0)
+        tracker.resume()
+        tracker.seek(30.0)
+        clock[0] += 1
+        assert tracker.position() == pytest.approx(31.0)
+        tracker.stop(12.0)
+        clock[0] += 1
+        assert tracker.position() == 12.0 and not tracker.running
+    
+    def test_redraws_only_on_visible_change(self):
+        """Barra só redesenha ao mudar de pixel; o tempo, ao mudar de segundo"""
+        bars, times = [], []
+        progress = ProgressThrottle(bars.append, lambda second, length: times.append(second))
+        for tick in range(50):  # 5 s a cada 100 ms, barra de 100 px numa música de 200 s
+            progress.update(tick / 10, 200.0, 100)
+        assert bars == [0, 1, 2]
+        assert times == [0, 1, 2, 3, 4]
+        progress.reset()
+        progress.update(4.9, 200.0, 100)
+        assert bars[-1] == 2 and times[-1] == 4 and len(times) == 6
+    
+    def test_next_delay(self):
+        """Timer dorme até o próximo pixel ou segundo e desacelera escondido/pausado"""
+        progress = ProgressThrottle(lambda pixel: None, lambda second, length: None)
+        # 60 s em 240 px: um pixel a cada 250 ms
+        assert progress.next_delay_ms(1.25, 60.0, 240, playing=True) == 250
+        # Sem barra (modo mini): só o segundo importa
+        assert progress.next_delay_ms(1.25, 60.0, 240, playing=True, show_bar=False) == 750
+        # Música longa numa barra estreita: acorda uma vez por segundo
+        assert progress.next_delay_ms(10.0, 3600.0, 300, playing=True) == 1000
+        assert progress.next_delay_ms(1.0, 60.0, 600, playing=False) == ProgressThrottle.MAX_DELAY_MS
+        assert (progress.next_delay_ms(1.0, 60.0, 600, playing=True, hidden=True)
+                == ProgressThrottle.HIDDEN_DELAY_MS)
+        assert progress.next_delay_ms(1.0999, 1.0, 100000, playing=True) == ProgressThrottle.MIN_DELAY_MS
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
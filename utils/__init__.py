@@ -1,8 +1,30 @@
 """Utils package"""
-from .music_loader import MusicLoader
-from .playlist_manager import PlaylistManager
-from .media_keys import MediaKeyListener
-from .config_manager import ConfigManager
-from .history_manager import HistoryManager
+from importlib import import_module
 
-__all__ = ['MusicLoader', 'PlaylistManager', 'MediaKeyListener', 'ConfigManager', 'HistoryManager']
+# Nome exportado -> módulo; importado só no primeiro acesso (ex.: utils.MusicLoader)
+_EXPORTS = {
+    'MusicLoader': 'music_loader',
+    'PlaylistManager': 'playlist_manager',
+    'MediaKeyListener': 'media_keys',
+    'ConfigManager': 'config_manager',
+    'HistoryManager': 'history_manager',
+    'LibraryIndex': 'library_index',
+    'DirectoryScanner': 'scanner',
+    'MetadataExtractor': 'metadata',
+    'MetadataCache': 'metadata',
+    'FavoritesStore': 'favorites',
+    'ListeningStats': 'stats',
+    'FolderWatcher': 'folder_watcher',
+    'TrackPlaylistStore': 'track_playlists',
+    'PlayerEngine': 'player_engine',
+    'PygameOutput': 'audio_output',
+    'NullOutput': 'audio_output',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f'.{module}', __name__), name)
@@ -0,0 +1,241 @@
+"""
+Saídas de áudio do player
+PygameOutput toca de verdade; NullOutput só simula o relógio (testes, servidores sem som)
+"""
+import time
+from typing import Callable, Optional
+
+from .durations import get_duration
+from .lazy import Deferred
+from .playback import GaplessPlayback
+from .seek import SeekController
+
+class AudioOutput:
+    """
+    Interface usada pelo PlayerEngine
+
+    A posição não é lida da saída: o motor a calcula pelo relógio
+    (PositionTracker), ancorada em play/pause/seek.
+    """
+
+    def start(self):
+        """Prepara a saída em segundo plano (opcional)"""
+
+    def play(self, path: str, start: float = 0.0):
+        raise NotImplementedError
+
+    def pause(self):
+        raise NotImplementedError
+
+    def unpause(self):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    def set_volume(self, volume: float):
+        raise NotImplementedError
+
+    def is_busy(self) -> bool:
+        """True enquanto há música tocando"""
+        raise NotImplementedError
+
+    def seek(self, path: str, position: float) -> bool:
+        raise NotImplementedError
+
+    def queue_next(self, path: str) -> bool:
+        """Enfileira a próxima faixa para emendar sem intervalo"""
+        return False
+
+    def poll_transition(self) -> Optional[str]:
+        """Caminho da faixa enfileirada que começou a tocar (ou None)"""
+        return None
+
+    def close(self):
+        """Libera o dispositivo de áudio"""
+
+class PygameOutput(AudioOutput):
+    """Saída pelo pygame.mixer (inicializado em segundo plano ou no primeiro uso)"""
+
+    def __init__(self, volume: float = 1.0, pygame_module=None):
+        """
+        Args:
+            volume: Volume inicial (0 a 1)
+            pygame_module: Módulo pygame (padrão: importado na inicialização; testes usam um falso)
+        """
+        self.volume = volume
+        self.pygame_module = pygame_module
+        self.audio = Deferred(self.init_audio)
+        self.playback = GaplessPlayback(pygame_module)
+        self.seeker = SeekController(mixer=pygame_module.mixer.music if pygame_module else None)
+
+    def init_audio(self):
+        """Importa o pygame e inicializa o mixer"""
+        pygame = self.pygame_module
+        if pygame is None:
+            import pygame
+        pygame.mixer.init()
+        pygame.mixer.music.set_volume(self.volume)
+        return pygame
+
+    @property
+    def pygame(self):
+        """Módulo pygame com o mixer pronto (espera a inicialização se necessário)"""
+        return self.audio.get()
+
+    @property
+    def music(self):
+        return self.pygame.mixer.music
+
+    def start(self):
+        self.audio.start()
+
+    def play(self, path: str, start: float = 0.0):
+        self.pygame  # Garante o mixer inicializado
+        self.playback.play(path, start)
+
+    def pause(self):
+        self.music.pause()
+
+    def unpause(self):
+        self.music.unpause()
+
+    def stop(self):
+        if self.audio.loaded:
+            self.music.stop()
+            self.playback.track_started(None)
+
+    def set_volume(self, volume: float):
+        self.volume = volume
+        if self.audio.loaded:  # Senão, init_audio aplica o volume atual
+            self.music.set_volume(volume)
+
+    def is_busy(self) -> bool:
+        return self.audio.loaded and self.music.get_busy()
+
+    def seek(self, path: str, position: float) -> bool:
+        if not self.seeker.seek(path, position):
+            return False
+        # O play(start) de reserva descarta a fila do mixer; o motor enfileira de novo
+        self.playback.discard_queue()
+        return True
+
+    def queue_next(self, path: str) -> bool:
+        if not self.audio.loaded:
+            return False
+        return self.playback.prepare_next(path)
+
+    def poll_transition(self) -> Optional[str]:
+        if not self.audio.loaded:
+            return None
+        return self.playback.poll()
+
+    def close(self):
+        if self.audio.loaded:
+            self.pygame.mixer.quit()
+
+class NullOutput(AudioOutput):
+    """
+    Saída sem som: um relógio que avança como se a música estivesse tocando
+
+    Respeita a duração das faixas (termina, emenda a enfileirada, pausa e
+    busca), então o PlayerEngine se comporta como com áudio de verdade.
+    Com clock controlado, os testes avançam o tempo sem esperar.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 duration_of: Callable[[str], Optional[float]] = get_duration):
+        """
+        Args:
+            clock: Relógio em segundos
+            duration_of: Duração de uma faixa (None = nunca termina)
+        """
+        self.clock = clock
+        self.duration_of = duration_of
+        self.volume = 1.0
+        self.current_path = None
+        self.queued_path = None
+        self.started_at = None   # Relógio no play() (ajustado pelas pausas)
+        self.paused_at = None
+        self.track_begin = 0.0   # Tempo tocado quando a faixa atual começou
+        self.track_start = 0.0   # Posição da faixa nesse instante
+        self.duration = None
+        self.playing = False
+        self.transitions = []
+
+    def elapsed(self) -> float:
+        """Segundos tocados desde o play()"""
+        if self.started_at is None:
+            return 0.0
+        now = self.paused_at if self.paused_at is not None else self.clock()
+        return now - self.started_at
+
+    def update(self):
+        """Aplica o fim das faixas que já deveriam ter terminado"""
+        while self.playing and self.duration is not None:
+            end = self.track_begin + self.duration - self.track_start
+            if self.elapsed() < end:
+                break
+            if self.queued_path:
+                self.current_path, self.queued_path = self.queued_path, None
+                self.track_begin, self.track_start = end, 0.0
+                self.duration = self.duration_of(self.current_path)
+                self.transitions.append(self.current_path)
+            else:
+                self.playing = False
+
+    def play(self, path: str, start: float = 0.0):
+        self.current_path = path
+        self.queued_path = None
+        self.started_at = self.clock()
+        self.paused_at = None
+        self.track_begin = 0.0
+        self.track_start = start
+        self.duration = self.duration_of(path)
+        self.playing = True
+        self.transitions = []
+
+    def pause(self):
+        if self.paused_at is None and self.playing:
+            self.update()
+            self.paused_at = self.clock()
+
+    def unpause(self):
+        if self.paused_at is not None:
+            self.started_at += self.clock() - self.paused_at
+            self.paused_at = None
+
+    def stop(self):
+        self.playing = False
+        self.current_path = self.queued_path = None
+        self.started_at = self.paused_at = None
+
+    def set_volume(self, volume: float):
+        self.volume = volume
+
+    def is_busy(self) -> bool:
+        self.update()
+        return self.playing and self.paused_at is None
+
+    def position(self) -> float:
+        """Posição dentro da faixa atual em segundos"""
+        self.update()
+        return self.track_start + self.elapsed() - self.track_begin
+
+    def seek(self, path: str, position: float) -> bool:
+        if path != self.current_path or not self.playing:
+            return False
+        self.update()
+        self.track_begin = self.elapsed()
+        self.track_start = position
+        return True
+
+    def queue_next(self, path: str) -> bool:
+        if not self.playing:
+            return False
+        self.queued_path = path
+        return True
+
+    def poll_transition(self) -> Optional[str]:
+        self.update()
+        return self.transitions.pop(0) if self.transitions else None
@@ -0,0 +1,119 @@
+"""
+Fila de comandos para a thread do Tk
+Threads de fundo (teclas de mídia, IPC, monitores) enfileiram; o loop do Tk executa
+"""
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+class CommandQueue:
+    """
+    Fila sem lock entre produtores em segundo plano e a thread principal
+
+    push() pode ser chamado de qualquer thread: usa só deque.append (atômico)
+    e, se houver schedule, o chama quando a fila estava parada (ex.: acordar
+    um Event). Sem schedule, a thread principal chama drain() periodicamente
+    (no Tk, um root.after recorrente: o Tk não pode ser tocado de outras
+    threads). drain() junta comandos repetidos em sequência conforme o modo
+    de cada um:
+
+    - None: executa cada um
+    - 'sum': handler(soma dos valores) - dez "volume +1" viram um "+10"
+    - 'last': handler(último valor)
+    - 'toggle': handler() só se a quantidade for ímpar (dois play/pause se anulam)
+
+    A latência (push -> fim da execução) de cada comando fica registrada.
+    """
+
+    MODES = (None, 'sum', 'last', 'toggle')
+    # Amostras de latência guardadas por comando
+    LATENCY_SAMPLES = 256
+
+    def __init__(self, schedule: Optional[Callable[[Callable], None]] = None):
+        """
+        Args:
+            schedule: Avisa a thread principal que há um drain() a fazer (chamado
+                      de qualquer thread); None se ela mesma consulta a fila
+        """
+        self.schedule = schedule
+        self.pending = deque()
+        self.scheduled = False
+        self.handlers: Dict[str, tuple] = {}
+        self.latencies: Dict[str, deque] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def register(self, name: str, handler: Callable, mode: Optional[str] = None):
+        """Associa um comando a uma função executada na thread principal"""
+        if mode not in self.MODES:
+            raise ValueError(f"modo de comando inválido: {mode!r}")
+        self.handlers[name] = (handler, mode)
+
+    def push(self, name: str, value=None):
+        """Enfileira um comando (seguro em qualquer thread)"""
+        self.pending.append((name, value, time.perf_counter()))
+        if self.schedule and not self.scheduled:
+            self.scheduled = True
+            self.schedule(self.drain)
+
+    def drain(self):
+        """Executa os comandos pendentes (thread principal)"""
+        # Zera antes de esvaziar: um push durante o drain agenda outro ou é pego agora
+        self.scheduled = False
+        batch = []
+        while True:
+            try:
+                batch.append(self.pending.popleft())
+            except IndexError:
+                break
+
+        start = 0
+        while start < len(batch):
+            name = batch[start][0]
+            end = start + 1
+            if self.handlers.get(name, (None, None))[1] is not None:
+                while end < len(batch) and batch[end][0] == name:
+                    end += 1
+            self.run(name, batch[start:end])
+            start = end
+
+    def run(self, name: str, group):
+        """Executa um grupo de comandos iguais seguidos"""
+        handler, mode = self.handlers.get(name, (None, None))
+        if handler is None:
+            print(f"⚠️  Comando desconhecido: {name}")
+            return
+        try:
+            if mode == 'sum':
+                handler(sum(value for _, value, _ in group))
+            elif mode == 'last':
+                handler(group[-1][1])
+            elif mode == 'toggle':
+                if len(group) % 2:
+                    handler()
+            elif group[0][1] is None:
+                handler()
+            else:
+                handler(group[0][1])
+        except Exception as e:
+            print(f"Erro ao executar comando {name}: {e}")
+
+        finished = time.perf_counter()
+        samples = self.latencies.setdefault(name, deque(maxlen=self.LATENCY_SAMPLES))
+        for _, _, pushed_at in group:
+            samples.append((finished - pushed_at) * 1000)
+        self.executed += 1
+        self.coalesced += len(group) - 1
+
+    def latency_report(self) -> Dict[str, Dict[str, float]]:
+        """Latência em ms por comando (amostras recentes): média, p95 e máximo"""
+        report = {}
+        for name, samples in self.latencies.items():
+            ordered = sorted(samples)
+            report[name] = {
+                'count': len(ordered),
+                'mean_ms': sum(ordered) / len(ordered),
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                'max_ms': ordered[-1],
+            }
+        return report
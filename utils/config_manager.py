@@ -3,15 +3,33 @@ Gerenciador de configurações do usuário
 Salva preferências entre sessões
 """
 import json
+import os
+import tempfile
+import threading
 from pathlib import Path
+from .favorites import FavoritesStore
 
 class ConfigManager:
-    """Gerencia configurações persistentes do aplicativo"""
+    """
+    Gerencia configurações persistentes do aplicativo
     
-    def __init__(self):
-        self.config_dir = Path.home() / '.music_player'
+    As alterações só marcam a configuração como modificada; uma thread grava o
+    arquivo no máximo uma vez a cada FLUSH_DELAY segundos (arrastar o slider de
+    volume vira uma única gravação). flush() força a gravação pendente.
+    """
+    
+    # Intervalo mínimo entre gravações do config.json (segundos)
+    FLUSH_DELAY = 0.5
+    
+    def __init__(self, config_dir=None, flush_delay=None):
+        self.config_dir = Path(config_dir) if config_dir else Path.home() / '.music_player'
         self.config_file = self.config_dir / 'config.json'
         self.config_dir.mkdir(exist_ok=True)
+        self.flush_delay = self.FLUSH_DELAY if flush_delay is None else flush_delay
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # Uma gravação por vez, na ordem das alterações
+        self.dirty = False
+        self.flush_timer = None
         
         # Configurações padrão
         self.default_config = {
@@ -22,10 +40,13 @@ class ConfigManager:
             'window_height': 600,
             'last_playlist': None,
             'shuffle_enabled': False,
-            'favorites': []
+            'smart_shuffle': False,
+            'scan_workers': 8
         }
         
         self.config = self.load_config()
+        self.favorites = FavoritesStore(self.config_dir / 'favorites.log')
+        self.migrate_favorites()
     
     def load_config(self):
         """Carrega configurações do arquivo JSON"""
@@ -41,42 +62,86 @@ class ConfigManager:
             return self.default_config.copy()
     
     def save_config(self):
-        """Salva configurações no arquivo JSON"""
+        """Salva configurações no arquivo JSON (arquivo temporário + rename atômico)"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            with self.write_lock:
+                with self.lock:
+                    data = json.dumps(self.config, indent=2, ensure_ascii=False)
+                fd, temp_path = tempfile.mkstemp(dir=self.config_dir, prefix='.config-',
+                                                 suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        f.write(data)
+                    os.replace(temp_path, self.config_file)
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
             return True
         except Exception as e:
             print(f"Erro ao salvar configurações: {e}")
             return False
     
+    def mark_dirty(self):
+        """Agenda a gravação (se já houver uma agendada, ela leva esta alteração junto)"""
+        with self.lock:
+            self.dirty = True
+            if self.flush_timer is None:
+                self.flush_timer = threading.Timer(self.flush_delay, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+    
+    def flush(self):
+        """Grava agora as alterações pendentes"""
+        with self.lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            if not self.dirty:
+                return True
+            self.dirty = False
+        if self.save_config():
+            return True
+        with self.lock:
+            self.dirty = True  # Não gravou: a próxima alteração ou flush() tenta de novo
+        return False
+    
     def get(self, key, default=None):
         """Obtém uma configuração"""
         return self.config.get(key, default)
     
     def set(self, key, value):
-        """Define uma configuração e salva"""
-        self.config[key] = value
-        self.save_config()
+        """Define uma configuração (gravada em segundo plano)"""
+        with self.lock:  # save_config serializa o dicionário na thread do timer
+            self.config[key] = value
+        self.mark_dirty()
+    
+    def migrate_favorites(self):
+        """Move a lista antiga de favoritos do config.json para o FavoritesStore"""
+        legacy = self.config.pop('favorites', None)
+        if legacy is not None:
+            self.favorites.add_many(legacy)
+            self.mark_dirty()
     
     def add_favorite(self, music_path):
         """Adiciona música aos favoritos"""
-        favorites = self.config.get('favorites', [])
-        if music_path not in favorites:
-            favorites.append(music_path)
-            self.set('favorites', favorites)
-            return True
-        return False
+        return self.favorites.add(music_path)
     
     def remove_favorite(self, music_path):
         """Remove música dos favoritos"""
-        favorites = self.config.get('favorites', [])
-        if music_path in favorites:
-            favorites.remove(music_path)
-            self.set('favorites', favorites)
-            return True
-        return False
+        return self.favorites.remove(music_path)
+    
+    def add_favorites(self, music_paths):
+        """Adiciona várias músicas aos favoritos (uma única gravação)"""
+        return self.favorites.add_many(music_paths)
+    
+    def remove_favorites(self, music_paths):
+        """Remove várias músicas dos favoritos (uma única gravação)"""
+        return self.favorites.remove_many(music_paths)
     
     def is_favorite(self, music_path):
         """Verifica se música é favorita"""
-        return music_path in self.config.get('favorites', [])
+        return music_path in self.favorites
+    
+    def get_favorites(self):
+        """Lista de favoritos na ordem em que foram marcados"""
+        return self.favorites.get_all()
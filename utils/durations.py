@@ -0,0 +1,223 @@
+"""
+Cálculo da duração das músicas lendo apenas o cabeçalho dos arquivos
+Suporta MP3 (Xing/VBRI/CBR), FLAC, OGG (Vorbis/Opus), WAV e M4A sem decodificar áudio
+"""
+import os
+import struct
+from typing import Optional
+
+# Bitrates MP3 (kbps) por [versão MPEG 1?][layer]
+MP3_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def get_duration(path: str) -> Optional[float]:
+    """
+    Retorna a duração em segundos a partir do cabeçalho do arquivo
+
+    Args:
+        path: Caminho da música
+
+    Returns:
+        Duração em segundos ou None se o formato não for reconhecido
+    """
+    parsers = {
+        '.mp3': mp3_duration,
+        '.flac': flac_duration,
+        '.ogg': ogg_duration,
+        '.wav': wav_duration,
+        '.m4a': m4a_duration,
+    }
+    parser = parsers.get(os.path.splitext(path)[1].lower())
+    if parser is None:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            duration = parser(f)
+    except (OSError, struct.error, ValueError, IndexError):
+        return None
+    return duration if duration and duration > 0 else None
+
+def format_duration(seconds) -> str:
+    """Formata segundos como MM:SS ou H:MM:SS"""
+    seconds = int(seconds or 0)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+def skip_id3v2(f) -> int:
+    """Pula a tag ID3v2 (se houver) e retorna o offset do início do áudio"""
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b'ID3':
+        size = ((header[6] & 0x7F) << 21 | (header[7] & 0x7F) << 14 |
+                (header[8] & 0x7F) << 7 | (header[9] & 0x7F))
+        offset = 10 + size + (10 if header[5] & 0x10 else 0)
+    else:
+        offset = 0
+    f.seek(offset)
+    return offset
+
+def mp3_duration(f) -> Optional[float]:
+    """MP3: usa o cabeçalho Xing/Info ou VBRI; sem eles assume bitrate constante"""
+    start = skip_id3v2(f)
+    data = f.read(64 * 1024)
+
+    # Procura o primeiro frame válido
+    for i in range(len(data) - 4):
+        if data[i] != 0xFF or (data[i + 1] & 0xE0) != 0xE0:
+            continue
+        version_bits = (data[i + 1] >> 3) & 0x03
+        layer = 4 - ((data[i + 1] >> 1) & 0x03)
+        bitrate_index = data[i + 2] >> 4
+        rate_index = (data[i + 2] >> 2) & 0x03
+        if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+            continue
+        break
+    else:
+        return None
+
+    mpeg1 = version_bits == 3
+    sample_rate = MP3_SAMPLE_RATES[version_bits][rate_index]
+    bitrate = MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    if layer == 1:
+        samples_per_frame = 384
+    elif layer == 3 and not mpeg1:
+        samples_per_frame = 576
+    else:
+        samples_per_frame = 1152
+
+    mono = (data[i + 3] >> 6) == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    xing = data[i + 4 + side_info:i + 4 + side_info + 12]
+    if xing[:4] in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', xing[4:8])[0]
+        if flags & 0x01:
+            frames = struct.unpack('>I', xing[8:12])[0]
+            return frames * samples_per_frame / sample_rate
+
+    vbri = data[i + 36:i + 36 + 18]
+    if vbri[:4] == b'VBRI':
+        frames = struct.unpack('>I', vbri[14:18])[0]
+        return frames * samples_per_frame / sample_rate
+
+    # Bitrate constante: tamanho do áudio / bitrate
+    f.seek(0, os.SEEK_END)
+    audio_size = f.tell() - start - i
+    f.seek(-128, os.SEEK_END)
+    if f.read(3) == b'TAG':
+        audio_size -= 128
+    return audio_size * 8 / bitrate
+
+def flac_duration(f) -> Optional[float]:
+    """FLAC: total de amostras e taxa do bloco STREAMINFO"""
+    skip_id3v2(f)
+    if f.read(4) != b'fLaC':
+        return None
+    block_header = f.read(4)
+    if block_header[0] & 0x7F != 0:
+        return None
+    info = f.read(34)
+    sample_rate = (info[10] << 12) | (info[11] << 4) | (info[12] >> 4)
+    total_samples = ((info[13] & 0x0F) << 32) | struct.unpack('>I', info[14:18])[0]
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+def ogg_duration(f) -> Optional[float]:
+    """OGG: granule position da última página dividido pela taxa de amostragem"""
+    first_page = f.read(128)
+    if first_page[:4] != b'OggS':
+        return None
+    segments = first_page[26]
+    packet = first_page[27 + segments:]
+    pre_skip = 0
+    if packet[:7] == b'\x01vorbis':
+        sample_rate = struct.unpack('<I', packet[12:16])[0]
+    elif packet[:8] == b'OpusHead':
+        sample_rate = 48000
+        pre_skip = struct.unpack('<H', packet[10:12])[0]
+    else:
+        return None
+
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(max(0, size - 64 * 1024))
+    tail = f.read()
+    last = tail.rfind(b'OggS')
+    if last < 0 or last + 14 > len(tail):
+        return None
+    granule = struct.unpack('<q', tail[last + 6:last + 14])[0]
+    if granule <= 0 or not sample_rate:
+        return None
+    return (granule - pre_skip) / sample_rate
+
+def wav_duration(f) -> Optional[float]:
+    """WAV: tamanho do chunk 'data' dividido pelo byte rate do chunk 'fmt '"""
+    header = f.read(12)
+    if header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return None
+    byte_rate = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, chunk_size = chunk[:4], struct.unpack('<I', chunk[4:8])[0]
+        if chunk_id == b'fmt ':
+            fmt = f.read(chunk_size)
+            byte_rate = struct.unpack('<I', fmt[8:12])[0]
+            if chunk_size % 2:
+                f.seek(1, os.SEEK_CUR)
+        elif chunk_id == b'data':
+            if not byte_rate:
+                return None
+            return chunk_size / byte_rate
+        else:
+            f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+def m4a_duration(f) -> Optional[float]:
+    """M4A/MP4: duração e timescale do átomo moov/mvhd"""
+    f.seek(0, os.SEEK_END)
+    end = f.tell()
+    offset = 0
+    # Procura o átomo moov no nível superior (pode estar no fim do arquivo)
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, kind = struct.unpack('>I4s', f.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            return None
+        if kind == b'moov':
+            return _mvhd_duration(f, offset + header_size, offset + size)
+        offset += size
+    return None
+
+def _mvhd_duration(f, start, end) -> Optional[float]:
+    """Procura o mvhd dentro do moov"""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, kind = struct.unpack('>I4s', f.read(8))
+        if size < 8:
+            return None
+        if kind == b'mvhd':
+            version = f.read(4)[0]
+            if version == 1:
+                _, _, timescale, duration = struct.unpack('>QQIQ', f.read(28))
+            else:
+                _, _, timescale, duration = struct.unpack('>IIII', f.read(16))
+            return duration / timescale if timescale else None
+        offset += size
+    return None
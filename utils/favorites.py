@@ -0,0 +1,113 @@
+"""
+Armazenamento das músicas favoritas
+Conjunto em memória + log só de acréscimos (favorites.log), separado do config.json
+"""
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable, List
+
+class FavoritesStore:
+    """
+    Favoritos com consulta O(1) e gravação incremental
+
+    Cada alteração acrescenta uma linha ao log ('+caminho' ou '-caminho'); ao
+    abrir, o log é reaplicado num dict (mantém a ordem em que foram marcadas).
+    Quando o log fica muito maior que o conjunto ele é reescrito compactado.
+    """
+
+    # Reescreve o log quando tiver mais linhas que isso além do necessário
+    COMPACT_SLACK = 1000
+
+    def __init__(self, log_file):
+        self.log_file = Path(log_file)
+        self.lock = threading.Lock()
+        self.favorites = {}
+        self.log_lines = 0
+        self.load()
+
+    def load(self):
+        """Reaplica o log do arquivo"""
+        favorites = {}
+        lines = 0
+        try:
+            if self.log_file.exists():
+                with open(self.log_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.rstrip('\n')
+                        if not line:
+                            continue
+                        lines += 1
+                        if line[0] == '+':
+                            favorites[line[1:]] = None
+                        elif line[0] == '-':
+                            favorites.pop(line[1:], None)
+        except Exception as e:
+            print(f"Erro ao carregar favoritos: {e}")
+        self.favorites = favorites
+        self.log_lines = lines
+
+    def append_log(self, lines: List[str]):
+        """Acrescenta operações ao log numa única gravação"""
+        if not lines:
+            return
+        try:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(line + '\n' for line in lines))
+            self.log_lines += len(lines)
+            if self.log_lines > 2 * len(self.favorites) + self.COMPACT_SLACK:
+                self.compact()
+        except Exception as e:
+            print(f"Erro ao salvar favoritos: {e}")
+
+    def compact(self):
+        """Reescreve o log só com os favoritos atuais (arquivo temporário + rename)"""
+        fd, temp_path = tempfile.mkstemp(dir=self.log_file.parent, prefix='.favorites-',
+                                         suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(''.join('+' + path + '\n' for path in self.favorites))
+            os.replace(temp_path, self.log_file)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.log_lines = len(self.favorites)
+
+    def add_many(self, paths: Iterable[str]) -> int:
+        """Adiciona vários favoritos gravando uma vez; retorna quantos eram novos"""
+        with self.lock:
+            added = []
+            for path in paths:
+                if path not in self.favorites:
+                    self.favorites[path] = None
+                    added.append('+' + path)
+            self.append_log(added)
+            return len(added)
+
+    def remove_many(self, paths: Iterable[str]) -> int:
+        """Remove vários favoritos gravando uma vez; retorna quantos existiam"""
+        with self.lock:
+            removed = []
+            for path in paths:
+                if path in self.favorites:
+                    del self.favorites[path]
+                    removed.append('-' + path)
+            self.append_log(removed)
+            return len(removed)
+
+    def add(self, path: str) -> bool:
+        return self.add_many((path,)) == 1
+
+    def remove(self, path: str) -> bool:
+        return self.remove_many((path,)) == 1
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.favorites
+
+    def __len__(self) -> int:
+        return len(self.favorites)
+
+    def get_all(self) -> List[str]:
+        """Favoritos na ordem em que foram marcados"""
+        return list(self.favorites)
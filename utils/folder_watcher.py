@@ -0,0 +1,417 @@
+"""
+Monitoramento da pasta aberta
+Detecta músicas adicionadas, removidas e renomeadas sem reescanear a pasta inteira
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Set
+
+from .scanner import DirectoryScanner
+
+class FolderChanges:
+    """Diferenças encontradas numa rodada do monitor"""
+
+    def __init__(self):
+        self.added: List[Dict] = []           # Músicas novas (dict do MusicLoader)
+        self.removed: List[str] = []          # Caminhos que sumiram
+        self.renamed: List[tuple] = []        # (caminho antigo, dict da música no novo caminho)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.renamed)
+
+    def __repr__(self):
+        return (f"FolderChanges(added={len(self.added)}, removed={len(self.removed)}, "
+                f"renamed={len(self.renamed)})")
+
+class PollingBackend:
+    """Verifica periodicamente o mtime das pastas (funciona em qualquer sistema)"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.mtimes: Dict[str, int] = {}
+        self.stop_event = threading.Event()
+
+    def add(self, directory: str) -> bool:
+        try:
+            self.mtimes[directory] = os.stat(directory).st_mtime_ns
+        except OSError:
+            return False
+        return True
+
+    def remove(self, directory: str):
+        self.mtimes.pop(directory, None)
+
+    def wait(self) -> Set[str]:
+        """Espera um intervalo e retorna as pastas cujo mtime mudou"""
+        if self.stop_event.wait(self.interval):
+            return set()
+        return self.changed()
+
+    def changed(self) -> Set[str]:
+        """Pastas cujo mtime mudou desde a última verificação (sem esperar)"""
+        dirty = set()
+        for directory, mtime in list(self.mtimes.items()):
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime:
+                dirty.add(directory)
+                if current is not None:
+                    self.mtimes[directory] = current
+        return dirty
+
+    def take_overflow(self) -> bool:
+        return False
+
+    def close(self):
+        self.stop_event.set()
+
+    def release(self):
+        pass
+
+class InotifyBackend:
+    """
+    Eventos do kernel (Linux) via inotify, acessado com ctypes
+
+    Pastas que o kernel recusa (ex.: limite max_user_watches atingido) passam
+    a ser verificadas por mtime a cada intervalo. Arquivos só contam quando
+    terminam de ser gravados (IN_CLOSE_WRITE) ou chegam por rename
+    (IN_MOVED_TO); o IN_CREATE só interessa para subpastas novas. Se a fila
+    do kernel transbordar (IN_Q_OVERFLOW), eventos se perderam e o monitor
+    relê todas as pastas.
+    """
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+                  IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+    # Depois do primeiro evento, espera um pouco para juntar os seguintes
+    SETTLE_TIME = 0.2
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.add_watch = libc.inotify_add_watch
+        self.rm_watch = libc.inotify_rm_watch
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.watches: Dict[int, str] = {}
+        self.directories: Dict[str, int] = {}
+        self.fallback = PollingBackend(interval)  # Pastas sem watch do inotify
+        self.overflowed = False
+        self.closed = False
+        # Pipe para acordar o select quando o monitor é parado
+        self.wake_read, self.wake_write = os.pipe()
+
+    def add(self, directory: str) -> bool:
+        """Monitora a pasta; se o inotify recusar, ela entra na verificação por mtime"""
+        wd = self.add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            if not self.fallback.mtimes:
+                error = ctypes.get_errno()
+                print(f"⚠️  inotify recusou {directory} ({os.strerror(error)}), "
+                      "usando verificação periódica para as pastas restantes")
+            self.fallback.add(directory)
+            return False
+        self.watches[wd] = directory
+        self.directories[directory] = wd
+        return True
+
+    def remove(self, directory: str):
+        self.fallback.remove(directory)
+        wd = self.directories.pop(directory, None)
+        if wd is not None:
+            self.watches.pop(wd, None)
+            self.rm_watch(self.fd, wd)
+
+    def read_events(self, dirty: Set[str]):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & self.IN_CREATE and not mask & self.IN_ISDIR:
+                continue  # Arquivo ainda sendo gravado: espera o IN_CLOSE_WRITE
+            directory = self.watches.get(wd)
+            if directory is not None:
+                dirty.add(directory)
+
+    def take_overflow(self) -> bool:
+        """A fila do kernel transbordou desde a última consulta?"""
+        overflowed, self.overflowed = self.overflowed, False
+        return overflowed
+
+    def wait(self) -> Set[str]:
+        """Bloqueia até chegarem eventos (ou o intervalo acabar) e retorna as pastas afetadas"""
+        dirty = set()
+        timeout = self.interval
+        # Cópias e extrações geram rajadas de eventos: agrupa numa rodada só
+        while not self.closed:
+            ready, _, _ = select.select([self.fd, self.wake_read], [], [], timeout)
+            if self.fd not in ready or self.closed:
+                break
+            self.read_events(dirty)
+            if self.overflowed:
+                break
+            timeout = self.SETTLE_TIME
+        if self.fallback.mtimes and not self.closed:
+            dirty |= self.fallback.changed()
+        return dirty
+
+    def close(self):
+        """Pede para o wait() retornar (pode ser chamado de outra thread)"""
+        if not self.closed:
+            self.closed = True
+            os.write(self.wake_write, b'x')
+
+    def release(self):
+        """Libera os descritores (chamado pela thread do monitor ao sair)"""
+        for fd in (self.fd, self.wake_read, self.wake_write):
+            os.close(fd)
+
+class WatchedTree:
+    """
+    Foto de uma árvore de pastas (caminho -> inode por pasta)
+
+    A foto inicial vem do índice da biblioteca quando a pasta já foi
+    indexada (load_snapshot), sem percorrer o disco de novo. Cada pasta que o backend indicar como alterada é comparada com a foto
+    anterior dela, então só ela é relida. Um inode que some de um caminho e
+    aparece em outro na mesma rodada é informado como renomeação. Arquivos
+    novos modificados há pouco (ainda sendo copiados) ficam para a rodada
+    seguinte, para ninguém ler a duração de um arquivo pela metade.
+    """
+
+    # Arquivo novo modificado há menos que isso (s) ainda pode estar sendo gravado
+    WRITE_SETTLE_TIME = 1.0
+
+    def __init__(self, scanner, backend):
+        self.scanner = scanner
+        self.backend = backend
+        self.snapshots: Dict[str, Dict[str, int]] = {}
+        self.subdirs: Dict[str, Set[str]] = {}
+        self.retry: Set[str] = set()  # Pastas com arquivos novos ainda sendo gravados
+
+    def settled(self, entry) -> bool:
+        """O arquivo novo já parou de ser gravado?"""
+        try:
+            return time.time() - entry.stat().st_mtime >= self.WRITE_SETTLE_TIME
+        except OSError:
+            return True  # Sumiu enquanto a pasta era lida: a próxima rodada resolve
+
+    def defer(self, directory: str, path: str):
+        """Tira da foto um arquivo ainda sendo gravado e revê a pasta na próxima rodada"""
+        self.snapshots.get(directory, {}).pop(path, None)
+        self.retry.add(directory)
+
+    def load_snapshot(self, subdirs: Dict[str, Set[str]], snapshots: Dict[str, Dict[str, int]]):
+        """Usa a árvore já conhecida (ex.: LibraryIndex.snapshot) como foto inicial"""
+        for directory, children in subdirs.items():
+            self.backend.add(directory)
+            self.snapshots[directory] = dict(snapshots.get(directory, {}))
+            self.subdirs[directory] = set(children)
+
+    def snapshot_tree(self, directory: str, changes: FolderChanges = None):
+        """Fotografa uma pasta nova (e subpastas); com changes, conta as músicas como novas"""
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            try:
+                files, subdirs = self.scanner.scan_directory(current)
+            except OSError:
+                continue
+            self.backend.add(current)
+            self.snapshots[current] = {entry.path: entry.inode() for entry in files}
+            self.subdirs[current] = set(subdirs)
+            if changes is not None:
+                for entry in files:
+                    if self.settled(entry):
+                        changes.added.append(music_entry(entry.path))
+                    else:
+                        self.defer(current, entry.path)
+            pending.extend(subdirs)
+
+    def forget_tree(self, directory: str, removed: Dict[int, str]):
+        """Esquece uma pasta que sumiu, marcando suas músicas como removidas"""
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            self.backend.remove(current)
+            for path, inode in self.snapshots.pop(current, {}).items():
+                removed[removal_key(path, inode)] = path
+            pending.extend(self.subdirs.pop(current, ()))
+
+    def collect_changes(self, dirty: Set[str]) -> FolderChanges:
+        """Compara as pastas afetadas com a foto anterior de cada uma"""
+        changes = FolderChanges()
+        added: Dict[int, str] = {}
+        removed: Dict[int, str] = {}
+        fresh: Dict[str, str] = {}  # Caminho novo modificado há pouco -> pasta
+        dirty, self.retry = dirty | self.retry, set()
+
+        for directory in sorted(dirty):
+            if directory not in self.snapshots:
+                continue
+            try:
+                files, subdirs = self.scanner.scan_directory(directory)
+            except OSError:
+                self.forget_tree(directory, removed)
+                continue
+
+            before = self.snapshots[directory]
+            current = {entry.path: entry.inode() for entry in files}
+            fresh.update((entry.path, directory) for entry in files
+                         if entry.path not in before and not self.settled(entry))
+            for path, inode in current.items():
+                if path not in before or before[path] not in (None, inode):
+                    added[inode] = path
+            for path, inode in before.items():
+                if path not in current or inode not in (None, current[path]):
+                    removed[removal_key(path, inode)] = path
+            self.snapshots[directory] = current
+
+            old_subdirs = self.subdirs.get(directory, set())
+            new_subdirs = set(subdirs)
+            for gone in old_subdirs - new_subdirs:
+                self.forget_tree(gone, removed)
+            for new in sorted(new_subdirs - old_subdirs):
+                self.snapshot_tree(new, changes)
+            self.subdirs[directory] = new_subdirs
+
+        for inode, path in added.items():
+            old_path = removed.pop(inode, None)
+            if old_path is None and path in fresh:
+                self.defer(fresh[path], path)  # Renomeações valem na hora; cópias esperam
+            elif old_path is None:
+                changes.added.append(music_entry(path))
+            else:
+                changes.renamed.append((old_path, music_entry(path)))
+        changes.removed.extend(removed.values())
+        return changes
+
+class FolderWatcher:
+    """
+    Monitora uma pasta (e subpastas) numa thread e avisa as diferenças
+
+    O backend só diz quais pastas mudaram: inotify no Linux e, nos demais
+    sistemas (ou se o inotify falhar), verificação periódica do mtime das pastas.
+    """
+
+    # Intervalo da verificação por mtime (e timeout do inotify)
+    POLL_INTERVAL = 2.0
+
+    def __init__(self, extensions, on_change: Callable[[str, FolderChanges], None],
+                 interval: float = None, use_inotify: bool = True, scanner=None,
+                 library_index=None):
+        """
+        Args:
+            extensions: Extensões de música aceitas
+            on_change: Chamado na thread do monitor com (pasta raiz, FolderChanges)
+            interval: Intervalo da verificação por mtime em segundos
+            use_inotify: Usa inotify quando disponível (Linux)
+            library_index: Fonte da foto inicial das pastas já indexadas
+        """
+        self.scanner = scanner or DirectoryScanner(extensions)
+        self.library_index = library_index
+        self.on_change = on_change
+        self.interval = self.POLL_INTERVAL if interval is None else interval
+        self.use_inotify = use_inotify
+        self.root = None
+        self.backend = None
+        self.ready = threading.Event()  # Foto inicial pronta
+
+    def create_backend(self):
+        if self.use_inotify and sys.platform.startswith('linux'):
+            try:
+                return InotifyBackend(self.interval)
+            except (OSError, AttributeError) as e:
+                print(f"⚠️  inotify indisponível, usando verificação periódica: {e}")
+        return PollingBackend(self.interval)
+
+    def watch(self, folder: str, index_ready: threading.Event = None):
+        """
+        Passa a monitorar a pasta (parando o monitoramento anterior)
+
+        Args:
+            index_ready: Sinalizado quando a reconciliação do índice dessa pasta
+                         terminar; a foto inicial espera por ela e é lida do índice
+        """
+        self.stop()
+        self.root = folder
+        self.ready = threading.Event()
+        backend = self.backend = self.create_backend()
+        threading.Thread(target=self._run, args=(folder, backend, self.ready, index_ready),
+                         daemon=True).start()
+
+    def stop(self):
+        """Para o monitoramento (a thread termina sozinha, sem bloquear quem chamou)"""
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+    def _run(self, folder, backend, ready, index_ready):
+        tree = WatchedTree(self.scanner, backend)
+        try:
+            while index_ready is not None and not index_ready.wait(self.interval):
+                if self.backend is not backend:
+                    return
+            if self.library_index is not None and self.library_index.has_folder(folder):
+                tree.load_snapshot(*self.library_index.snapshot(folder))
+            else:
+                tree.snapshot_tree(folder)
+            ready.set()
+            while self.backend is backend:
+                dirty = backend.wait()
+                if backend.take_overflow():
+                    print("⚠️  Eventos da pasta perdidos (fila do inotify cheia), relendo tudo")
+                    dirty = set(tree.snapshots)
+                if not (dirty or tree.retry) or self.backend is not backend:
+                    continue
+                changes = tree.collect_changes(dirty)
+                if changes and self.backend is backend:
+                    try:
+                        self.on_change(folder, changes)
+                    except Exception as e:
+                        print(f"Erro ao aplicar mudanças da pasta: {e}")
+        finally:
+            ready.set()
+            backend.release()
+
+def removal_key(path: str, inode):
+    """Chave de uma música removida: o inode (para achar renomeações) ou o caminho"""
+    return path if inode is None else inode
+
+def music_entry(path: str) -> Dict:
+    """
+    Dict de música no formato do MusicLoader
+
+    Só o caminho: a duração fica para o extrator de metadados (ler o
+    cabeçalho aqui seguraria o monitor em arquivos grandes ou na rede).
+    """
+    name, extension = os.path.splitext(os.path.basename(path))
+    return {'path': path, 'name': name, 'extension': extension,
+            'folder': os.path.dirname(path), 'duration': None}
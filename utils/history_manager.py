@@ -1,68 +1,180 @@
 """
 Gerenciador de histórico de reprodução
-Mantém registro das últimas músicas tocadas
+Registra todas as músicas tocadas num log só de acréscimos (history.jsonl)
 """
 import json
+import os
+import tempfile
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 from datetime import datetime
+from .stats import ListeningStats
 
 class HistoryManager:
-    """Gerencia o histórico de reprodução"""
-    
-    def __init__(self, max_entries=50):
-        self.config_dir = Path.home() / '.music_player'
-        self.history_file = self.config_dir / 'history.json'
+    """
+    Gerencia o histórico de reprodução
+
+    Cada reprodução vira uma linha JSON acrescentada ao fim do arquivo (O(1)),
+    sem limite de retenção. Em memória ficam as entradas em ordem cronológica
+    e índices por música, então as consultas não releem o arquivo.
+    max_entries só limita quantas músicas distintas get_history() devolve.
+    As estatísticas de escuta (self.stats) são atualizadas a cada entrada.
+
+    O arquivo só é reescrito ao carregar, e apenas se houver linhas inválidas
+    (gravação interrompida) ou o history.json antigo para migrar. No player o
+    carregamento roda numa thread de fundo (Deferred), fora da thread do Tk.
+    """
+
+    # Salva os agregados de estatísticas a cada tantos acréscimos
+    STATS_SAVE_EVERY = 50
+
+    def __init__(self, max_entries=50, config_dir=None):
+        self.config_dir = Path(config_dir) if config_dir else Path.home() / '.music_player'
+        self.history_file = self.config_dir / 'history.jsonl'
+        self.legacy_file = self.config_dir / 'history.json'
         self.config_dir.mkdir(exist_ok=True)
         self.max_entries = max_entries
-        self.history = self.load_history()
-    
+        self.entries = []      # Todas as reproduções, da mais antiga para a mais recente
+        self.timestamps = []   # Timestamp (float) de cada entrada, para buscas por período
+        self.plays = {}        # caminho -> índices das entradas daquela música
+        self.last_played = {}  # caminho -> última entrada (ordem = mais recente por último)
+        self.appends_since_save = 0
+        self.stats = ListeningStats(self.config_dir / 'stats.json')
+        self.stats.load()
+        self.load_history()
+
     def load_history(self):
-        """Carrega histórico do arquivo"""
+        """Carrega histórico do arquivo (migrando o history.json antigo se existir)"""
+        self.reset_indexes()
+        needs_compact = False
         try:
             if self.history_file.exists():
                 with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            self.index_entry(json.loads(line))
+                        except (ValueError, KeyError, TypeError):
+                            needs_compact = True  # Linha incompleta (ex.: queda durante a gravação)
+            elif self.legacy_file.exists():
+                with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                    for entry in reversed(json.load(f)):
+                        self.index_entry(entry)
+                needs_compact = True
         except Exception as e:
             print(f"Erro ao carregar histórico: {e}")
-            return []
-    
-    def save_history(self):
-        """Salva histórico no arquivo"""
+
+        if needs_compact and self.compact() and self.legacy_file.exists():
+            self.legacy_file.unlink()
+        # Só as reproduções que ainda não estavam nos agregados salvos
+        self.stats.sync(self.entries)
+        return self.entries
+
+    def reset_indexes(self):
+        self.entries = []
+        self.timestamps = []
+        self.plays = {}
+        self.last_played = {}
+
+    def index_entry(self, entry):
+        """Acrescenta uma entrada aos índices em memória"""
+        timestamp = datetime.fromisoformat(entry['timestamp']).timestamp()
+        path = entry['path']
+        index = len(self.entries)
+        self.entries.append(entry)
+        self.timestamps.append(timestamp)
+        self.plays.setdefault(path, []).append(index)
+        self.last_played.pop(path, None)
+        self.last_played[path] = entry
+
+    def compact(self):
+        """Reescreve o arquivo só com as entradas válidas (arquivo temporário + rename)"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, indent=2, ensure_ascii=False)
+            fd, temp_path = tempfile.mkstemp(dir=self.config_dir, prefix='.history-',
+                                             suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    for entry in self.entries:
+                        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                os.replace(temp_path, self.history_file)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            self.stats.save()
             return True
         except Exception as e:
-            print(f"Erro ao salvar histórico: {e}")
+            print(f"Erro ao compactar histórico: {e}")
             return False
-    
-    def add_entry(self, music_path, music_name):
-        """Adiciona entrada ao histórico"""
+
+    def save_history(self):
+        """Salva histórico no arquivo"""
+        return self.compact()
+
+    def add_entry(self, music_path, music_name, duration=None):
+        """Adiciona entrada ao histórico (duration em segundos, para o tempo ouvido)"""
         entry = {
             'path': music_path,
             'name': music_name,
             'timestamp': datetime.now().isoformat()
         }
-        
-        # Remove entradas antigas do mesmo arquivo
-        self.history = [h for h in self.history if h['path'] != music_path]
-        
-        # Adiciona no início
-        self.history.insert(0, entry)
-        
-        # Limita tamanho do histórico
-        self.history = self.history[:self.max_entries]
-        
-        self.save_history()
-    
+        if duration:
+            entry['duration'] = duration
+        self.index_entry(entry)
+        self.stats.add(entry)
+
+        try:
+            with open(self.history_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except Exception as e:
+            print(f"Erro ao salvar histórico: {e}")
+            return
+
+        self.appends_since_save += 1
+        if self.appends_since_save >= self.STATS_SAVE_EVERY:
+            self.appends_since_save = 0
+            self.stats.save()
+
     def get_history(self, limit=None):
-        """Retorna histórico (limitado opcionalmente)"""
-        if limit:
-            return self.history[:limit]
-        return self.history
-    
+        """Retorna histórico (músicas distintas, mais recente primeiro, limitado opcionalmente)"""
+        count = self.max_entries if not limit else min(limit, self.max_entries)
+        return self.get_recent_distinct(count)
+
+    def get_recent_distinct(self, count):
+        """Últimas 'count' músicas distintas tocadas, mais recente primeiro"""
+        recent = []
+        for entry in reversed(self.last_played.values()):
+            if len(recent) >= count:
+                break
+            recent.append(entry)
+        return recent
+
+    def get_play_count(self, music_path):
+        """Quantas vezes a música foi tocada"""
+        return len(self.plays.get(music_path, ()))
+
+    def get_plays(self, music_path):
+        """Todas as reproduções de uma música, da mais antiga para a mais recente"""
+        return [self.entries[i] for i in self.plays.get(music_path, ())]
+
+    def get_entries_between(self, start, end):
+        """
+        Reproduções num período (busca binária nos timestamps)
+
+        Args:
+            start: datetime inicial (inclusivo)
+            end: datetime final (inclusivo)
+        """
+        low = bisect_left(self.timestamps, start.timestamp())
+        high = bisect_right(self.timestamps, end.timestamp())
+        return self.entries[low:high]
+
     def clear_history(self):
         """Limpa todo o histórico"""
-        self.history = []
+        self.reset_indexes()
+        self.stats.reset()
         self.save_history()
+
+    def close(self):
+        """Salva os agregados pendentes (chamado ao fechar o aplicativo)"""
+        self.stats.save()
@@ -0,0 +1,154 @@
+"""
+Canal de controle local (socket Unix)
+Permite que uma segunda execução do player envie comandos para a que já está aberta
+"""
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+AVAILABLE = hasattr(socket, 'AF_UNIX')
+
+def default_socket_path() -> Path:
+    """Socket em ~/.music_player (ou no diretório de runtime do usuário, se houver)"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return Path(runtime_dir) / 'music_player.sock'
+    config_dir = Path.home() / '.music_player'
+    config_dir.mkdir(exist_ok=True)
+    return config_dir / 'control.sock'
+
+class ControlServer:
+    """
+    Recebe comandos de outras execuções do player
+
+    Protocolo: uma linha JSON por conexão ({"command": ..., "value": ...}) e
+    uma linha JSON de resposta ({"ok": true/false}). A resposta sai assim que
+    o comando é aceito; a execução fica com on_command (ex.: CommandQueue).
+    """
+
+    # Tamanho máximo de uma requisição
+    MAX_REQUEST = 64 * 1024
+    # Tempo máximo para um cliente mandar a requisição
+    CLIENT_TIMEOUT = 1.0
+
+    def __init__(self, on_command: Callable[[str, object], bool], socket_path=None):
+        """
+        Args:
+            on_command: Chamado na thread do servidor com (comando, valor);
+                        retorna False se o comando não for conhecido
+            socket_path: Caminho do socket (padrão: default_socket_path())
+        """
+        self.on_command = on_command
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self.server = None
+        self.thread = None
+        self.running = False
+
+    def start(self) -> bool:
+        """Abre o socket (False se não houver suporte ou outra instância já estiver ouvindo)"""
+        if not AVAILABLE:
+            print("⚠️  Socket Unix indisponível: controle por linha de comando desativado.")
+            return False
+        if self.socket_path.exists():
+            if send_command('ping', socket_path=self.socket_path) is not None:
+                return False
+            self.socket_path.unlink()  # Sobra de uma execução que não fechou direito
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.server.bind(str(self.socket_path))
+            os.chmod(self.socket_path, 0o600)
+            self.server.listen(8)
+        except OSError as e:
+            print(f"Erro ao abrir canal de controle: {e}")
+            self.server.close()
+            self.server = None
+            return False
+
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Fecha o socket e remove o arquivo"""
+        if not self.running:
+            return
+        self.running = False
+        # Acorda o accept() bloqueado
+        send_command('ping', socket_path=self.socket_path, timeout=0.2)
+        if self.thread:
+            self.thread.join(timeout=1)
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+    def _serve(self):
+        try:
+            while self.running:
+                try:
+                    connection, _ = self.server.accept()
+                except OSError:
+                    break
+                with connection:
+                    if self.running:
+                        self.handle(connection)
+        finally:
+            self.server.close()
+
+    def handle(self, connection):
+        """Lê uma requisição e responde"""
+        connection.settimeout(self.CLIENT_TIMEOUT)
+        try:
+            data = b''
+            while not data.endswith(b'\n') and len(data) < self.MAX_REQUEST:
+                chunk = connection.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+            request = json.loads(data)
+            command = request['command']
+            if command == 'ping':
+                ok = True
+            else:
+                ok = bool(self.on_command(command, request.get('value')))
+            reply = {'ok': ok}
+        except Exception as e:
+            reply = {'ok': False, 'error': str(e)}
+        try:
+            connection.sendall(json.dumps(reply).encode('utf-8') + b'\n')
+        except OSError:
+            pass
+
+def send_command(command: str, value=None, socket_path=None,
+                 timeout: float = 1.0) -> Optional[dict]:
+    """
+    Envia um comando para a instância aberta
+
+    Returns:
+        Resposta do servidor ou None se nenhuma instância estiver ouvindo
+    """
+    if not AVAILABLE:
+        return None
+    path = str(socket_path or default_socket_path())
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(path)
+            request = {'command': command}
+            if value is not None:
+                request['value'] = value
+            client.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            data = b''
+            while not data.endswith(b'\n'):
+                chunk = client.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        return json.loads(data) if data else None
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,44 @@
+"""
+Inicialização adiada de subsistemas
+Permite que a janela apareça antes de carregar o que é pesado
+"""
+import threading
+from typing import Callable
+
+_UNSET = object()
+
+class Deferred:
+    """
+    Valor criado só quando for preciso (ou antes, numa thread de fundo)
+
+    get() devolve o valor, criando-o na primeira chamada; se a criação já
+    estiver em andamento em segundo plano, espera por ela em vez de repetir.
+    """
+
+    def __init__(self, factory: Callable):
+        self.factory = factory
+        self.value = _UNSET
+        self.lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.value is not _UNSET
+
+    def get(self):
+        if self.value is _UNSET:
+            with self.lock:
+                if self.value is _UNSET:
+                    self.value = self.factory()
+        return self.value
+
+    def start(self):
+        """Cria o valor numa thread de fundo"""
+        if not self.loaded:
+            threading.Thread(target=self._load, daemon=True).start()
+
+    def _load(self):
+        try:
+            self.get()
+        except Exception as e:
+            # get() na thread principal tenta de novo e mostra o erro onde ele importa
+            print(f"Erro ao inicializar em segundo plano: {e}")
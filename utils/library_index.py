@@ -0,0 +1,289 @@
+"""
+Índice persistente da biblioteca de músicas
+Guarda caminho, tamanho e data de modificação em SQLite para permitir rescans incrementais
+"""
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Dict, Tuple
+from .scanner import DirectoryScanner
+from .track_table import TrackTable
+
+class LibraryIndex:
+    """Índice em disco das músicas já escaneadas (~/.music_player/library.db)"""
+
+    def __init__(self, extensions, db_path=None, scanner=None):
+        self.config_dir = Path.home() / '.music_player'
+        self.config_dir.mkdir(exist_ok=True)
+        self.db_path = Path(db_path) if db_path else self.config_dir / 'library.db'
+        self.scanner = scanner or DirectoryScanner(extensions)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.create_tables()
+
+    def create_tables(self):
+        """Cria as tabelas do índice caso ainda não existam"""
+        with self.lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    folder TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    extension TEXT NOT NULL,
+                    size INTEGER,
+                    mtime INTEGER,
+                    duration REAL,
+                    inode INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS idx_files_folder ON files(folder);
+                CREATE TABLE IF NOT EXISTS dirs (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    mtime INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent);
+            """)
+            # Índices criados antes das colunas de duração e inode
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(files)")]
+            if 'duration' not in columns:
+                self.conn.execute("ALTER TABLE files ADD COLUMN duration REAL")
+            if 'inode' not in columns:
+                self.conn.execute("ALTER TABLE files ADD COLUMN inode INTEGER")
+
+    @staticmethod
+    def normalize(folder_path: str) -> str:
+        """Normaliza o caminho da pasta usado como chave no índice"""
+        return os.path.normpath(folder_path)
+
+    @staticmethod
+    def subtree_bounds(folder: str) -> Tuple[str, str]:
+        """Intervalo lexicográfico [inicio, fim) que contém as subpastas de folder"""
+        prefix = folder.rstrip(os.sep) + os.sep
+        return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+    def has_folder(self, folder_path: str) -> bool:
+        """Verifica se a pasta já foi escaneada alguma vez"""
+        folder = self.normalize(folder_path)
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM dirs WHERE path = ?", (folder,)).fetchone()
+        return row is not None
+
+    def get_tracks(self, folder_path: str) -> TrackTable:
+        """
+        Retorna as músicas indexadas de uma pasta (recursivamente) sem tocar no disco
+
+        Args:
+            folder_path: Pasta raiz
+
+        Returns:
+            TrackTable ordenada por nome
+        """
+        folder = self.normalize(folder_path)
+        start, end = self.subtree_bounds(folder)
+        tracks = TrackTable()
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT folder, name, extension, duration FROM files "
+                "WHERE folder = ? OR (folder >= ? AND folder < ?)",
+                (folder, start, end))
+            for parent, name, extension, duration in rows:
+                tracks.add(parent, name, extension, duration)
+
+        tracks.sort_by_name()
+        return tracks
+
+    def get_folder_tracks(self, directory: str) -> List[Dict]:
+        """Retorna as músicas indexadas de um único nível de pasta"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT path, name, extension, duration FROM files WHERE folder = ?",
+                (directory,)).fetchall()
+        return [{'path': path, 'name': name, 'extension': extension, 'folder': directory,
+                 'duration': duration}
+                for path, name, extension, duration in rows]
+
+    def snapshot(self, folder_path: str) -> Tuple[Dict[str, set], Dict[str, Dict[str, int]]]:
+        """
+        Árvore indexada de uma pasta, sem tocar no disco (foto inicial do monitor)
+
+        Returns:
+            Tupla (pasta -> subpastas, pasta -> {caminho: inode}); o inode é None
+            nas linhas gravadas antes de o índice guardá-lo
+        """
+        root = self.normalize(folder_path)
+        start, end = self.subtree_bounds(root)
+        with self.lock:
+            dirs = self.conn.execute(
+                "SELECT path, parent FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+                (root, start, end)).fetchall()
+            files = self.conn.execute(
+                "SELECT folder, path, inode FROM files "
+                "WHERE folder = ? OR (folder >= ? AND folder < ?)",
+                (root, start, end)).fetchall()
+        subdirs = {path: set() for path, _ in dirs}
+        for path, parent in dirs:
+            if path != root and parent in subdirs:
+                subdirs[parent].add(path)
+        snapshots = {path: {} for path in subdirs}
+        for folder, path, inode in files:
+            snapshots.setdefault(folder, {})[path] = inode
+        return subdirs, snapshots
+
+    def total_duration(self, folder_path: str) -> float:
+        """Soma as durações indexadas de uma pasta (recursivamente) sem tocar no disco"""
+        folder = self.normalize(folder_path)
+        start, end = self.subtree_bounds(folder)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT SUM(duration) FROM files WHERE folder = ? OR (folder >= ? AND folder < ?)",
+                (folder, start, end)).fetchone()
+        return row[0] or 0.0
+
+    def reconcile(self, folder_path: str, on_batch=None) -> bool:
+        """
+        Sincroniza o índice com o disco de forma incremental
+
+        Apenas pastas cujo mtime mudou são listadas; dentro delas só os arquivos
+        novos, alterados ou removidos são gravados no índice.
+
+        Args:
+            folder_path: Pasta raiz a sincronizar
+            on_batch: Se informado, recebe as músicas atuais de cada pasta visitada
+                      (chamado pelas threads do escaneador)
+
+        Returns:
+            True se alguma música foi adicionada, alterada ou removida
+        """
+        root = self.normalize(folder_path)
+        start, end = self.subtree_bounds(root)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT path, parent, mtime FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+                (root, start, end)).fetchall()
+
+        known_mtimes = {path: mtime for path, _, mtime in rows}
+        children = {}
+        for path, parent, _ in rows:
+            children.setdefault(parent, []).append(path)
+
+        seen_dirs = set()
+        dir_updates = []
+        file_updates = []
+        file_removals = []
+
+        def visit(directory):
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                return []
+            seen_dirs.add(directory)
+
+            # Pasta sem alteração: só desce nas subpastas já conhecidas
+            if known_mtimes.get(directory) == mtime:
+                if on_batch:
+                    on_batch(self.get_folder_tracks(directory))
+                return children.get(directory, [])
+
+            diff = self.diff_directory(directory)
+            if diff is None:
+                return []
+            updates, removals, subdirs, tracks = diff
+            if on_batch and tracks:
+                on_batch(tracks)
+            dir_updates.append((directory, os.path.dirname(directory), mtime))
+            file_updates.extend(updates)
+            file_removals.extend(removals)
+            return subdirs
+
+        self.scanner.walk(root, visit)
+
+        removed_dirs = [path for path in known_mtimes if path not in seen_dirs]
+
+        if not (dir_updates or file_updates or file_removals or removed_dirs):
+            return False
+
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dirs (path, parent, mtime) VALUES (?, ?, ?)", dir_updates)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files "
+                "(path, folder, name, extension, size, mtime, duration, inode) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", file_updates)
+            self.conn.executemany("DELETE FROM files WHERE path = ?", file_removals)
+            for path in removed_dirs:
+                self.conn.execute("DELETE FROM dirs WHERE path = ?", (path,))
+                self.conn.execute("DELETE FROM files WHERE folder = ?", (path,))
+
+        return bool(file_updates or file_removals or removed_dirs)
+
+    def diff_directory(self, directory: str):
+        """
+        Compara o conteúdo atual de uma pasta com o que está no índice
+
+        Returns:
+            Tupla (arquivos novos/alterados, caminhos removidos, subpastas, músicas presentes)
+            ou None se a pasta não pôde ser lida
+        """
+        with self.lock:
+            indexed = {row[0]: row[1:] for row in self.conn.execute(
+                "SELECT path, size, mtime, duration, inode FROM files WHERE folder = ?",
+                (directory,))}
+
+        try:
+            files, subdirs = self.scanner.scan_directory(directory)
+        except OSError as e:
+            print(f"Erro ao escanear pasta {directory}: {e}")
+            return None
+
+        updates = []
+        tracks = []
+        present = set()
+        for entry in files:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            present.add(entry.path)
+            stem, extension = os.path.splitext(entry.name)
+            known = indexed.get(entry.path)
+            inode = entry.inode()
+            if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+                duration = known[2]
+                if known[3] != inode:  # Linha antiga sem inode (ou arquivo trocado no lugar)
+                    updates.append((entry.path, directory, stem, extension,
+                                    stat.st_size, stat.st_mtime_ns, duration, inode))
+            else:
+                # Arquivo novo ou alterado: só stat aqui (abrir cada arquivo num NAS
+                # seguraria o streaming); a duração vem depois do extrator de metadados
+                duration = None
+                updates.append((entry.path, directory, stem, extension,
+                                stat.st_size, stat.st_mtime_ns, duration, inode))
+            tracks.append({'path': entry.path, 'name': stem, 'extension': extension,
+                           'folder': directory, 'duration': duration})
+
+        removals = [(path,) for path in indexed if path not in present]
+        return updates, removals, subdirs, tracks
+
+    def store_durations(self, music_list) -> int:
+        """
+        Grava as durações descobertas pelo extrator de metadados
+
+        Só preenche as linhas que ainda não têm duração (arquivos novos/alterados).
+
+        Returns:
+            Quantidade de músicas atualizadas
+        """
+        rows = [(music['duration'], music['path']) for music in music_list
+                if music.get('duration') is not None]
+        if not rows:
+            return 0
+        with self.lock, self.conn:
+            cursor = self.conn.executemany(
+                "UPDATE files SET duration = ? WHERE path = ? AND duration IS NULL", rows)
+        return cursor.rowcount
+
+    def close(self):
+        """Fecha a conexão com o banco"""
+        with self.lock:
+            self.conn.close()
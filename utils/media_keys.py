@@ -1,119 +1,324 @@
 """
-Utilitário para capturar teclas de mídia globais do Windows
+Utilitário para capturar teclas de mídia globais
+Backends orientados a eventos: a thread fica bloqueada até chegar uma tecla
 """
+import ctypes
+import glob
+import os
+import queue
+import select
+import struct
+import sys
 import threading
-try:
-    import win32api
-    import win32con
-    MEDIA_KEYS_AVAILABLE = True
-except ImportError:
-    MEDIA_KEYS_AVAILABLE = False
+from typing import Dict, Optional
+
+# Nomes das teclas entregues pelos backends
+PLAY_PAUSE = 'play_pause'
+NEXT = 'next'
+PREVIOUS = 'previous'
+STOP = 'stop'
+VOLUME_UP = 'volume_up'
+VOLUME_DOWN = 'volume_down'
+MUTE = 'mute'
+
+class MediaKeyBackend:
+    """
+    Interface dos backends de teclas de mídia
+
+    read_key() bloqueia até uma tecla ser pressionada e devolve o nome dela,
+    ou None quando o backend é fechado. close() pode ser chamado de outra thread.
+    """
+
+    name = 'nenhum'
+
+    def open(self) -> bool:
+        """Prepara o backend (False se não funcionar neste sistema)"""
+        return True
+
+    def read_key(self) -> Optional[str]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def release(self):
+        """Libera os recursos (chamado pela thread do listener ao sair)"""
+        pass
+
+class FakeBackend(MediaKeyBackend):
+    """Backend em memória para testes: press() simula uma tecla"""
+
+    name = 'teste'
+
+    def __init__(self):
+        self.keys = queue.Queue()
+
+    def press(self, key: str):
+        self.keys.put(key)
+
+    def read_key(self) -> Optional[str]:
+        return self.keys.get()
+
+    def close(self):
+        self.keys.put(None)
+
+class EvdevBackend(MediaKeyBackend):
+    """
+    Linux: lê os eventos de teclado do kernel em /dev/input (sem bibliotecas extras)
+
+    Só abre dispositivos que têm tecla Play/Pause; precisa de permissão de
+    leitura neles (normalmente o grupo 'input').
+    """
+
+    name = 'evdev'
+
+    EV_KEY = 0x01
+    KEY_CODES = {
+        113: MUTE,         # KEY_MUTE
+        114: VOLUME_DOWN,  # KEY_VOLUMEDOWN
+        115: VOLUME_UP,    # KEY_VOLUMEUP
+        163: NEXT,         # KEY_NEXTSONG
+        164: PLAY_PAUSE,   # KEY_PLAYPAUSE
+        165: PREVIOUS,     # KEY_PREVIOUSSONG
+        166: STOP,         # KEY_STOPCD
+    }
+    KEY_PLAYPAUSE = 164
+    KEY_MAX = 0x2ff
+    EVENT = struct.Struct('llHHi')  # struct input_event: timeval, type, code, value
+
+    def __init__(self, device_pattern: str = '/dev/input/event*'):
+        self.device_pattern = device_pattern
+        self.devices = []
+        self.pending = []
+        self.closed = False
+        self.wake_read = self.wake_write = None
+
+    @classmethod
+    def has_media_keys(cls, fd: int) -> bool:
+        """Consulta (ioctl EVIOCGBIT) se o dispositivo tem a tecla Play/Pause"""
+        import fcntl
+        size = cls.KEY_MAX // 8 + 1
+        request = (2 << 30) | (size << 16) | (ord('E') << 8) | (0x20 + cls.EV_KEY)
+        bits = bytearray(size)
+        try:
+            fcntl.ioctl(fd, request, bits)
+        except OSError:
+            return False
+        return bool(bits[cls.KEY_PLAYPAUSE // 8] & (1 << cls.KEY_PLAYPAUSE % 8))
+
+    def open(self) -> bool:
+        if not sys.platform.startswith('linux'):
+            return False
+        for path in sorted(glob.glob(self.device_pattern)):
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+            except OSError:
+                continue
+            if self.has_media_keys(fd):
+                self.devices.append(fd)
+            else:
+                os.close(fd)
+        if not self.devices:
+            return False
+        self.wake_read, self.wake_write = os.pipe()
+        return True
+
+    def read_events(self, fd: int):
+        try:
+            data = os.read(fd, self.EVENT.size * 64)
+        except BlockingIOError:
+            return
+        except OSError:
+            # Dispositivo desconectado
+            self.devices.remove(fd)
+            os.close(fd)
+            return
+        for offset in range(0, len(data) - self.EVENT.size + 1, self.EVENT.size):
+            _, _, event_type, code, value = self.EVENT.unpack_from(data, offset)
+            if event_type == self.EV_KEY and value == 1 and code in self.KEY_CODES:
+                self.pending.append(self.KEY_CODES[code])
+
+    def read_key(self) -> Optional[str]:
+        while not self.pending:
+            if self.closed or not self.devices:
+                return None
+            ready, _, _ = select.select(self.devices + [self.wake_read], [], [])
+            if self.closed:
+                return None
+            for fd in ready:
+                if fd != self.wake_read:
+                    self.read_events(fd)
+        return self.pending.pop(0)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            if self.wake_write is not None:
+                os.write(self.wake_write, b'x')
+
+    def release(self):
+        """Fecha os descritores (chamado pela thread do listener ao sair)"""
+        for fd in self.devices + [self.wake_read, self.wake_write]:
+            if fd is not None:
+                os.close(fd)
+        self.devices = []
+        self.wake_read = self.wake_write = None
+
+class Win32HookBackend(MediaKeyBackend):
+    """
+    Windows: hook de teclado de baixo nível (WH_KEYBOARD_LL) com GetMessage
+
+    O Windows chama o hook só quando uma tecla é pressionada; a thread fica
+    parada em GetMessage no resto do tempo. As teclas continuam chegando
+    aos outros programas.
+    """
+
+    name = 'win32'
+
+    WH_KEYBOARD_LL = 13
+    WM_KEYDOWN = 0x0100
+    WM_QUIT = 0x0012
+    WM_APP = 0x8000
+    VK_CODES = {
+        0xB0: NEXT,         # VK_MEDIA_NEXT_TRACK
+        0xB1: PREVIOUS,     # VK_MEDIA_PREV_TRACK
+        0xB2: STOP,         # VK_MEDIA_STOP
+        0xB3: PLAY_PAUSE,   # VK_MEDIA_PLAY_PAUSE
+        0xAD: MUTE,         # VK_VOLUME_MUTE
+        0xAE: VOLUME_DOWN,  # VK_VOLUME_DOWN
+        0xAF: VOLUME_UP,    # VK_VOLUME_UP
+    }
+
+    def __init__(self):
+        self.hook = None
+        self.thread_id = None
+        self.pending = []
+        self.closed = False
+
+    def open(self) -> bool:
+        # O hook pertence à thread que o instala: fica para o primeiro read_key()
+        return sys.platform == 'win32'
+
+    def install(self):
+        from ctypes import wintypes
+        self.user32 = ctypes.WinDLL('user32', use_last_error=True)
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self.thread_id = kernel32.GetCurrentThreadId()
+        self.msg = wintypes.MSG()
+
+        class KBDLLHOOKSTRUCT(ctypes.Structure):
+            _fields_ = [('vkCode', wintypes.DWORD), ('scanCode', wintypes.DWORD),
+                        ('flags', wintypes.DWORD), ('time', wintypes.DWORD),
+                        ('dwExtraInfo', ctypes.c_size_t)]
+
+        hook_proc = ctypes.WINFUNCTYPE(ctypes.c_ssize_t, ctypes.c_int,
+                                       wintypes.WPARAM, wintypes.LPARAM)
+        self.user32.CallNextHookEx.argtypes = [wintypes.HHOOK, ctypes.c_int,
+                                               wintypes.WPARAM, wintypes.LPARAM]
+        self.user32.CallNextHookEx.restype = ctypes.c_ssize_t
+        self.user32.SetWindowsHookExW.argtypes = [ctypes.c_int, hook_proc,
+                                                  wintypes.HINSTANCE, wintypes.DWORD]
+        self.user32.SetWindowsHookExW.restype = wintypes.HHOOK
+
+        def on_key(code, wparam, lparam):
+            if code == 0 and wparam == self.WM_KEYDOWN:
+                info = ctypes.cast(lparam, ctypes.POINTER(KBDLLHOOKSTRUCT)).contents
+                key = self.VK_CODES.get(info.vkCode)
+                if key:
+                    self.pending.append(key)
+                    # Faz o GetMessage retornar para entregar a tecla
+                    self.user32.PostThreadMessageW(self.thread_id, self.WM_APP, 0, 0)
+            return self.user32.CallNextHookEx(None, code, wparam, lparam)
+
+        self.hook_proc = hook_proc(on_key)  # Referência mantida enquanto o hook existir
+        self.hook = self.user32.SetWindowsHookExW(self.WH_KEYBOARD_LL, self.hook_proc, None, 0)
+        if not self.hook:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def read_key(self) -> Optional[str]:
+        if self.hook is None:
+            self.install()
+        while not self.pending:
+            if self.closed or self.user32.GetMessageW(ctypes.byref(self.msg), None, 0, 0) <= 0:
+                return None
+        return self.pending.pop(0)
+
+    def close(self):
+        self.closed = True
+        if self.thread_id is not None:
+            self.user32.PostThreadMessageW(self.thread_id, self.WM_QUIT, 0, 0)
+
+    def release(self):
+        if self.hook:
+            self.user32.UnhookWindowsHookEx(self.hook)
+            self.hook = None
+
+def default_backend() -> Optional[MediaKeyBackend]:
+    """Backend do sistema atual (None se não houver)"""
+    if sys.platform == 'win32':
+        return Win32HookBackend()
+    if sys.platform.startswith('linux'):
+        return EvdevBackend()
+    return None
 
 class MediaKeyListener:
-    """Listener para teclas de mídia do Windows"""
-    
-    def __init__(self, on_play_pause=None, on_next=None, on_previous=None, on_volume_up=None, on_volume_down=None, on_mute=None):
-        self.on_play_pause = on_play_pause
-        self.on_next = on_next
-        self.on_previous = on_previous
-        self.on_volume_up = on_volume_up
-        self.on_volume_down = on_volume_down
-        self.on_mute = on_mute
+    """Listener para teclas de mídia (Windows e Linux)"""
+
+    def __init__(self, on_play_pause=None, on_next=None, on_previous=None, on_volume_up=None,
+                 on_volume_down=None, on_mute=None, backend: MediaKeyBackend = None):
+        self.callbacks: Dict[str, object] = {
+            PLAY_PAUSE: on_play_pause,
+            NEXT: on_next,
+            PREVIOUS: on_previous,
+            VOLUME_UP: on_volume_up,
+            VOLUME_DOWN: on_volume_down,
+            MUTE: on_mute,
+        }
+        self.backend = backend
         self.running = False
         self.thread = None
-    
+
     def start(self):
         """Inicia o listener em uma thread separada"""
-        if not MEDIA_KEYS_AVAILABLE:
-            print("⚠️  pywin32 não disponível. Teclas de mídia globais não funcionarão.")
-            return False
-        
         if self.running:
             return True
-        
+
+        if self.backend is None:
+            self.backend = default_backend()
+        if self.backend is None or not self.backend.open():
+            print("⚠️  Teclas de mídia globais não disponíveis neste sistema "
+                  "(no Linux é preciso acesso de leitura a /dev/input).")
+            self.backend = None
+            return False
+
         self.running = True
-        self.thread = threading.Thread(target=self._listen, daemon=True)
+        self.thread = threading.Thread(target=self._listen, args=(self.backend,), daemon=True)
         self.thread.start()
         return True
-    
+
     def stop(self):
-        """Para o listener"""
+        """Para o listener (acorda a thread bloqueada no backend)"""
         self.running = False
+        if self.backend:
+            self.backend.close()
         if self.thread:
             self.thread.join(timeout=1)
-    
-    def _listen(self):
-        """Loop principal de escuta (rodando em thread separada)"""
-        # Códigos de teclas de mídia do Windows
-        VK_MEDIA_NEXT_TRACK = 0xB0
-        VK_MEDIA_PREV_TRACK = 0xB1
-        VK_MEDIA_STOP = 0xB2
-        VK_MEDIA_PLAY_PAUSE = 0xB3
-        VK_VOLUME_MUTE = 0xAD
-        VK_VOLUME_DOWN = 0xAE
-        VK_VOLUME_UP = 0xAF
-        
-        last_state = {}
-        
-        while self.running:
-            try:
-                # Verifica Play/Pause
-                if win32api.GetAsyncKeyState(VK_MEDIA_PLAY_PAUSE) & 0x8000:
-                    if not last_state.get('play_pause', False):
-                        if self.on_play_pause:
-                            self.on_play_pause()
-                        last_state['play_pause'] = True
-                else:
-                    last_state['play_pause'] = False
-                
-                # Verifica Next
-                if win32api.GetAsyncKeyState(VK_MEDIA_NEXT_TRACK) & 0x8000:
-                    if not last_state.get('next', False):
-                        if self.on_next:
-                            self.on_next()
-                        last_state['next'] = True
-                else:
-                    last_state['next'] = False
-                
-                # Verifica Previous
-                if win32api.GetAsyncKeyState(VK_MEDIA_PREV_TRACK) & 0x8000:
-                    if not last_state.get('prev', False):
-                        if self.on_previous:
-                            self.on_previous()
-                        last_state['prev'] = True
-                else:
-                    last_state['prev'] = False
-                
-                # Verifica Mute
-                if win32api.GetAsyncKeyState(VK_VOLUME_MUTE) & 0x8000:
-                    if not last_state.get('mute', False):
-                        if self.on_mute:
-                            self.on_mute()
-                        last_state['mute'] = True
-                else:
-                    last_state['mute'] = False
-                
-                # Verifica Volume Up
-                if win32api.GetAsyncKeyState(VK_VOLUME_UP) & 0x8000:
-                    if not last_state.get('vol_up', False):
-                        if self.on_volume_up:
-                            self.on_volume_up()
-                        last_state['vol_up'] = True
-                else:
-                    last_state['vol_up'] = False
-                
-                # Verifica Volume Down
-                if win32api.GetAsyncKeyState(VK_VOLUME_DOWN) & 0x8000:
-                    if not last_state.get('vol_down', False):
-                        if self.on_volume_down:
-                            self.on_volume_down()
-                        last_state['vol_down'] = True
-                else:
-                    last_state['vol_down'] = False
-                
-                # Pequeno delay para não sobrecarregar CPU
-                import time
-                time.sleep(0.05)
-            except Exception as e:
-                print(f"Erro no listener de teclas: {e}")
-                break
+
+    def _listen(self, backend):
+        """Loop principal (thread separada): dorme até o backend entregar uma tecla"""
+        try:
+            while self.running:
+                key = backend.read_key()
+                if key is None:
+                    break
+                callback = self.callbacks.get(key)
+                if callback:
+                    try:
+                        callback()
+                    except Exception as e:
+                        print(f"Erro ao tratar tecla de mídia: {e}")
+        except Exception as e:
+            print(f"Erro no listener de teclas: {e}")
+        finally:
+            self.running = False
+            backend.release()
@@ -0,0 +1,218 @@
+"""
+Extração de metadados (tags) das músicas em segundo plano
+Lê título, artista, álbum, duração e faixa com mutagen num pool de processos
+e guarda o resultado em cache para não reler arquivos que não mudaram
+"""
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Callable, Optional
+from .durations import get_duration
+try:
+    import mutagen
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+TAG_FIELDS = ('title', 'artist', 'album', 'duration', 'track')
+
+def parse_track_number(value) -> Optional[int]:
+    """Converte '3', '3/12' ou ['3/12'] em 3"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if value is None:
+        return None
+    try:
+        return int(str(value).split('/')[0])
+    except ValueError:
+        return None
+
+def read_tags(path: str) -> Dict:
+    """
+    Lê as tags de um arquivo (executado nos processos do pool)
+
+    Returns:
+        Dicionário com as chaves de TAG_FIELDS (None quando ausente)
+    """
+    tags = dict.fromkeys(TAG_FIELDS)
+    if not MUTAGEN_AVAILABLE:
+        tags['duration'] = get_duration(path)
+        return tags
+    try:
+        audio = mutagen.File(path, easy=True)
+    except Exception:
+        audio = None
+    if audio is None:
+        tags['duration'] = get_duration(path)
+        return tags
+
+    def first(key):
+        values = audio.get(key) if audio.tags is not None else None
+        return str(values[0]) if values else None
+
+    tags['title'] = first('title')
+    tags['artist'] = first('artist')
+    tags['album'] = first('album')
+    tags['track'] = parse_track_number(first('tracknumber'))
+    if getattr(audio, 'info', None) is not None and getattr(audio.info, 'length', None):
+        tags['duration'] = float(audio.info.length)
+    return tags
+
+def read_tags_batch(paths: List[str]) -> List[Dict]:
+    """Lê as tags de vários arquivos numa única tarefa do pool"""
+    return [read_tags(path) for path in paths]
+
+class MetadataCache:
+    """Cache em disco das tags, chaveado por caminho + tamanho + mtime"""
+
+    def __init__(self, db_path=None):
+        self.config_dir = Path.home() / '.music_player'
+        self.config_dir.mkdir(exist_ok=True)
+        self.db_path = Path(db_path) if db_path else self.config_dir / 'metadata.db'
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS tags (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime INTEGER,
+                    title TEXT,
+                    artist TEXT,
+                    album TEXT,
+                    duration REAL,
+                    track INTEGER
+                )
+            """)
+
+    def get(self, path: str, size: int, mtime: int) -> Optional[Dict]:
+        """Retorna as tags em cache se o arquivo não mudou desde a leitura"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT title, artist, album, duration, track FROM tags "
+                "WHERE path = ? AND size = ? AND mtime = ?", (path, size, mtime)).fetchone()
+        return dict(zip(TAG_FIELDS, row)) if row else None
+
+    def put_many(self, entries):
+        """Grava várias entradas (path, size, mtime, tags) de uma vez"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tags (path, size, mtime, title, artist, album, duration, track) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(path, size, mtime, *(tags[field] for field in TAG_FIELDS))
+                 for path, size, mtime, tags in entries])
+
+    def close(self):
+        """Fecha a conexão com o banco"""
+        with self.lock:
+            self.conn.close()
+
+class MetadataExtractor:
+    """Enriquece as músicas com tags em segundo plano"""
+
+    BATCH_SIZE = 64
+
+    def __init__(self, cache: MetadataCache = None, workers: int = None):
+        self.cache = cache or MetadataCache()
+        self.workers = workers
+        self.pool = None
+        self.thread = None
+        self.cancel_event = threading.Event()
+
+    def enrich(self, music_list: List[Dict],
+               on_result: Callable[[Dict], None] = None,
+               on_done: Callable[[], None] = None):
+        """
+        Inicia a leitura das tags de uma lista de músicas
+
+        Cada dicionário recebe as chaves de TAG_FIELDS assim que o resultado chega
+        (do cache ou do pool). Uma chamada nova cancela a anterior.
+
+        Args:
+            music_list: Lista de músicas (dicionários do MusicLoader)
+            on_result: Callback opcional chamado (pela thread de fundo) por música enriquecida
+            on_done: Callback opcional chamado (pela thread de fundo) quando toda a lista
+                     foi processada sem cancelamento
+        """
+        self.cancel()
+        self.cancel_event = threading.Event()
+        pending = [music for music in music_list if 'title' not in music]
+        if not pending:
+            return
+        self.thread = threading.Thread(target=self._run,
+                                       args=(pending, on_result, on_done, self.cancel_event),
+                                       daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Interrompe o enriquecimento em andamento"""
+        self.cancel_event.set()
+
+    def wait(self, timeout=None):
+        """Aguarda o enriquecimento em andamento terminar"""
+        if self.thread:
+            self.thread.join(timeout)
+
+    def _run(self, pending, on_result, on_done, cancel_event):
+        """Executa o enriquecimento e avisa o fim (thread separada)"""
+        self._extract(pending, on_result, cancel_event)
+        if on_done and not cancel_event.is_set():
+            on_done()
+
+    def _extract(self, pending, on_result, cancel_event):
+        """Consulta o cache e envia os arquivos novos ao pool"""
+        misses = []
+        for music in pending:
+            if cancel_event.is_set():
+                return
+            try:
+                stat = os.stat(music['path'])
+            except OSError:
+                continue
+            tags = self.cache.get(music['path'], stat.st_size, stat.st_mtime_ns)
+            if tags is not None:
+                self._apply(music, tags, on_result)
+            else:
+                misses.append((music, stat.st_size, stat.st_mtime_ns))
+
+        if not misses:
+            return
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        batches = [misses[i:i + self.BATCH_SIZE] for i in range(0, len(misses), self.BATCH_SIZE)]
+        futures = [(batch, self.pool.submit(read_tags_batch, [m['path'] for m, _, _ in batch]))
+                   for batch in batches]
+
+        for batch, future in futures:
+            if cancel_event.is_set():
+                future.cancel()
+                continue
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"Erro ao ler metadados: {e}")
+                continue
+            self.cache.put_many([(music['path'], size, mtime, tags)
+                                 for (music, size, mtime), tags in zip(batch, results)])
+            for (music, _, _), tags in zip(batch, results):
+                self._apply(music, tags, on_result)
+
+    @staticmethod
+    def _apply(music, tags, on_result):
+        """Copia as tags para o dicionário da música sem apagar valores já conhecidos"""
+        for key, value in tags.items():
+            if value is not None or key not in music:
+                music[key] = value
+        if on_result:
+            on_result(music)
+
+    def shutdown(self):
+        """Cancela o trabalho pendente e encerra o pool de processos"""
+        self.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
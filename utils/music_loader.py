@@ -2,58 +2,259 @@
 Utilitário para carregar e gerenciar arquivos de música
 """
 import os
-from pathlib import Path
-from typing import List, Dict
+import queue
+import threading
+from typing import List, Dict, Callable, Optional, Iterator
+from .scanner import DirectoryScanner
+from .track_table import TrackTable
 
 class MusicLoader:
     """Classe para carregar e gerenciar arquivos de música"""
     
     SUPPORTED_FORMATS = {'.mp3', '.wav', '.ogg', '.flac', '.m4a'}
     
-    def __init__(self):
-        self.music_files: List[Dict] = []
+    def __init__(self, library_index=None, scanner=None):
+        self.music_files = TrackTable()
         self.current_folder = None
+        self.scanner = scanner or DirectoryScanner(self.SUPPORTED_FORMATS)
+        self.library_index = library_index
+        self.reconcile_thread = None
+        self.reconciled = threading.Event()  # Sinalizado ao fim da última reconciliação
+        self.reconciled.set()
     
-    def load_folder(self, folder_path: str) -> List[Dict]:
+    def load_folder(self, folder_path: str,
+                    on_update: Optional[Callable[[str, TrackTable], None]] = None) -> TrackTable:
         """
         Carrega todas as músicas de uma pasta
         
+        Com um índice de biblioteca configurado, pastas já escaneadas retornam
+        imediatamente do índice, sem tocar no disco (um drive de rede travado
+        não bloqueia quem chamou), e são reconciliadas em segundo plano.
+        
         Args:
             folder_path: Caminho da pasta com as músicas
+            on_update: Callback (pasta, músicas) chamado pela thread de reconciliação
+                       quando o conteúdo mudou. Sem callback, a lista é trocada direto.
             
         Returns:
-            Lista de dicionários com informações das músicas
+            TrackTable com as músicas (cada linha se comporta como um dicionário)
         """
-        self.music_files = []
+        self.music_files = TrackTable()
         self.current_folder = folder_path
         
+        if self.library_index is not None and self.library_index.has_folder(folder_path):
+            self.music_files = self.library_index.get_tracks(folder_path)
+            self.reconcile_async(folder_path, on_update)
+            return self.music_files
+        
         if not os.path.exists(folder_path):
             return self.music_files
         
+        if self.library_index is None:
+            self.music_files = self.walk_folder(folder_path)
+        else:
+            # Primeira vez: precisa escanear antes de ter o que mostrar
+            self.library_index.reconcile(folder_path)
+            self.music_files = self.library_index.get_tracks(folder_path)
+        
+        return self.music_files
+    
+    def load_tracks(self, source: str, music_list: TrackTable) -> TrackTable:
+        """
+        Usa uma lista pronta (ex.: playlist de faixas) sem escanear o disco
+        
+        Args:
+            source: Identificador da origem (faz o papel da pasta atual)
+            music_list: TrackTable já montada
+        """
+        self.current_folder = source
+        self.music_files = music_list
+        return self.music_files
+    
+    def reconcile_async(self, folder_path: str,
+                        on_update: Optional[Callable[[str, TrackTable], None]] = None):
+        """Confere a pasta com o disco numa thread (on_update só é chamado se algo mudou)"""
+        if self.library_index is None:
+            return
+        self.reconciled = threading.Event()
+        self.reconcile_thread = threading.Thread(target=self._reconcile,
+                                                 args=(folder_path, on_update, self.reconciled),
+                                                 daemon=True)
+        self.reconcile_thread.start()
+    
+    def iter_folder(self, folder_path: str, batch_size: int = 500) -> Iterator[List[Dict]]:
+        """
+        Carrega uma pasta progressivamente (modo streaming)
+        
+        O escaneamento roda numa thread de fundo; cada next() devolve, sem bloquear,
+        as músicas que já chegaram (até batch_size, podendo ser uma lista vazia).
+        Ao terminar, a lista completa é ordenada por nome.
+        
+        Args:
+            folder_path: Caminho da pasta com as músicas
+            batch_size: Máximo de músicas devolvidas por lote
+            
+        Yields:
+            Lotes de dicionários na ordem em que foram anexados a music_files
+        """
+        self.music_files = TrackTable()
+        self.current_folder = folder_path
+        batches = queue.Queue()
+        
+        def produce():
+            try:
+                # Verificado aqui, não em quem chamou: o drive pode estar travado
+                if not os.path.exists(folder_path):
+                    return
+                if self.library_index is not None:
+                    self.library_index.reconcile(folder_path, on_batch=batches.put)
+                else:
+                    self.scanner.scan(folder_path, on_batch=batches.put)
+            except Exception as e:
+                print(f"Erro ao carregar músicas: {e}")
+            finally:
+                batches.put(None)
+        
+        threading.Thread(target=produce, daemon=True).start()
+        
+        pending = []
+        finished = False
+        while not finished:
+            while len(pending) < batch_size:
+                try:
+                    batch = batches.get_nowait()
+                except queue.Empty:
+                    break
+                if batch is None:
+                    finished = True
+                    break
+                pending.extend(batch)
+            
+            chunk, pending = pending[:batch_size], pending[batch_size:]
+            self.music_files.extend(chunk)
+            yield chunk
+        
+        while pending:
+            chunk, pending = pending[:batch_size], pending[batch_size:]
+            self.music_files.extend(chunk)
+            yield chunk
+        
+        # Ordena por nome
+        self.music_files.sort_by_name()
+    
+    def _reconcile(self, folder_path: str, on_update, reconciled: threading.Event):
+        """Reconcilia o índice com o disco (rodando em thread separada)"""
         try:
-            for root, dirs, files in os.walk(folder_path):
-                for file in files:
-                    file_path = Path(root) / file
-                    if file_path.suffix.lower() in self.SUPPORTED_FORMATS:
-                        music_info = {
-                            'path': str(file_path),
-                            'name': file_path.stem,
-                            'extension': file_path.suffix,
-                            'folder': root
-                        }
-                        self.music_files.append(music_info)
+            # Pasta inacessível (drive desmontado): mantém o que está no índice
+            if not os.path.isdir(folder_path) or not self.library_index.reconcile(folder_path):
+                return
+            tracks = self.library_index.get_tracks(folder_path)
+        except Exception as e:
+            print(f"Erro ao atualizar índice da biblioteca: {e}")
+            return
+        finally:
+            reconciled.set()
+        
+        if on_update:
+            on_update(folder_path, tracks)
+        else:
+            self.set_music_list(folder_path, tracks)
+    
+    def set_music_list(self, folder_path: str, music_list) -> bool:
+        """
+        Substitui a lista carregada se a pasta ainda for a atual
+        
+        Args:
+            folder_path: Pasta a que a lista pertence
+            music_list: TrackTable ou lista de dicionários
+        
+        Returns:
+            True se a lista foi substituída
+        """
+        if folder_path != self.current_folder:
+            return False
+        if not isinstance(music_list, TrackTable):
+            music_list = TrackTable(music_list)
+        self.music_files = music_list
+        return True
+    
+    def apply_changes(self, folder_path: str, changes) -> bool:
+        """
+        Aplica as diferenças do FolderWatcher na lista carregada, sem reescanear
+        
+        As alterações são feitas numa cópia que substitui a lista atual, então
+        threads que ainda percorrem a lista antiga (busca, metadados) não veem
+        as linhas mudarem de posição.
+        
+        Args:
+            folder_path: Pasta monitorada
+            changes: FolderChanges (removidas, renomeadas e novas)
+        
+        Returns:
+            True se a lista foi alterada
+        """
+        if folder_path != self.current_folder:
+            return False
+        table = self.music_files.copy()
+        changed = False
+        
+        for path in changes.removed:
+            index = table.index_of_path(path)
+            if index >= 0:
+                table.delete(index)
+                changed = True
+        
+        for old_path, music in changes.renamed:
+            index = table.index_of_path(old_path)
+            if index >= 0:
+                # Mantém as tags já lidas; só o caminho (e a posição) mudam
+                music = {**table[index].to_dict(), **music,
+                         'duration': table[index]['duration'] or music.get('duration')}
+                table.delete(index)
+            if table.index_of_path(music['path']) < 0:
+                table.insert_sorted(music)
+            changed = True
+        
+        for music in changes.added:
+            if table.index_of_path(music['path']) < 0:
+                table.insert_sorted(music)
+                changed = True
+        
+        if changed:
+            self.music_files = table
+        return changed
+    
+    def walk_folder(self, folder_path: str) -> TrackTable:
+        """Escaneia a pasta inteira no disco (sem índice)"""
+        music_files = TrackTable()
+        lock = threading.Lock()
+        
+        def add_batch(batch):
+            with lock:
+                music_files.extend(batch)
+        
+        try:
+            self.scanner.scan(folder_path, on_batch=add_batch)
         except Exception as e:
             print(f"Erro ao carregar músicas: {e}")
         
         # Ordena por nome
-        self.music_files.sort(key=lambda x: x['name'].lower())
-        return self.music_files
+        music_files.sort_by_name()
+        return music_files
     
-    def get_music_list(self) -> List[Dict]:
+    def get_music_list(self) -> TrackTable:
         """Retorna a lista de músicas carregadas"""
         return self.music_files
     
-    def get_music_by_index(self, index: int) -> Dict:
+    def get_total_duration(self) -> float:
+        """Soma as durações conhecidas da lista carregada (sem acessar os arquivos)"""
+        return self.music_files.total_duration()
+    
+    def index_of_path(self, path: str) -> int:
+        """Posição da música com esse caminho na lista carregada (-1 se ausente)"""
+        return self.music_files.index_of_path(path)
+    
+    def get_music_by_index(self, index: int):
         """Retorna uma música específica pelo índice"""
         if 0 <= index < len(self.music_files):
             return self.music_files[index]
@@ -0,0 +1,145 @@
+"""
+Reprodução sem intervalo (gapless) entre faixas
+Pré-carrega o início da próxima música e a coloca na fila do mixer antes da atual terminar
+"""
+import threading
+import time
+from typing import Optional
+
+# Quanto do início da próxima faixa é lido antecipadamente (fica no cache do SO)
+PREFETCH_BYTES = 512 * 1024
+
+def peek_next_index(current_index: int, count: int, shuffle_mode: bool,
+                    shuffle_next: Optional[int], repeat_mode: str) -> Optional[int]:
+    """
+    Prevê qual faixa toca depois da atual, sem alterar o estado do player
+
+    Args:
+        current_index: Faixa atual
+        count: Tamanho da lista
+        shuffle_mode: Modo aleatório ligado
+        shuffle_next: Próxima faixa do modo aleatório (ShuffleEngine.peek())
+        repeat_mode: 'off', 'one' ou 'all'
+
+    Returns:
+        Índice da próxima faixa ou None se não dá para prever / a lista acabou
+    """
+    if count <= 0 or current_index < 0:
+        return None
+    if repeat_mode == 'one':
+        return current_index
+    if shuffle_mode:
+        return shuffle_next
+    if current_index + 1 < count:
+        return current_index + 1
+    return 0 if repeat_mode == 'all' else None
+
+def prefetch_file(path: str, size: int = PREFETCH_BYTES):
+    """Lê o início do arquivo para que a troca de faixa não espere pelo disco"""
+    try:
+        with open(path, 'rb') as f:
+            f.read(size)
+    except OSError:
+        pass
+
+class GaplessPlayback:
+    """
+    Troca de faixa sem intervalo usando a fila do pygame.mixer.music
+
+    A próxima faixa é lida antecipadamente numa thread e enfileirada com
+    music.queue(); o SDL_mixer emenda as duas ao fim do stream. O evento de
+    fim de música avisa quando a faixa enfileirada começou.
+    """
+
+    def __init__(self, pygame_module=None, prefetch_bytes: int = PREFETCH_BYTES):
+        self._pygame = pygame_module
+        self.prefetch_bytes = prefetch_bytes
+        self.current_path = None
+        self.queued_path = None
+        self.end_event = None
+        self.events_available = False
+        self.last_transition = None  # time.perf_counter() da última troca
+
+    @property
+    def pygame(self):
+        if self._pygame is None:
+            import pygame
+            self._pygame = pygame
+        return self._pygame
+
+    def enable_end_event(self) -> bool:
+        """
+        Registra o evento de fim de música (precisa do sistema de eventos do pygame)
+
+        Não inicializa o pygame.display: dentro do app Tk isso abriria o vídeo
+        do SDL junto com a janela. A fila de eventos é testada uma vez; sem
+        ela, o gapless fica desativado e o fim da faixa vem do get_busy().
+        """
+        if self.end_event is not None:
+            return self.events_available
+        self.end_event = self.pygame.USEREVENT + 1
+        try:
+            self.pygame.mixer.music.set_endevent(self.end_event)
+            self.pygame.event.get(self.end_event)
+            self.events_available = True
+        except Exception as e:
+            print(f"⚠️  Eventos do pygame indisponíveis, gapless desativado: {e}")
+            self.events_available = False
+        return self.events_available
+
+    def play(self, path: str, start: float = 0.0):
+        """Carrega e toca uma faixa (descarta a fila anterior)"""
+        self.enable_end_event()
+        self.pygame.mixer.music.load(path)
+        self.pygame.mixer.music.play(start=start)
+        self.current_path = path
+        self.queued_path = None
+
+    def track_started(self, path: str):
+        """Informa a faixa carregada por fora (um load() descarta a fila do mixer)"""
+        if path != self.current_path:
+            self.current_path = path
+            self.queued_path = None
+
+    def discard_queue(self):
+        """A fila do mixer foi perdida (ex.: busca com play(start)): a próxima precisa ser enfileirada de novo"""
+        self.queued_path = None
+
+    def prepare_next(self, path: str) -> bool:
+        """
+        Pré-carrega e enfileira a próxima faixa
+
+        Returns:
+            True se a faixa foi enfileirada para troca sem intervalo
+        """
+        if path == self.queued_path:
+            return True
+        if not self.enable_end_event():
+            return False
+        threading.Thread(target=prefetch_file, args=(path, self.prefetch_bytes),
+                         daemon=True).start()
+        try:
+            # O pygame guarda só uma faixa na fila: enfileirar de novo substitui
+            self.pygame.mixer.music.queue(path)
+        except Exception as e:
+            print(f"Erro ao enfileirar próxima música: {e}")
+            return False
+        self.queued_path = path
+        return True
+
+    def poll(self) -> Optional[str]:
+        """
+        Verifica se a faixa enfileirada já começou
+
+        Returns:
+            Caminho da faixa que começou a tocar ou None
+        """
+        if not self.events_available:
+            return None
+        if not self.pygame.event.get(self.end_event):
+            return None
+        self.last_transition = time.perf_counter()
+        started, self.queued_path = self.queued_path, None
+        if started:
+            self.current_path = started
+        return started
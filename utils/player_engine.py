@@ -0,0 +1,432 @@
+"""
+Núcleo de reprodução sem interface
+Estado do player e transporte (tocar, pausar, próxima, anterior, busca, fila) sobre uma AudioOutput
+"""
+import time
+from collections import deque
+from typing import Callable
+
+from .audio_output import AudioOutput, NullOutput
+from .folder_watcher import music_entry
+from .music_loader import MusicLoader
+from .playback import peek_next_index
+from .position_tracker import PositionTracker
+from .shuffle import ShuffleEngine
+
+class PlayerEngine:
+    """
+    Estado e regras de reprodução, independentes do Tk
+
+    A lista vem do MusicLoader; o som vai para a AudioOutput (pygame ou
+    NullOutput). Quem usa o motor chama poll() periodicamente para detectar
+    fim de faixa e manter a próxima pré-carregada, e recebe as mudanças por
+    on_track_change(índice) e on_state_change(). Quando uma faixa deixa de
+    tocar (fim, troca, parada ou fechamento), on_track_end(música, segundos)
+    informa quanto dela foi realmente ouvido.
+    """
+
+    REPEAT_MODES = ('off', 'one', 'all')
+    # "Anterior" depois desse tempo (s) reinicia a faixa atual
+    RESTART_THRESHOLD = 3.0
+
+    def __init__(self, music_loader: MusicLoader, output: AudioOutput = None,
+                 on_track_change: Callable[[int], None] = None,
+                 on_state_change: Callable[[], None] = None,
+                 on_track_end: Callable[[dict, float], None] = None,
+                 volume: float = 1.0, shuffle_mode: bool = False, repeat_mode: str = 'off',
+                 smart_shuffle: bool = False, clock: Callable[[], float] = time.monotonic):
+        self.music_loader = music_loader
+        self.output = output or NullOutput()
+        self.on_track_change = on_track_change
+        self.on_state_change = on_state_change
+        self.on_track_end = on_track_end
+
+        self.current_index = -1
+        self.is_playing = False   # Há uma faixa carregada (tocando ou pausada)
+        self.is_paused = False
+        self.volume = volume
+        self.is_muted = False
+        self.volume_before_mute = volume
+        self.shuffle_mode = shuffle_mode
+        self.repeat_mode = repeat_mode if repeat_mode in self.REPEAT_MODES else 'off'
+        # Ordem do modo aleatório (anterior/próxima em O(1), sem copiar a lista)
+        self.shuffle = ShuffleEngine(artist_of=self.track_artist if smart_shuffle else None)
+        self.up_next = deque()  # Caminhos enfileirados para tocar a seguir
+        self.song_length = 0
+        # Posição pelo relógio, ancorada em tocar/pausar/buscar (sem consultar o mixer)
+        self.tracker = PositionTracker(clock)
+        # Tempo ouvido da faixa atual: pausa junto, mas as buscas não mexem nele
+        self.listen_timer = PositionTracker(clock)
+        self.listening = None  # Música cujo tempo ouvido está sendo contado
+        self.prefetch_key = None  # Estado usado no último pré-carregamento
+        self.prefetched_index = None
+        self.output.set_volume(volume)
+
+    # --- Lista ----------------------------------------------------------
+
+    @property
+    def tracks(self):
+        return self.music_loader.get_music_list()
+
+    def current_music(self):
+        return self.music_loader.get_music_by_index(self.current_index)
+
+    @staticmethod
+    def get_song_length(music):
+        """
+        Duração da música em segundos
+
+        Só usa a duração guardada no índice/metadados (0 se ainda desconhecida):
+        ler o cabeçalho do arquivo aqui travaria a thread da interface.
+        """
+        if not music:
+            return 0
+        return music.get('duration') or 0
+
+    def refresh_song_length(self, music):
+        """A duração de uma música foi lida em segundo plano: atualiza se for a atual"""
+        current = self.current_music()
+        if current is not None and music is not None and current['path'] == music['path']:
+            self.song_length = self.get_song_length(music)
+
+    def track_artist(self, index):
+        """Artista da faixa (para o aleatório inteligente; None se as tags não foram lidas)"""
+        music = self.music_loader.get_music_by_index(index)
+        return music.get('artist') if music else None
+
+    def set_current_index(self, index, position=0.0):
+        """Seleciona uma faixa sem tocar (ex.: sessão restaurada)"""
+        music = self.music_loader.get_music_by_index(index)
+        if not music:
+            self.current_index = -1
+            return
+        self.current_index = index
+        self.song_length = self.get_song_length(music)
+        self.tracker.stop(min(position, self.song_length or position))
+
+    def enqueue(self, path) -> bool:
+        """Põe uma música para tocar a seguir (entra no fim da lista se não estiver nela)"""
+        if self.music_loader.index_of_path(path) < 0:
+            self.tracks.append(music_entry(path))
+            self.shuffle.append(1)
+        self.up_next.append(path)
+        return True
+
+    def next_queued_index(self):
+        """Índice da primeira música da fila 'a seguir' (descarta as que saíram da lista)"""
+        while self.up_next:
+            index = self.music_loader.index_of_path(self.up_next[0])
+            if index >= 0:
+                return index
+            self.up_next.popleft()
+        return None
+
+    # --- Modo aleatório -------------------------------------------------
+
+    def peek_shuffle(self, wrap=None):
+        """Próxima faixa do modo aleatório (None se desligado ou a volta acabou)"""
+        if not self.shuffle_mode:
+            return None
+        return self.shuffle.peek(wrap=self.repeat_mode == 'all' if wrap is None else wrap)
+
+    def reset_shuffle(self, keep_current=True):
+        """Nova ordem aleatória para a lista carregada (começando pela faixa atual)"""
+        current = self.current_index if keep_current and self.current_index >= 0 else None
+        self.shuffle.reseed(len(self.tracks), current=current)
+
+    def remap_shuffle(self, old_list, new_list, renamed=None):
+        """
+        Mantém a ordem aleatória depois que a lista foi trocada
+
+        Só as faixas já sorteadas são procuradas na lista nova (uma passada).
+        renamed: caminho antigo -> caminho novo das músicas renomeadas
+        """
+        renamed = renamed or {}
+        paths = {}
+        for index in self.shuffle.order:
+            if index < len(old_list) and index not in paths:
+                path = old_list.get_field(index, 'path')
+                paths[index] = renamed.get(path, path)
+        wanted = set(paths.values())
+        new_indices = {}
+        if wanted:
+            for index in range(len(new_list)):
+                path = new_list.get_field(index, 'path')
+                if path in wanted:
+                    new_indices[path] = index
+        self.shuffle.remap(len(new_list), lambda i: new_indices.get(paths.get(i), -1))
+
+    def set_shuffle(self, enabled: bool):
+        """Liga/desliga o modo aleatório (uma ordem nova começa da faixa atual)"""
+        self.shuffle_mode = enabled
+        if enabled:
+            self.reset_shuffle()
+        self.notify_state()
+
+    def cycle_repeat(self) -> str:
+        """Alterna entre modos de repetição: off -> one -> all -> off"""
+        current = self.REPEAT_MODES.index(self.repeat_mode)
+        self.repeat_mode = self.REPEAT_MODES[(current + 1) % len(self.REPEAT_MODES)]
+        self.notify_state()
+        return self.repeat_mode
+
+    # --- Próxima faixa --------------------------------------------------
+
+    def next_index(self, automatic=False):
+        """
+        Faixa que vem depois da atual, sem mudar o estado
+
+        Args:
+            automatic: Fim natural da faixa (respeita 'repetir uma' e o fim da
+                       lista); no botão "próxima" a lista sempre recomeça
+        """
+        queued = self.next_queued_index()
+        if queued is not None:
+            return queued
+        repeat_mode = self.repeat_mode if automatic else 'all'
+        count = len(self.tracks)
+        if not automatic and self.current_index < 0 and count:
+            return self.peek_shuffle(wrap=True) if self.shuffle_mode else 0
+        return peek_next_index(self.current_index, count, self.shuffle_mode,
+                               self.peek_shuffle(wrap=repeat_mode == 'all'), repeat_mode)
+
+    def consume_next(self, index, automatic=False):
+        """A faixa index vai tocar como próxima: tira da fila / avança o aleatório"""
+        music = self.music_loader.get_music_by_index(index)
+        if music and self.up_next and self.up_next[0] == music['path']:
+            self.up_next.popleft()
+        elif self.shuffle_mode and not (automatic and self.repeat_mode == 'one'):
+            wrap = self.repeat_mode == 'all' or not automatic
+            if self.shuffle.peek(wrap=wrap) == index:
+                self.shuffle.next(wrap=wrap)
+
+    def next_track_key(self):
+        """Estado que define a próxima faixa (se mudar, o pré-carregamento é refeito)"""
+        music = self.current_music()
+        return (music['path'] if music else None, self.current_index, self.shuffle_mode,
+                self.repeat_mode, self.peek_shuffle(), self.up_next[0] if self.up_next else None)
+
+    def prefetch_next_track(self):
+        """Pré-carrega e enfileira a próxima faixa para a troca sem intervalo"""
+        self.prefetch_key = self.next_track_key()
+        self.prefetched_index = None
+        if not self.current_music():
+            return
+        next_index = self.next_index(automatic=True)
+        music = self.music_loader.get_music_by_index(next_index) if next_index is not None else None
+        if music and self.output.queue_next(music['path']):
+            self.prefetched_index = next_index
+
+    # --- Transporte -----------------------------------------------------
+
+    def play_index(self, index, start=0.0) -> bool:
+        """Carrega e toca uma faixa da lista"""
+        music = self.music_loader.get_music_by_index(index)
+        if not music:
+            return False
+        self.finish_listening()
+        try:
+            self.output.play(music['path'], start)
+        except Exception as e:
+            print(f"Erro ao reproduzir música: {e}")
+            return False
+        self.current_index = index
+        self.song_length = self.get_song_length(music)
+        self.tracker.start(start)
+        self.start_listening(music)
+        self.is_playing = True
+        self.is_paused = False
+        self.prefetch_key = None  # A fila da saída foi descartada pelo play()
+        self.prefetched_index = None
+        self.notify_track()
+        return True
+
+    def play_track(self, index) -> bool:
+        """Escolha do usuário (duplo clique): no aleatório, a ordem recomeça dessa faixa"""
+        if self.shuffle_mode and self.shuffle.current != index:
+            self.shuffle.reseed(len(self.tracks), current=index)
+        return self.play_index(index)
+
+    def play_pause(self):
+        """Toca, pausa ou retoma"""
+        if self.is_playing and not self.is_paused:
+            self.output.pause()
+            self.tracker.pause()
+            self.listen_timer.pause()
+            self.is_paused = True
+        elif self.is_playing:
+            self.output.unpause()
+            self.tracker.resume()
+            self.listen_timer.resume()
+            self.is_paused = False
+        elif self.current_index >= 0:
+            # Faixa selecionada mas parada (ex.: sessão restaurada): continua da posição
+            self.play_index(self.current_index, self.position())
+            return
+        else:
+            index = self.next_index()
+            if index is not None:
+                self.consume_next(index)
+                self.play_index(index)
+            return
+        self.notify_state()
+
+    def stop(self):
+        """Para a reprodução e volta a faixa para o início"""
+        self.finish_listening()
+        self.output.stop()
+        self.is_playing = False
+        self.is_paused = False
+        self.tracker.stop()
+        self.notify_state()
+
+    def next(self) -> bool:
+        """Próxima faixa (botão)"""
+        index = self.next_index()
+        if index is None:
+            return False
+        self.consume_next(index)
+        return self.play_index(index)
+
+    def previous(self) -> bool:
+        """Faixa anterior (ou reinicia a atual se já tocou alguns segundos)"""
+        if self.is_playing and self.position() > self.RESTART_THRESHOLD:
+            return self.play_index(self.current_index)
+        if self.shuffle_mode:
+            index = self.shuffle.previous()
+        elif self.current_index > 0:
+            index = self.current_index - 1
+        else:
+            index = len(self.tracks) - 1 if self.repeat_mode == 'all' else 0
+        if index is None or index < 0:
+            return False
+        return self.play_index(index)
+
+    def seek(self, position) -> bool:
+        """Vai para a posição (segundos) da faixa atual sem recarregar o arquivo"""
+        music = self.current_music()
+        if not music or not self.output.seek(music['path'], position):
+            return False
+        if self.is_paused:
+            self.tracker.seek(position)  # Continua pausada: só move a âncora
+        else:
+            self.tracker.start(position)
+            self.is_playing = True
+        self.prefetch_key = None  # A busca pode ter descartado a fila da saída
+        self.notify_state()
+        return True
+
+    def set_volume(self, volume):
+        """Volume de 0 a 1"""
+        self.volume = max(0.0, min(1.0, volume))
+        self.output.set_volume(self.volume)
+        if self.volume > 0:
+            self.is_muted = False
+
+    def toggle_mute(self):
+        """Ativa/desativa o mudo, lembrando o volume anterior"""
+        if self.is_muted:
+            self.set_volume(self.volume_before_mute or 0.7)
+        else:
+            self.volume_before_mute = self.volume
+            self.set_volume(0)
+            self.is_muted = True
+        self.notify_state()
+
+    def position(self):
+        """Posição atual da faixa em segundos"""
+        position = self.tracker.position()
+        if self.song_length:
+            position = min(position, self.song_length)
+        return position
+
+    def poll(self):
+        """
+        Chamado periodicamente: detecta a troca para a faixa enfileirada, o fim
+        da faixa (sem fila) e mantém a próxima pré-carregada
+        """
+        if not self.is_playing or self.is_paused:
+            return
+        started = self.output.poll_transition()
+        if started is not None and self.prefetched_index is not None:
+            self.on_gapless_transition(self.prefetched_index)
+        elif not self.output.is_busy():
+            # Terminou sem faixa enfileirada: troca do jeito comum
+            index = self.next_index(automatic=True)
+            if index is None:
+                self.stop()
+                return
+            self.consume_next(index, automatic=True)
+            self.play_index(index)
+            return
+        if self.prefetch_key != self.next_track_key():
+            self.prefetch_next_track()
+
+    def on_gapless_transition(self, index):
+        """A faixa enfileirada começou: atualiza o estado como uma troca normal de faixa"""
+        # O poll() percebe a troca com atraso: o que passou do fim já é da faixa nova
+        overflow = max(0.0, self.tracker.position() - self.song_length if self.song_length else 0)
+        self.finish_listening(overflow)
+        self.consume_next(index, automatic=True)
+        self.current_index = index
+        self.tracker.start(overflow)
+        self.song_length = self.get_song_length(self.current_music())
+        self.start_listening(self.current_music(), overflow)
+        self.notify_track()
+
+    def close(self):
+        self.finish_listening()
+        self.output.close()
+
+    # --- Tempo ouvido ---------------------------------------------------
+
+    def start_listening(self, music, elapsed=0.0):
+        self.listening = music
+        self.listen_timer.start(elapsed)
+
+    def finish_listening(self, overflow=0.0):
+        """
+        A faixa atual deixou de tocar: informa o tempo realmente ouvido
+
+        Args:
+            overflow: Segundos do relógio que já pertencem à faixa seguinte
+        """
+        music, self.listening = self.listening, None
+        if music is None:
+            return
+        seconds = max(0.0, self.listen_timer.position() - overflow)
+        self.listen_timer.stop()
+        if self.on_track_end:
+            self.on_track_end(music, seconds)
+
+    # --- Avisos ---------------------------------------------------------
+
+    def notify_track(self):
+        if self.on_track_change:
+            self.on_track_change(self.current_index)
+
+    def notify_state(self):
+        if self.on_state_change:
+            self.on_state_change()
+
+    # --- Sessão ---------------------------------------------------------
+
+    def session_state(self):
+        """Parte do instantâneo da sessão que pertence ao motor"""
+        history, upcoming = self.shuffle.state()
+        return {
+            'current_index': self.current_index,
+            'position': self.position(),
+            'shuffle_mode': self.shuffle_mode,
+            'shuffle_queue': upcoming,
+            'shuffle_history': history,
+        }
+
+    def restore_session(self, session):
+        """Seleciona a faixa/posição e a ordem aleatória salvas (sem tocar)"""
+        self.set_current_index(session['current_index'], session['position'])
+        if session['shuffle_mode'] == self.shuffle_mode:
+            self.shuffle.load_state(len(self.tracks), session['shuffle_history'],
+                                    session['shuffle_queue'])
+        else:
+            self.reset_shuffle()
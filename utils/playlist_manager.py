@@ -3,15 +3,35 @@ Gerenciador de Playlists - Salva e carrega pastas de músicas
 """
 import json
 import os
+import threading
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 
 class PlaylistManager:
-    """Classe para gerenciar playlists (pastas salvas)"""
+    """
+    Classe para gerenciar playlists (pastas salvas)
     
-    def __init__(self):
-        self.config_file = Path.home() / ".music_player" / "playlists.json"
+    As playlists aparecem direto do JSON; a existência das pastas é verificada
+    depois, em segundo plano e com timeout (drives de rede desmontados podem
+    travar o os.path.exists). Pastas inacessíveis ficam marcadas como
+    indisponíveis, sem serem apagadas do arquivo. Cada pasta tem no máximo
+    uma checagem em andamento: uma nova verificação de uma pasta travada
+    espera a mesma checagem em vez de abrir outra thread presa no disco.
+    """
+    
+    # Tempo máximo (segundos) esperando a verificação de uma pasta
+    VALIDATION_TIMEOUT = 3.0
+    
+    def __init__(self, config_file=None):
+        if config_file is None:
+            config_file = Path.home() / ".music_player" / "playlists.json"
+        self.config_file = Path(config_file)
         self.playlists: List[Dict] = []
+        self.availability: Dict[str, Optional[bool]] = {}  # None = ainda verificando
+        self.lock = threading.Lock()
+        self.validating = set()  # Pastas com verificação (espera + timeout) em andamento
+        self.checkers: Dict[str, threading.Thread] = {}  # Checagem no disco por pasta
+        self.checked: Dict[str, bool] = {}  # Resultado da última checagem concluída
         self.ensure_config_dir()
         self.load_playlists()
     
@@ -28,13 +48,62 @@ class PlaylistManager:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     self.playlists = data.get('playlists', [])
-                    # Remove playlists de pastas que não existem mais
-                    self.playlists = [p for p in self.playlists if os.path.exists(p['path'])]
             except Exception as e:
                 print(f"Erro ao carregar playlists: {e}")
                 self.playlists = []
         return self.playlists
     
+    def validate_async(self, on_result: Callable[[str, bool], None] = None,
+                       timeout: float = None):
+        """
+        Verifica em segundo plano se as pastas das playlists existem
+        
+        Args:
+            on_result: Chamado (pela thread de fundo) com (caminho, disponível) por playlist
+            timeout: Segundos até considerar a pasta indisponível
+        """
+        timeout = self.VALIDATION_TIMEOUT if timeout is None else timeout
+        for playlist in self.playlists:
+            self.validate_path_async(playlist['path'], on_result, timeout)
+    
+    def validate_path_async(self, path: str, on_result=None, timeout: float = None):
+        """Verifica uma única pasta em segundo plano (ignorado se já estiver sendo verificada)"""
+        timeout = self.VALIDATION_TIMEOUT if timeout is None else timeout
+        with self.lock:
+            if path in self.validating:
+                return
+            self.validating.add(path)
+        self.availability[path] = None
+        threading.Thread(target=self._validate, args=(path, on_result, timeout),
+                         daemon=True).start()
+    
+    def _validate(self, path, on_result, timeout):
+        """Espera a verificação até o timeout (a checagem roda numa thread própria)"""
+        with self.lock:
+            checker = self.checkers.get(path)
+            if checker is None or not checker.is_alive():
+                # Uma checagem ainda travada da vez anterior é reaproveitada
+                checker = threading.Thread(target=self._check, args=(path,), daemon=True)
+                self.checkers[path] = checker
+                checker.start()
+        checker.join(timeout)
+        available = not checker.is_alive() and self.checked.get(path, False)
+        self.availability[path] = available
+        with self.lock:
+            self.validating.discard(path)
+        if on_result:
+            on_result(path, available)
+    
+    def _check(self, path):
+        try:
+            self.checked[path] = os.path.isdir(path)
+        except OSError:
+            self.checked[path] = False
+    
+    def is_available(self, path: str) -> Optional[bool]:
+        """True/False conforme a última verificação; None se ainda não terminou"""
+        return self.availability.get(path)
+    
     def save_playlists(self):
         """Salva playlists no arquivo JSON"""
         try:
@@ -74,6 +143,7 @@ class PlaylistManager:
         }
         
         self.playlists.append(playlist)
+        self.availability[path] = True  # Acabou de ser conferida
         self.save_playlists()
         return True
     
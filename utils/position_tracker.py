@@ -0,0 +1,120 @@
+"""
+Posição da música e atualização econômica da barra de progresso
+A posição vem de um relógio monotônico ancorado nos eventos (tocar, pausar, buscar)
+"""
+import math
+import time
+from typing import Callable
+
+class PositionTracker:
+    """
+    Posição da faixa sem consultar o mixer
+
+    Guarda só a âncora do último evento (posição + instante do relógio);
+    a posição atual é âncora + tempo decorrido enquanto estiver tocando.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.anchor_position = 0.0
+        self.anchor_time = None  # None = parado/pausado
+
+    @property
+    def running(self) -> bool:
+        return self.anchor_time is not None
+
+    def start(self, position: float = 0.0):
+        """A faixa começou (ou voltou a tocar) em position"""
+        self.anchor_position = position
+        self.anchor_time = self.clock()
+
+    def pause(self):
+        self.anchor_position = self.position()
+        self.anchor_time = None
+
+    def resume(self):
+        if self.anchor_time is None:
+            self.anchor_time = self.clock()
+
+    def stop(self, position: float = 0.0):
+        """Parado em position (ex.: sessão restaurada)"""
+        self.anchor_position = position
+        self.anchor_time = None
+
+    def seek(self, position: float):
+        self.anchor_position = position
+        if self.anchor_time is not None:
+            self.anchor_time = self.clock()
+
+    def position(self) -> float:
+        """Posição atual em segundos"""
+        if self.anchor_time is None:
+            return self.anchor_position
+        return self.anchor_position + self.clock() - self.anchor_time
+
+class ProgressThrottle:
+    """
+    Redesenha a barra e o tempo só quando o que aparece na tela muda
+
+    A barra muda quando a posição cruza um pixel; o texto quando cruza um
+    segundo. next_delay_ms() diz quando isso vai acontecer, para o timer
+    dormir até lá em vez de acordar num intervalo fixo.
+    """
+
+    # Limites do intervalo entre atualizações (ms)
+    MIN_DELAY_MS = 16
+    MAX_DELAY_MS = 1000
+    # Janela minimizada: nada é desenhado, só confere de vez em quando
+    HIDDEN_DELAY_MS = 2000
+
+    def __init__(self, draw_bar: Callable[[int], None],
+                 draw_time: Callable[[int, float], None]):
+        """
+        Args:
+            draw_bar: Recebe a largura preenchida da barra em pixels
+            draw_time: Recebe o segundo atual e a duração
+        """
+        self.draw_bar = draw_bar
+        self.draw_time = draw_time
+        self.last_pixel = None
+        self.last_time = None
+        self.redraws = 0
+
+    def reset(self):
+        """Força o próximo update() a redesenhar tudo (ex.: após a prévia da busca)"""
+        self.last_pixel = None
+        self.last_time = None
+
+    @staticmethod
+    def pixel_at(position: float, length: float, width: int) -> int:
+        if length <= 0 or width <= 0:
+            return 0
+        return int(width * min(position, length) / length)
+
+    def update(self, position: float, length: float, width: int, show_bar: bool = True):
+        """Desenha o que mudou desde a última chamada"""
+        if show_bar:
+            pixel = self.pixel_at(position, length, width)
+            if pixel != self.last_pixel:
+                self.last_pixel = pixel
+                self.draw_bar(pixel)
+                self.redraws += 1
+        shown = (int(position), length)
+        if shown != self.last_time:
+            self.last_time = shown
+            self.draw_time(int(position), length)
+            self.redraws += 1
+
+    def next_delay_ms(self, position: float, length: float, width: int,
+                      playing: bool, show_bar: bool = True, hidden: bool = False) -> int:
+        """Tempo até o próximo pixel/segundo mudar"""
+        if hidden:
+            return self.HIDDEN_DELAY_MS
+        if not playing:
+            return self.MAX_DELAY_MS
+        delay = math.floor(position) + 1 - position  # Próximo segundo
+        if show_bar and length > 0 and width > 0:
+            seconds_per_pixel = length / width
+            next_pixel = (self.pixel_at(position, length, width) + 1) * seconds_per_pixel
+            delay = min(delay, next_pixel - position)
+        return max(self.MIN_DELAY_MS, min(self.MAX_DELAY_MS, math.ceil(delay * 1000)))
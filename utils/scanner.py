@@ -0,0 +1,94 @@
+"""
+Escaneador paralelo de pastas
+Usa os.scandir e distribui as subpastas entre um pool de threads
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Callable, Tuple
+
+class DirectoryScanner:
+    """Percorre árvores de pastas em paralelo (útil em compartilhamentos de rede)"""
+
+    def __init__(self, extensions, workers: int = None):
+        self.extensions = {ext.lower() for ext in extensions}
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+
+    def scan_directory(self, directory: str) -> Tuple[List[os.DirEntry], List[str]]:
+        """
+        Lista um único nível de pasta
+
+        Args:
+            directory: Pasta a listar
+
+        Returns:
+            Tupla (entradas de arquivos com extensão suportada, caminhos das subpastas).
+            As entradas mantêm o stat em cache do os.scandir quando o sistema fornece.
+        """
+        files = []
+        subdirs = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in self.extensions:
+                        files.append(entry)
+                except OSError:
+                    continue
+        return files, subdirs
+
+    def walk(self, folder_path: str, visit: Callable[[str], List[str]]):
+        """
+        Percorre a árvore chamando visit(pasta) em paralelo
+
+        Args:
+            folder_path: Pasta raiz
+            visit: Função executada no pool que retorna as subpastas onde continuar
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(visit, folder_path)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for subdir in future.result():
+                        pending.add(pool.submit(visit, subdir))
+
+    def scan(self, folder_path: str,
+             on_batch: Callable[[List[Dict]], None] = None) -> List[Dict]:
+        """
+        Escaneia recursivamente uma pasta
+
+        Args:
+            folder_path: Pasta raiz
+            on_batch: Se informado, recebe as músicas de cada pasta assim que ela é
+                      lida (chamado pelas threads do pool) e nada é acumulado
+
+        Returns:
+            Lista (sem ordem definida) de dicionários com informações das músicas
+        """
+        music_files = []
+
+        def visit(directory):
+            try:
+                files, subdirs = self.scan_directory(directory)
+            except OSError as e:
+                print(f"Erro ao escanear pasta {directory}: {e}")
+                return []
+            batch = []
+            for entry in files:
+                stem, extension = os.path.splitext(entry.name)
+                batch.append({
+                    'path': entry.path,
+                    'name': stem,
+                    'extension': extension,
+                    'folder': directory
+                })
+            if on_batch:
+                if batch:
+                    on_batch(batch)
+            else:
+                music_files.extend(batch)
+            return subdirs
+
+        self.walk(folder_path, visit)
+        return music_files
@@ -0,0 +1,138 @@
+"""
+Índice de busca da biblioteca
+Normaliza (sem acentos, sem maiúsculas) nome, artista e álbum e indexa por trigramas
+"""
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Dict, List
+
+SEARCH_FIELDS = ('name', 'artist', 'album')
+TOKEN_PATTERN = re.compile(r'\w+')
+
+def normalize_text(text: str) -> str:
+    """Remove acentos e diferenças de maiúsculas ('Ação' -> 'acao')"""
+    if text.isascii():
+        return text.casefold()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def tokenize(text: str) -> List[str]:
+    """Quebra um texto normalizado em palavras"""
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+class SearchIndex:
+    """
+    Busca incremental por substring sobre a lista de músicas
+
+    Cada termo da consulta precisa aparecer em algum dos campos. Nomes que
+    começam com a consulta vêm primeiro (busca binária nos nomes ordenados); o
+    restante é completado varrendo só os candidatos da menor lista de trigramas
+    e parando ao atingir o limite. Quando a consulta só estende a anterior e a
+    varredura anterior foi completa, filtra apenas o resultado anterior.
+    """
+
+    def __init__(self, music_list=()):
+        self.source = music_list
+        self.texts: List[str] = []
+        self.names: List[str] = []
+        self.sorted_names: List[tuple] = []
+        self.trigrams: Dict[str, array] = {}
+        self.last_terms: List[str] = []
+        self.last_matches = None
+        self.build(music_list)
+
+    def build(self, music_list):
+        """(Re)constrói o índice para a lista de músicas"""
+        texts = []
+        names = []
+        trigrams = {}
+        for index, music in enumerate(music_list):
+            name = normalize_text(music['name'])
+            text = ' '.join([name] + [normalize_text(str(music.get(field)))
+                                      for field in SEARCH_FIELDS[1:] if music.get(field)])
+            texts.append(text)
+            names.append(name)
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                postings = trigrams.get(gram)
+                if postings is None:
+                    postings = trigrams[gram] = array('I')
+                postings.append(index)
+
+        self.source = music_list
+        self.texts = texts
+        self.names = names
+        self.sorted_names = sorted((name, index) for index, name in enumerate(names))
+        self.trigrams = trigrams
+        self.last_terms = []
+        self.last_matches = None
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def candidates(self, terms: List[str]):
+        """Índices que podem conter todos os termos (antes da verificação)"""
+        # Consulta que só estende a anterior: o resultado anterior já é superconjunto
+        if self.last_matches is not None and len(terms) >= len(self.last_terms) and all(
+                term.startswith(last) for term, last in zip(terms, self.last_terms)):
+            return self.last_matches
+
+        best = None
+        for term in terms:
+            for i in range(len(term) - 2):
+                postings = self.trigrams.get(term[i:i + 3])
+                if postings is None:
+                    return []
+                if best is None or len(postings) < len(best):
+                    best = postings
+        return best if best is not None else range(len(self.texts))
+
+    def name_prefix_matches(self, prefix: str, limit: int = None) -> List[int]:
+        """Índices cujo nome começa com prefix (busca binária)"""
+        matches = []
+        position = bisect_left(self.sorted_names, (prefix, -1))
+        while position < len(self.sorted_names) and (limit is None or len(matches) < limit):
+            name, index = self.sorted_names[position]
+            if not name.startswith(prefix):
+                break
+            matches.append(index)
+            position += 1
+        return matches
+
+    def search(self, query: str, limit: int = None) -> List[int]:
+        """
+        Busca músicas pela consulta
+
+        Args:
+            query: Texto digitado (acentos e maiúsculas são ignorados)
+            limit: Quantidade máxima de resultados
+
+        Returns:
+            Índices das músicas: primeiro as que começam com a consulta, depois
+            as demais que contêm todos os termos (na ordem da lista)
+        """
+        normalized = normalize_text(query).strip()
+        terms = TOKEN_PATTERN.findall(normalized)
+        if not terms:
+            self.last_terms, self.last_matches = [], None
+            return list(range(len(self.texts)))[:limit]
+
+        results = self.name_prefix_matches(normalized, limit)
+        seen = set(results)
+        texts = self.texts
+        matches = []
+        complete = True
+        for i in self.candidates(terms):
+            if limit is not None and len(results) >= limit:
+                complete = False
+                break
+            if all(term in texts[i] for term in terms):
+                matches.append(i)
+                if i not in seen:
+                    results.append(i)
+
+        # Só uma varredura completa serve de base para a próxima consulta
+        self.last_terms = terms
+        self.last_matches = matches if complete else None
+        return results
@@ -0,0 +1,98 @@
+"""
+Controle de busca (seek) na música atual
+Agrupa os eventos de arrastar a barra de progresso e busca sem recarregar o arquivo
+"""
+import os
+import time
+from typing import Callable, Optional
+
+class SeekController:
+    """
+    Busca posições na música que já está carregada no mixer
+
+    Enquanto o usuário arrasta a barra só a prévia da posição é atualizada;
+    a busca de verdade acontece uma única vez, ao soltar o botão. Nos formatos
+    com suporte usa set_pos (busca dentro do stream aberto); nos demais usa
+    play(start=...) sobre a música já carregada, nunca um novo load().
+    """
+
+    # Formatos em que o pygame/SDL_mixer suporta set_pos
+    SET_POS_FORMATS = {'.mp3', '.ogg', '.flac'}
+    # No MP3 o set_pos é relativo à posição atual: volta ao início antes
+    RELATIVE_SET_POS_FORMATS = {'.mp3'}
+
+    def __init__(self, mixer=None, on_preview: Callable[[float], None] = None,
+                 on_seek: Callable[[str, float], bool] = None):
+        """
+        Args:
+            mixer: Objeto com set_pos/play (padrão: pygame.mixer.music)
+            on_preview: Chamado com a posição (segundos) durante o arraste
+            on_seek: Faz a busca ao soltar (padrão: seek() neste mixer)
+        """
+        self._mixer = mixer
+        self.on_preview = on_preview
+        self.on_seek = on_seek
+        self.dragging = False
+        self.pending_position: Optional[float] = None
+        self.last_latency: Optional[float] = None
+
+    @property
+    def mixer(self):
+        if self._mixer is None:
+            import pygame
+            self._mixer = pygame.mixer.music
+        return self._mixer
+
+    @staticmethod
+    def position_from_fraction(fraction: float, song_length: float) -> float:
+        """Converte a fração da barra (0..1) em segundos"""
+        return max(0.0, min(1.0, fraction)) * song_length
+
+    def press(self, position: float):
+        """Início do arraste (clique na barra)"""
+        self.dragging = True
+        self.drag(position)
+
+    def drag(self, position: float):
+        """Movimento do mouse: só atualiza a prévia"""
+        self.pending_position = position
+        if self.on_preview:
+            self.on_preview(position)
+
+    def release(self, path: str) -> Optional[float]:
+        """
+        Fim do arraste: busca uma única vez a última posição
+
+        Args:
+            path: Caminho da música atual (para escolher set_pos ou play(start))
+
+        Returns:
+            A posição aplicada ou None se não havia busca pendente / falhou
+        """
+        self.dragging = False
+        position, self.pending_position = self.pending_position, None
+        if position is None:
+            return None
+        seek = self.on_seek or self.seek
+        return position if seek(path, position) else None
+
+    def seek(self, path: str, position: float) -> bool:
+        """Busca imediatamente a posição (segundos) na música carregada"""
+        start = time.perf_counter()
+        try:
+            extension = os.path.splitext(path)[1].lower()
+            if extension in self.SET_POS_FORMATS:
+                try:
+                    if extension in self.RELATIVE_SET_POS_FORMATS:
+                        self.mixer.rewind()
+                    self.mixer.set_pos(position)
+                except Exception:
+                    # Codec sem suporte a set_pos nesta versão do SDL_mixer
+                    self.mixer.play(start=position)
+            else:
+                self.mixer.play(start=position)
+        except Exception as e:
+            print(f"Erro ao buscar posição: {e}")
+            return False
+        self.last_latency = time.perf_counter() - start
+        return True
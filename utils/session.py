@@ -0,0 +1,155 @@
+"""
+Instantâneo da sessão (session.bin)
+Lista carregada, música atual, posição e fila aleatória num arquivo binário compacto
+"""
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Optional
+
+from .track_table import TrackTable
+
+class SessionStore:
+    """
+    Salva e restaura a sessão sem reescanear a pasta
+
+    As colunas da TrackTable vão direto como bytes (arrays little-endian e
+    textos separados por '\\0'), comprimidas com zlib. Tags não entram: voltam
+    do cache de metadados.
+    """
+
+    MAGIC = b'MPSS'
+    VERSION = 1
+    HEADER = struct.Struct('<iidBB')  # índice atual, tamanho da fonte, posição, aleatório, versão das colunas
+    BLOB = struct.Struct('<I')
+
+    def __init__(self, session_file=None):
+        if session_file is None:
+            config_dir = Path.home() / '.music_player'
+            config_dir.mkdir(exist_ok=True)
+            session_file = config_dir / 'session.bin'
+        self.session_file = Path(session_file)
+        self.lock = threading.Lock()
+
+    # --- Codificação ----------------------------------------------------
+
+    @staticmethod
+    def array_bytes(values: array) -> bytes:
+        if sys.byteorder == 'big':
+            values = array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+
+    @staticmethod
+    def bytes_array(typecode: str, data: bytes) -> array:
+        values = array(typecode)
+        values.frombytes(data)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+    def encode(self, session: Dict) -> bytes:
+        tracks: TrackTable = session['tracks']
+        source = (session.get('source') or '').encode('utf-8')
+        blobs = [
+            source,
+            '\0'.join(tracks.folders).encode('utf-8'),
+            '\0'.join(tracks.extensions).encode('utf-8'),
+            '\0'.join(tracks.names).encode('utf-8'),
+            self.array_bytes(tracks.folder_column),
+            self.array_bytes(tracks.extension_column),
+            self.array_bytes(tracks.durations),
+            self.array_bytes(array('i', session.get('shuffle_queue', ()))),
+            self.array_bytes(array('i', session.get('shuffle_history', ()))),
+        ]
+        header = self.HEADER.pack(session.get('current_index', -1), len(tracks),
+                                  float(session.get('position', 0.0)),
+                                  1 if session.get('shuffle_mode') else 0, 0)
+        body = header + b''.join(self.BLOB.pack(len(blob)) + blob for blob in blobs)
+        return self.MAGIC + bytes([self.VERSION]) + zlib.compress(body, 6)
+
+    def decode(self, data: bytes) -> Dict:
+        if data[:4] != self.MAGIC or data[4] != self.VERSION:
+            raise ValueError("formato de sessão desconhecido")
+        body = zlib.decompress(data[5:])
+        current_index, count, position, shuffle_mode, _ = self.HEADER.unpack_from(body)
+        offset = self.HEADER.size
+        blobs = []
+        while offset < len(body):
+            (length,) = self.BLOB.unpack_from(body, offset)
+            offset += self.BLOB.size
+            blobs.append(body[offset:offset + length])
+            offset += length
+        (source, folders, extensions, names, folder_column, extension_column,
+         durations, shuffle_queue, shuffle_history) = blobs
+
+        tracks = TrackTable()
+        tracks.folders = folders.decode('utf-8').split('\0') if folders else []
+        tracks.folder_ids = {folder: i for i, folder in enumerate(tracks.folders)}
+        tracks.extensions = extensions.decode('utf-8').split('\0') if extensions else []
+        tracks.extension_ids = {ext: i for i, ext in enumerate(tracks.extensions)}
+        tracks.names = names.decode('utf-8').split('\0') if count else []
+        tracks.folder_column = self.bytes_array('I', folder_column)
+        tracks.extension_column = self.bytes_array('B', extension_column)
+        tracks.durations = self.bytes_array('d', durations)
+        if not (len(tracks.names) == len(tracks.folder_column) == len(tracks.durations) == count):
+            raise ValueError("colunas da sessão com tamanhos diferentes")
+
+        return {
+            'source': source.decode('utf-8') or None,
+            'tracks': tracks,
+            'current_index': current_index,
+            'position': position,
+            'shuffle_mode': bool(shuffle_mode),
+            'shuffle_queue': list(self.bytes_array('i', shuffle_queue)),
+            'shuffle_history': list(self.bytes_array('i', shuffle_history)),
+        }
+
+    # --- Arquivo --------------------------------------------------------
+
+    def save(self, session: Dict) -> bool:
+        """
+        Grava a sessão (arquivo temporário + rename)
+
+        Args:
+            session: Dict com 'source', 'tracks' (TrackTable), 'current_index',
+                     'position', 'shuffle_mode', 'shuffle_queue' e 'shuffle_history'
+        """
+        try:
+            data = self.encode(session)
+            with self.lock:
+                fd, temp_path = tempfile.mkstemp(dir=self.session_file.parent,
+                                                 prefix='.session-', suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(data)
+                    os.replace(temp_path, self.session_file)
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar sessão: {e}")
+            return False
+
+    def save_async(self, session: Dict):
+        """Grava a sessão numa thread (a TrackTable é copiada antes)"""
+        session = {**session, 'tracks': session['tracks'].copy(),
+                   'shuffle_queue': list(session.get('shuffle_queue', ())),
+                   'shuffle_history': list(session.get('shuffle_history', ()))}
+        threading.Thread(target=self.save, args=(session,), daemon=True).start()
+
+    def load(self) -> Optional[Dict]:
+        """Lê a sessão salva (None se não existir ou estiver corrompida)"""
+        try:
+            if not self.session_file.exists():
+                return None
+            return self.decode(self.session_file.read_bytes())
+        except Exception as e:
+            print(f"Erro ao carregar sessão: {e}")
+            return None
@@ -0,0 +1,220 @@
+"""
+Motor do modo aleatório
+Permutação de Fisher–Yates gerada sob demanda, com próxima/anterior em O(1)
+"""
+import random
+from typing import Callable, Iterable, List, Optional, Tuple
+
+class ShuffleEngine:
+    """
+    Ordem aleatória dos índices 0..count-1 sem criar a lista embaralhada inteira
+
+    Cada sorteio faz um passo do Fisher–Yates: as posições que saíram da
+    identidade ficam num dict esparso (posição -> valor, e o inverso), então
+    a memória é proporcional ao que já foi tocado, não ao tamanho da biblioteca.
+    A ordem já sorteada fica em self.order e o cursor anda por ela, o que
+    torna anterior/próxima O(1).
+
+    Com artist_of, faz o "aleatório inteligente": evita, dentro de algumas
+    tentativas, sortear o mesmo artista da faixa anterior.
+    """
+
+    # Sorteios extras para fugir do artista anterior (mantém cada passo O(1))
+    SPREAD_ATTEMPTS = 8
+
+    def __init__(self, count: int = 0, seed=None,
+                 artist_of: Optional[Callable[[int], Optional[str]]] = None):
+        """
+        Args:
+            count: Quantidade de faixas
+            seed: Semente (None = aleatória)
+            artist_of: Artista da faixa pelo índice (None desliga o espalhamento)
+        """
+        self.artist_of = artist_of
+        self.reseed(count, seed)
+
+    # --- Permutação esparsa ---------------------------------------------
+
+    def reset_cycle(self):
+        """Começa uma volta nova da permutação (as faixas voltam a ficar disponíveis)"""
+        self.swaps = {}      # posição -> valor, só onde difere da identidade
+        self.positions = {}  # valor -> posição (inverso de swaps)
+        self.drawn = 0       # Posições 0..drawn-1 já sorteadas nesta volta
+        self.cycle_start = len(self.order)
+
+    def value_at(self, position: int) -> int:
+        return self.swaps.get(position, position)
+
+    def position_of(self, value: int) -> int:
+        return self.positions.get(value, value)
+
+    def place(self, position: int, value: int):
+        if position == value:
+            self.swaps.pop(position, None)
+            self.positions.pop(value, None)
+        else:
+            self.swaps[position] = value
+            self.positions[value] = position
+
+    def swap(self, a: int, b: int):
+        value_a, value_b = self.value_at(a), self.value_at(b)
+        self.place(a, value_b)
+        self.place(b, value_a)
+
+    def take(self, value: int) -> bool:
+        """Marca um valor como sorteado (False se ele já saiu nesta volta)"""
+        position = self.position_of(value)
+        if position < self.drawn:
+            return False
+        self.swap(self.drawn, position)
+        self.drawn += 1
+        return True
+
+    def draw(self) -> Optional[int]:
+        """Sorteia a próxima faixa ainda não tocada nesta volta"""
+        if self.drawn >= self.count:
+            return None
+        position = self.random.randrange(self.drawn, self.count)
+        if self.artist_of is not None and self.order and self.count - self.drawn > 1:
+            previous = self.artist_of(self.order[-1])
+            attempts = 0
+            while (previous and attempts < self.SPREAD_ATTEMPTS
+                   and self.artist_of(self.value_at(position)) == previous):
+                position = self.random.randrange(self.drawn, self.count)
+                attempts += 1
+        value = self.value_at(position)
+        self.swap(self.drawn, position)
+        self.drawn += 1
+        return value
+
+    def extend(self, wrap: bool) -> Optional[int]:
+        """Acrescenta um sorteio à ordem (começando outra volta se wrap)"""
+        value = self.draw()
+        if value is None and wrap and self.count:
+            last = self.order[-1] if self.order else None
+            self.reset_cycle()
+            value = self.draw()
+            if value == last and self.count > 1:
+                # Não repete a última faixa logo na virada
+                self.swap(0, self.random.randrange(1, self.count))
+                value = self.value_at(0)
+        if value is not None:
+            self.order.append(value)
+        return value
+
+    # --- Navegação ------------------------------------------------------
+
+    def reseed(self, count: Optional[int] = None, seed=None, current: Optional[int] = None):
+        """
+        Descarta a ordem e começa uma permutação nova
+
+        Args:
+            count: Novo tamanho da lista (None mantém)
+            seed: Semente (None = aleatória)
+            current: Faixa tocando agora (vira o início da ordem)
+        """
+        if count is not None:
+            self.count = count
+        self.random = random.Random(seed)
+        self.order: List[int] = []
+        self.cursor = -1
+        self.reset_cycle()
+        if current is not None and 0 <= current < self.count:
+            self.take(current)
+            self.order.append(current)
+            self.cursor = 0
+
+    @property
+    def current(self) -> Optional[int]:
+        return self.order[self.cursor] if self.cursor >= 0 else None
+
+    def peek(self, wrap: bool = False) -> Optional[int]:
+        """Próxima faixa sem avançar (None se a volta acabou e wrap é False)"""
+        if self.cursor + 1 < len(self.order):
+            return self.order[self.cursor + 1]
+        return self.extend(wrap)
+
+    def next(self, wrap: bool = False) -> Optional[int]:
+        """Avança para a próxima faixa"""
+        value = self.peek(wrap)
+        if value is not None:
+            self.cursor += 1
+        return value
+
+    def previous(self) -> Optional[int]:
+        """Volta para a faixa anterior da ordem (None no início)"""
+        if self.cursor <= 0:
+            return None
+        self.cursor -= 1
+        return self.order[self.cursor]
+
+    # --- Mudanças na lista ----------------------------------------------
+
+    def append(self, count: int = 1):
+        """Faixas novas no fim da lista entram no sorteio desta volta (O(1))"""
+        self.count += count
+
+    def remap(self, count: int, translate: Callable[[int], int]):
+        """
+        Ajusta a ordem depois que a lista mudou (rescan, músicas removidas...)
+
+        Só as faixas já sorteadas são traduzidas; as que sumiram (translate
+        retorna -1 ou None) saem da ordem e as novas entram no sorteio.
+
+        Args:
+            count: Tamanho da lista nova
+            translate: Índice antigo -> índice novo (-1/None se removida)
+        """
+        order, cursor, cycle_start = [], -1, 0
+        for position, value in enumerate(self.order):
+            if position == self.cycle_start:
+                cycle_start = len(order)
+            new = translate(value)
+            if new is not None and 0 <= new < count:
+                order.append(new)
+            if position == self.cursor:
+                cursor = len(order) - 1
+        if self.cycle_start >= len(self.order):
+            cycle_start = len(order)
+        self.count = count
+        self.rebuild(order, cursor, cycle_start)
+
+    def insert(self, index: int):
+        """Uma faixa foi inserida na posição index"""
+        self.remap(self.count + 1, lambda i: i + 1 if i >= index else i)
+
+    def remove(self, index: int):
+        """A faixa da posição index foi removida"""
+        self.remap(self.count - 1, lambda i: -1 if i == index else (i - 1 if i > index else i))
+
+    def rebuild(self, order: List[int], cursor: int, cycle_start: int):
+        """Refaz a permutação a partir da ordem (O(tamanho da volta atual))"""
+        self.order = order[:cycle_start]
+        self.reset_cycle()
+        for value in order[cycle_start:]:
+            if self.take(value):
+                self.order.append(value)
+            elif len(self.order) <= cursor:
+                cursor -= 1  # Duplicado descartado antes do cursor
+        self.cursor = min(cursor, len(self.order) - 1)
+
+    # --- Estado (sessão) ------------------------------------------------
+
+    def state(self) -> Tuple[List[int], List[int]]:
+        """(tocadas até a atual, já sorteadas à frente)"""
+        return self.order[:self.cursor + 1], self.order[self.cursor + 1:]
+
+    def load_state(self, count: int, history: Iterable[int], upcoming: Iterable[int]):
+        """Restaura a ordem salva por state()"""
+        history = [i for i in history if 0 <= i < count]
+        order = history + [i for i in upcoming if 0 <= i < count]
+        # A volta atual começa depois da última repetição
+        seen = set()
+        cycle_start = 0
+        for position in range(len(order) - 1, -1, -1):
+            if order[position] in seen:
+                cycle_start = position + 1
+                break
+            seen.add(order[position])
+        self.count = count
+        self.rebuild(order, len(history) - 1, cycle_start)
@@ -0,0 +1,146 @@
+"""
+Estatísticas de escuta
+Agregados incrementais (contagem, tempo ouvido, última vez, horas e dias da semana)
+"""
+import heapq
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+class TrackStats:
+    """Agregados de uma música"""
+
+    __slots__ = ('name', 'play_count', 'total_time', 'last_played')
+
+    def __init__(self, name, play_count=0, total_time=0.0, last_played=None):
+        self.name = name
+        self.play_count = play_count
+        self.total_time = total_time
+        self.last_played = last_played
+
+    def to_dict(self) -> Dict:
+        return {'name': self.name, 'play_count': self.play_count,
+                'total_time': self.total_time, 'last_played': self.last_played}
+
+class ListeningStats:
+    """
+    Estatísticas atualizadas a cada reprodução
+
+    Cada entrada do histórico é aplicada uma única vez (O(1)); as consultas
+    leem só os agregados. O estado é salvo em stats.json junto com quantas
+    entradas do histórico já foram aplicadas, para que ao abrir só as
+    reproduções novas precisem ser contadas.
+    """
+
+    def __init__(self, stats_file=None):
+        self.stats_file = Path(stats_file) if stats_file else None
+        self.reset()
+
+    def reset(self):
+        self.tracks: Dict[str, TrackStats] = {}
+        self.hours = [0] * 24
+        self.weekdays = [0] * 7  # 0 = segunda-feira
+        self.total_plays = 0
+        self.total_time = 0.0
+        self.applied_entries = 0
+
+    def add(self, entry: Dict):
+        """Aplica uma reprodução do histórico aos agregados"""
+        path = entry['path']
+        played_at = datetime.fromisoformat(entry['timestamp'])
+        duration = entry.get('duration') or 0.0
+
+        track = self.tracks.get(path)
+        if track is None:
+            track = self.tracks[path] = TrackStats(entry['name'])
+        track.name = entry['name']
+        track.play_count += 1
+        track.total_time += duration
+        track.last_played = entry['timestamp']
+
+        self.hours[played_at.hour] += 1
+        self.weekdays[played_at.weekday()] += 1
+        self.total_plays += 1
+        self.total_time += duration
+        self.applied_entries += 1
+
+    def sync(self, entries: List[Dict]):
+        """Aplica as entradas do histórico que ainda não foram contadas"""
+        if self.applied_entries > len(entries):
+            self.reset()  # Histórico foi limpo ou encurtado: recalcula
+        for entry in entries[self.applied_entries:]:
+            self.add(entry)
+
+    # --- Consultas ------------------------------------------------------
+
+    def get_track(self, music_path) -> Dict:
+        track = self.tracks.get(music_path)
+        return track.to_dict() if track else None
+
+    def top_tracks(self, count=10, by='play_count') -> List[Dict]:
+        """Músicas mais tocadas (ou mais ouvidas, com by='total_time')"""
+        top = heapq.nlargest(count, self.tracks.items(),
+                             key=lambda item: getattr(item[1], by))
+        return [{'path': path, **track.to_dict()} for path, track in top]
+
+    def busiest_hour(self):
+        """Hora do dia com mais reproduções (None se não há histórico)"""
+        if not self.total_plays:
+            return None
+        return max(range(24), key=self.hours.__getitem__)
+
+    def busiest_weekday(self):
+        """Dia da semana com mais reproduções (0 = segunda; None se não há histórico)"""
+        if not self.total_plays:
+            return None
+        return max(range(7), key=self.weekdays.__getitem__)
+
+    # --- Persistência ---------------------------------------------------
+
+    def load(self):
+        """Carrega os agregados salvos"""
+        self.reset()
+        if not self.stats_file or not self.stats_file.exists():
+            return
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.tracks = {path: TrackStats(**track) for path, track in data['tracks'].items()}
+            self.hours = data['hours']
+            self.weekdays = data['weekdays']
+            self.total_plays = data['total_plays']
+            self.total_time = data['total_time']
+            self.applied_entries = data['applied_entries']
+        except Exception as e:
+            print(f"Erro ao carregar estatísticas: {e}")
+            self.reset()
+
+    def save(self):
+        """Salva os agregados (arquivo temporário + rename)"""
+        if not self.stats_file:
+            return False
+        data = {
+            'applied_entries': self.applied_entries,
+            'total_plays': self.total_plays,
+            'total_time': self.total_time,
+            'hours': self.hours,
+            'weekdays': self.weekdays,
+            'tracks': {path: track.to_dict() for path, track in self.tracks.items()},
+        }
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.stats_file.parent, prefix='.stats-',
+                                             suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(temp_path, self.stats_file)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar estatísticas: {e}")
+            return False
@@ -0,0 +1,329 @@
+"""
+Playlists de faixas (M3U/M3U8/PLS)
+Guarda as playlists no library.db como listas ordenadas de ids de faixas
+"""
+import os
+import re
+from typing import Dict, List, Optional
+
+from .track_table import TrackTable
+
+PLAYLIST_FORMATS = {'.m3u', '.m3u8', '.pls'}
+PLS_LINE = re.compile(r'^(file|title|length)(\d+)=(.*)$', re.IGNORECASE)
+
+def read_text(path: str) -> str:
+    """Lê o arquivo de playlist (M3U8 é UTF-8; M3U antigo costuma ser Latin-1)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+def resolve_entry(base_dir: str, location: str) -> Optional[str]:
+    """Caminho absoluto de uma entrada (relativa à pasta da playlist); None para URLs"""
+    location = location.strip()
+    if not location or '://' in location:
+        return None
+    return os.path.normpath(os.path.join(base_dir, os.path.expanduser(location)))
+
+def parse_m3u(path: str) -> List[Dict]:
+    """
+    Lê uma playlist M3U/M3U8
+
+    Returns:
+        Lista de dicts {'path', 'title', 'duration'} na ordem do arquivo
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    entries = []
+    title = duration = None
+    for line in read_text(path).splitlines():
+        line = line.strip()
+        if line.upper().startswith('#EXTINF:'):
+            info, _, title = line[8:].partition(',')
+            try:
+                duration = float(info.split()[0]) if info else None
+            except ValueError:
+                duration = None
+            if duration is not None and duration < 0:
+                duration = None
+            title = title or None
+        elif line and not line.startswith('#'):
+            location = resolve_entry(base_dir, line)
+            if location:
+                entries.append({'path': location, 'title': title, 'duration': duration})
+            title = duration = None
+    return entries
+
+def parse_pls(path: str) -> List[Dict]:
+    """Lê uma playlist PLS (FileN/TitleN/LengthN)"""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    numbered: Dict[int, Dict] = {}
+    for line in read_text(path).splitlines():
+        match = PLS_LINE.match(line.strip())
+        if not match:
+            continue
+        key, number, value = match.group(1).lower(), int(match.group(2)), match.group(3)
+        entry = numbered.setdefault(number, {'path': None, 'title': None, 'duration': None})
+        if key == 'file':
+            entry['path'] = resolve_entry(base_dir, value)
+        elif key == 'title':
+            entry['title'] = value or None
+        else:
+            try:
+                entry['duration'] = float(value) if float(value) >= 0 else None
+            except ValueError:
+                pass
+    return [numbered[n] for n in sorted(numbered) if numbered[n]['path']]
+
+def read_playlist_file(path: str) -> List[Dict]:
+    """Lê uma playlist conforme a extensão (.m3u, .m3u8 ou .pls)"""
+    if os.path.splitext(path)[1].lower() == '.pls':
+        return parse_pls(path)
+    return parse_m3u(path)
+
+def write_playlist_file(path: str, entries: List[Dict]):
+    """
+    Grava uma playlist conforme a extensão
+
+    Args:
+        path: Arquivo de destino (.m3u, .m3u8 ou .pls)
+        entries: Dicts com 'path' e, opcionalmente, 'title' e 'duration'
+    """
+    lines = []
+    if os.path.splitext(path)[1].lower() == '.pls':
+        lines.append('[playlist]')
+        for number, entry in enumerate(entries, 1):
+            lines.append(f"File{number}={entry['path']}")
+            if entry.get('title'):
+                lines.append(f"Title{number}={entry['title']}")
+            lines.append(f"Length{number}={round(entry.get('duration') or -1)}")
+        lines += [f"NumberOfEntries={len(entries)}", 'Version=2']
+    else:
+        lines.append('#EXTM3U')
+        for entry in entries:
+            title = entry.get('title') or os.path.splitext(os.path.basename(entry['path']))[0]
+            lines.append(f"#EXTINF:{round(entry.get('duration') or -1)},{title}")
+            lines.append(entry['path'])
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('\n'.join(lines) + '\n')
+
+class TrackPlaylistStore:
+    """
+    Playlists de faixas guardadas no library.db
+
+    Cada caminho recebe um id estável na tabela tracks (sobrevive a rescans e a
+    arquivos removidos). Uma playlist é uma lista de entradas (id da faixa +
+    posição fracionária): acrescentar, remover e mover alteram uma única linha,
+    sem renumerar as demais. Carregar a playlist é só uma consulta ao banco;
+    nome e duração vêm do índice da biblioteca (ou das dicas do arquivo).
+    """
+
+    def __init__(self, library_index):
+        self.index = library_index
+        self.conn = library_index.conn
+        self.lock = library_index.lock
+        self.create_tables()
+
+    def create_tables(self):
+        with self.lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tracks (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE NOT NULL,
+                    title TEXT,
+                    duration REAL
+                );
+                CREATE TABLE IF NOT EXISTS playlists (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS playlist_entries (
+                    id INTEGER PRIMARY KEY,
+                    playlist_id INTEGER NOT NULL,
+                    position REAL NOT NULL,
+                    track_id INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_position
+                    ON playlist_entries(playlist_id, position);
+            """)
+
+    # --- Playlists ------------------------------------------------------
+
+    def create(self, name: str) -> int:
+        """Cria uma playlist vazia e retorna seu id"""
+        with self.lock, self.conn:
+            return self.conn.execute("INSERT INTO playlists (name) VALUES (?)", (name,)).lastrowid
+
+    def list_playlists(self) -> List[Dict]:
+        """Playlists salvas com a quantidade de faixas"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT p.id, p.name, COUNT(e.id) FROM playlists p "
+                "LEFT JOIN playlist_entries e ON e.playlist_id = p.id "
+                "GROUP BY p.id ORDER BY p.id").fetchall()
+        return [{'id': pid, 'name': name, 'count': count} for pid, name, count in rows]
+
+    def rename(self, playlist_id: int, name: str):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE playlists SET name = ? WHERE id = ?", (name, playlist_id))
+
+    def delete(self, playlist_id: int):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM playlist_entries WHERE playlist_id = ?", (playlist_id,))
+            self.conn.execute("DELETE FROM playlists WHERE id = ?", (playlist_id,))
+
+    # --- Entradas -------------------------------------------------------
+
+    def track_ids(self, entries: List[Dict]) -> List[int]:
+        """Ids das faixas (cadastrando caminhos novos); chamar com o lock"""
+        self.conn.executemany(
+            "INSERT INTO tracks (path, title, duration) VALUES (?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET "
+            "title = COALESCE(excluded.title, title), duration = COALESCE(excluded.duration, duration)",
+            [(e['path'], e.get('title'), e.get('duration')) for e in entries])
+        lookup = self.conn.execute
+        return [lookup("SELECT id FROM tracks WHERE path = ?", (e['path'],)).fetchone()[0]
+                for e in entries]
+
+    def append(self, playlist_id: int, entries: List[Dict]) -> List[int]:
+        """
+        Acrescenta faixas ao fim da playlist (uma transação para o lote)
+
+        Args:
+            entries: Dicts com 'path' (e opcionalmente 'title'/'duration') ou caminhos
+
+        Returns:
+            Ids das entradas criadas
+        """
+        with self.lock, self.conn:
+            return self.insert_entries(playlist_id, entries)
+
+    def insert_entries(self, playlist_id: int, entries: List[Dict]) -> List[int]:
+        """Acrescenta as entradas no fim; chamar com o lock, dentro da transação"""
+        entries = [{'path': e} if isinstance(e, str) else e for e in entries]
+        last = self.conn.execute(
+            "SELECT MAX(position) FROM playlist_entries WHERE playlist_id = ?",
+            (playlist_id,)).fetchone()[0] or 0.0
+        ids = self.track_ids(entries)
+        cursor = self.conn.cursor()
+        entry_ids = []
+        for offset, track_id in enumerate(ids, 1):
+            cursor.execute(
+                "INSERT INTO playlist_entries (playlist_id, position, track_id) VALUES (?, ?, ?)",
+                (playlist_id, last + offset, track_id))
+            entry_ids.append(cursor.lastrowid)
+        return entry_ids
+
+    def remove(self, entry_id: int):
+        """Remove uma entrada (as demais não mudam)"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM playlist_entries WHERE id = ?", (entry_id,))
+
+    def move(self, entry_id: int, before_entry_id: Optional[int] = None):
+        """
+        Move uma entrada para antes de outra (ou para o fim, com before_entry_id=None)
+
+        A nova posição é o ponto médio entre os vizinhos, então só a linha movida
+        é alterada. Se os vizinhos ficarem colados (limite do float), a playlist
+        é renumerada uma vez.
+        """
+        with self.lock, self.conn:
+            playlist_id = self.conn.execute(
+                "SELECT playlist_id FROM playlist_entries WHERE id = ?", (entry_id,)).fetchone()[0]
+            position = self.position_before(playlist_id, entry_id, before_entry_id)
+            if position is None:
+                self.renumber(playlist_id)
+                position = self.position_before(playlist_id, entry_id, before_entry_id)
+            self.conn.execute("UPDATE playlist_entries SET position = ? WHERE id = ?",
+                              (position, entry_id))
+
+    def position_before(self, playlist_id, entry_id, before_entry_id) -> Optional[float]:
+        """Posição livre antes de before_entry_id (None se não há espaço entre os vizinhos)"""
+        execute = self.conn.execute
+        if before_entry_id is None:
+            last = execute("SELECT MAX(position) FROM playlist_entries WHERE playlist_id = ? "
+                           "AND id != ?", (playlist_id, entry_id)).fetchone()[0]
+            return (last or 0.0) + 1.0
+        upper = execute("SELECT position FROM playlist_entries WHERE id = ?",
+                        (before_entry_id,)).fetchone()[0]
+        lower = execute("SELECT MAX(position) FROM playlist_entries WHERE playlist_id = ? "
+                        "AND position < ? AND id != ?", (playlist_id, upper, entry_id)).fetchone()[0]
+        if lower is None:
+            return upper - 1.0
+        middle = (lower + upper) / 2
+        return middle if lower < middle < upper else None
+
+    def renumber(self, playlist_id: int):
+        """Reatribui posições 1, 2, 3... (chamar com o lock)"""
+        rows = self.conn.execute("SELECT id FROM playlist_entries WHERE playlist_id = ? "
+                                 "ORDER BY position", (playlist_id,)).fetchall()
+        self.conn.executemany("UPDATE playlist_entries SET position = ? WHERE id = ?",
+                              [(float(n), row[0]) for n, row in enumerate(rows, 1)])
+
+    def get_entries(self, playlist_id: int) -> List[Dict]:
+        """Entradas na ordem da playlist: {'entry_id', 'track_id', 'path', 'title', 'duration'}"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT e.id, t.id, t.path, t.title, COALESCE(f.duration, t.duration) "
+                "FROM playlist_entries e JOIN tracks t ON t.id = e.track_id "
+                "LEFT JOIN files f ON f.path = t.path "
+                "WHERE e.playlist_id = ? ORDER BY e.position", (playlist_id,)).fetchall()
+        return [{'entry_id': entry_id, 'track_id': track_id, 'path': path, 'title': title,
+                 'duration': duration}
+                for entry_id, track_id, path, title, duration in rows]
+
+    def load_tracks(self, playlist_id: int) -> TrackTable:
+        """
+        Carrega a playlist como TrackTable, sem acessar os arquivos
+
+        Cada linha ganha 'entry_id' (para remover/mover) e, se o arquivo trouxe
+        um título, 'title'. A existência dos arquivos fica para find_missing().
+        """
+        table = TrackTable()
+        for entry in self.get_entries(playlist_id):
+            folder, filename = os.path.split(entry['path'])
+            name, extension = os.path.splitext(filename)
+            index = table.add(folder, name, extension, entry['duration'])
+            table.set_field(index, 'entry_id', entry['entry_id'])
+            if entry['title']:
+                table.set_field(index, 'title', entry['title'])
+        return table
+
+    @staticmethod
+    def find_missing(music_list, should_stop=None) -> List[int]:
+        """
+        Índices das músicas cujo arquivo não existe (para rodar em segundo plano)
+
+        Args:
+            music_list: TrackTable carregada por load_tracks
+            should_stop: Função opcional; se retornar True a verificação para
+        """
+        missing = []
+        for index in range(len(music_list)):
+            if should_stop and should_stop():
+                break
+            if not os.path.exists(music_list.get_field(index, 'path')):
+                missing.append(index)
+        return missing
+
+    # --- Importar / exportar --------------------------------------------
+
+    def import_file(self, path: str, name: str = None) -> int:
+        """
+        Importa um arquivo M3U/M3U8/PLS como nova playlist e retorna o id
+
+        Playlist e entradas são gravadas numa única transação: uma falha no
+        meio não deixa uma playlist vazia (ou pela metade) no banco.
+        """
+        entries = read_playlist_file(path)
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        with self.lock, self.conn:
+            playlist_id = self.conn.execute("INSERT INTO playlists (name) VALUES (?)",
+                                            (name,)).lastrowid
+            self.insert_entries(playlist_id, entries)
+        return playlist_id
+
+    def export_file(self, playlist_id: int, path: str):
+        """Exporta a playlist para M3U/M3U8/PLS (conforme a extensão do arquivo)"""
+        write_playlist_file(path, self.get_entries(playlist_id))
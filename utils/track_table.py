@@ -0,0 +1,227 @@
+"""
+Tabela compacta de músicas
+Guarda a biblioteca em colunas (pastas internadas por id inteiro) em vez de um dict por música
+"""
+import math
+import os
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List
+
+MISSING = object()
+
+class Track:
+    """Visão de uma linha da TrackTable que se comporta como o dict de música antigo"""
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        value = self.table.get_field(self.index, key)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.table.set_field(self.index, key, value)
+
+    def __contains__(self, key):
+        return self.table.get_field(self.index, key) is not MISSING
+
+    def get(self, key, default=None):
+        value = self.table.get_field(self.index, key)
+        return default if value is MISSING else value
+
+    def keys(self) -> List[str]:
+        return [key for key in self.table.field_names() if key in self]
+
+    def to_dict(self) -> Dict:
+        """Converte a linha num dict comum"""
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self):
+        return f"Track({self.to_dict()!r})"
+
+class TrackTable:
+    """
+    Lista de músicas em formato colunar
+
+    - pastas ficam numa tabela própria e cada música guarda só o id (array 'I')
+    - extensões idem (array 'B')
+    - duração em array 'd' (NaN = desconhecida)
+    - 'path' e 'folder' são reconstruídos sob demanda
+    - campos extras (tags) viram colunas criadas só quando usados
+    """
+
+    CORE_FIELDS = ('path', 'name', 'extension', 'folder', 'duration')
+
+    def __init__(self, music_list: Iterable[Dict] = ()):
+        self.folders: List[str] = []
+        self.folder_ids: Dict[str, int] = {}
+        self.extensions: List[str] = []
+        self.extension_ids: Dict[str, int] = {}
+        self.folder_column = array('I')
+        self.extension_column = array('B')
+        self.names: List[str] = []
+        self.durations = array('d')
+        self.columns: Dict[str, list] = {}
+        self.extend(music_list)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> Track:
+        if index < 0:
+            index += len(self.names)
+        if not 0 <= index < len(self.names):
+            raise IndexError(index)
+        return Track(self, index)
+
+    def __iter__(self) -> Iterator[Track]:
+        for index in range(len(self.names)):
+            yield Track(self, index)
+
+    def field_names(self) -> List[str]:
+        return list(self.CORE_FIELDS) + list(self.columns)
+
+    def intern_folder(self, folder: str) -> int:
+        """Retorna o id da pasta, cadastrando-a se for nova"""
+        folder_id = self.folder_ids.get(folder)
+        if folder_id is None:
+            folder_id = self.folder_ids[folder] = len(self.folders)
+            self.folders.append(folder)
+        return folder_id
+
+    def intern_extension(self, extension: str) -> int:
+        """Retorna o id da extensão, cadastrando-a se for nova"""
+        extension_id = self.extension_ids.get(extension)
+        if extension_id is None:
+            extension_id = self.extension_ids[extension] = len(self.extensions)
+            self.extensions.append(extension)
+        return extension_id
+
+    def add(self, folder: str, name: str, extension: str, duration=None) -> int:
+        """Adiciona uma música e retorna seu índice"""
+        self.folder_column.append(self.intern_folder(folder))
+        self.extension_column.append(self.intern_extension(extension))
+        self.names.append(name)
+        self.durations.append(math.nan if duration is None else duration)
+        for column in self.columns.values():
+            column.append(MISSING)
+        return len(self.names) - 1
+
+    def append(self, music: Dict):
+        """Adiciona uma música no formato dict do MusicLoader"""
+        index = self.add(music['folder'], music['name'], music['extension'], music.get('duration'))
+        for key, value in music.items():
+            if key not in self.CORE_FIELDS:
+                self.set_field(index, key, value)
+
+    def extend(self, music_list: Iterable[Dict]):
+        """Adiciona várias músicas"""
+        for music in music_list:
+            self.append(music)
+
+    def get_field(self, index: int, key: str):
+        """Valor de um campo da linha (MISSING se não existir)"""
+        if key == 'name':
+            return self.names[index]
+        if key == 'path':
+            return os.path.join(self.folders[self.folder_column[index]],
+                                self.names[index] + self.extensions[self.extension_column[index]])
+        if key == 'folder':
+            return self.folders[self.folder_column[index]]
+        if key == 'extension':
+            return self.extensions[self.extension_column[index]]
+        if key == 'duration':
+            duration = self.durations[index]
+            return None if math.isnan(duration) else duration
+        column = self.columns.get(key)
+        return MISSING if column is None else column[index]
+
+    def set_field(self, index: int, key: str, value):
+        """Altera um campo da linha"""
+        if key == 'duration':
+            self.durations[index] = math.nan if value is None else value
+        elif key == 'name':
+            self.names[index] = value
+        elif key == 'folder':
+            self.folder_column[index] = self.intern_folder(value)
+        elif key == 'extension':
+            self.extension_column[index] = self.intern_extension(value)
+        elif key == 'path':
+            raise KeyError("'path' é derivado de folder + name + extension")
+        else:
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = [MISSING] * len(self.names)
+            column[index] = value
+
+    def index_of_path(self, path: str) -> int:
+        """Índice da música com o caminho informado (-1 se não estiver na tabela)"""
+        folder_id = self.folder_ids.get(os.path.dirname(path))
+        if folder_id is None:
+            return -1
+        name, extension = os.path.splitext(os.path.basename(path))
+        extension_id = self.extension_ids.get(extension)
+        for index, candidate in enumerate(self.names):
+            if (candidate == name and self.folder_column[index] == folder_id
+                    and self.extension_column[index] == extension_id):
+                return index
+        return -1
+
+    def total_duration(self) -> float:
+        """Soma das durações conhecidas"""
+        return sum(d for d in self.durations if not math.isnan(d))
+
+    def copy(self) -> 'TrackTable':
+        """Cópia independente (só cópias de arrays/listas, nenhum dict por música)"""
+        table = TrackTable()
+        table.folders = self.folders[:]
+        table.folder_ids = dict(self.folder_ids)
+        table.extensions = self.extensions[:]
+        table.extension_ids = dict(self.extension_ids)
+        table.folder_column = self.folder_column[:]
+        table.extension_column = self.extension_column[:]
+        table.names = self.names[:]
+        table.durations = self.durations[:]
+        table.columns = {key: column[:] for key, column in self.columns.items()}
+        return table
+    
+    def delete(self, index: int):
+        """Remove uma linha (as seguintes sobem uma posição)"""
+        del self.names[index]
+        del self.folder_column[index]
+        del self.extension_column[index]
+        del self.durations[index]
+        for column in self.columns.values():
+            del column[index]
+    
+    def insert_sorted(self, music: Dict) -> int:
+        """Insere uma música mantendo a ordem por nome e retorna seu índice"""
+        index = bisect_right(self.names, music['name'].lower(), key=str.lower)
+        duration = music.get('duration')
+        self.names.insert(index, music['name'])
+        self.folder_column.insert(index, self.intern_folder(music['folder']))
+        self.extension_column.insert(index, self.intern_extension(music['extension']))
+        self.durations.insert(index, math.nan if duration is None else duration)
+        for column in self.columns.values():
+            column.insert(index, MISSING)
+        for key, value in music.items():
+            if key not in self.CORE_FIELDS:
+                self.set_field(index, key, value)
+        return index
+    
+    def sort_by_name(self):
+        """Ordena a tabela pelo nome (sem diferenciar maiúsculas)"""
+        names = self.names
+        order = sorted(range(len(names)), key=lambda i: names[i].lower())
+        self.names = [names[i] for i in order]
+        self.folder_column = array('I', (self.folder_column[i] for i in order))
+        self.extension_column = array('B', (self.extension_column[i] for i in order))
+        self.durations = array('d', (self.durations[i] for i in order))
+        for key, column in self.columns.items():
+            self.columns[key] = [column[i] for i in order]